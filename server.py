@@ -206,6 +206,9 @@ async def lifespan(app: FastAPI):
     # 释放账号池会话
     await release_pool_session()
     logger.info("账号池会话已释放")
+    # 关闭缓存的 Warp API 长连接客户端
+    from warp2protobuf.warp.api_client import close_warp_clients
+    await close_warp_clients()
 
 
 def create_app() -> FastAPI:
@@ -0,0 +1,82 @@
+# test_action_handlers.py
+import os
+import sys
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from warp2protobuf.warp.api_client import _ACTION_HANDLERS
+
+
+def _dispatch(actions):
+    """按 SSE 解析循环的方式分发动作，返回 (拼接的文本, 最后的 task_id)"""
+    complete_response = []
+    task_id = None
+    for action in actions:
+        for kind, action_payload in action.items():
+            handler = _ACTION_HANDLERS.get(kind)
+            if handler is not None and isinstance(action_payload, dict):
+                new_task_id = handler(action_payload, complete_response)
+                if new_task_id:
+                    task_id = new_task_id
+    return "".join(complete_response), task_id
+
+
+# snake_case 与 camelCase 键名应分发到同一个处理函数
+def test_handler_aliases():
+    pairs = [
+        ("update_task_message", "updateTaskMessage"),
+        ("append_to_message_content", "appendToMessageContent"),
+        ("add_messages_to_task", "addMessagesToTask"),
+    ]
+    for snake, camel in pairs:
+        assert _ACTION_HANDLERS[snake] is _ACTION_HANDLERS[camel]
+    print("键名别名测试通过")
+
+
+# 三种动作的文本按出现顺序拼接
+def test_text_actions():
+    text, task_id = _dispatch([
+        {"update_task_message": {"message": {"agent_output": {"text": "Hello"}}}},
+        {"appendToMessageContent": {"message": {"agentOutput": {"text": ", "}}}},
+        {"add_messages_to_task": {"messages": [{"content": {"parts": [{"text": "world"}, "!"]}}]}},
+    ])
+    assert text == "Hello, world!"
+    assert task_id is None
+    print(f"文本动作测试通过: {text}")
+
+
+# add_messages_to_task 携带的 task_id 会被返回，其他动作返回 None 不覆盖已有值
+def test_add_messages_task_id():
+    _, task_id = _dispatch([
+        {"add_messages_to_task": {"task_id": "task-1", "messages": []}},
+        {"update_task_message": {"message": {"text": "ignored"}}},
+    ])
+    assert task_id == "task-1"
+
+    _, task_id = _dispatch([{"addMessagesToTask": {"taskId": "task-2", "messages": []}}])
+    assert task_id == "task-2"
+    print("task_id 提取测试通过")
+
+
+# 未知动作与非 dict 负载直接跳过
+def test_unknown_and_invalid_payloads():
+    text, task_id = _dispatch([
+        {"create_task": {"task": {"id": "x"}}},
+        {"update_task_message": "not a dict"},
+        {"append_to_message_content": {"message": "not a dict"}},
+    ])
+    assert text == ""
+    assert task_id is None
+    print("未知/无效动作测试通过")
+
+
+def main():
+    test_handler_aliases()
+    test_text_actions()
+    test_add_messages_task_id()
+    test_unknown_and_invalid_payloads()
+
+
+if __name__ == "__main__":
+    main()
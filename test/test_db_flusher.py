@@ -0,0 +1,143 @@
+# test_db_flusher.py
+import asyncio
+import os
+import sqlite3
+import sys
+import tempfile
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from init_database import init_database
+from warp_register import AsyncDatabaseManager, RegistrationMonitor
+
+
+def _row(i, email=None):
+    return (email or f"user{i}@example.com", f"local{i}", f"id{i}", f"refresh{i}",
+            "active", None, "test-agent")
+
+
+def _count(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM accounts").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def _monitor(db_path):
+    """使用临时数据库的监控器，并记录每次批量写入的行数"""
+    monitor = RegistrationMonitor(target_accounts=1, max_concurrent=1)
+    monitor.db_manager = AsyncDatabaseManager(db_path)
+    monitor.batches = []
+    insert_accounts = monitor.db_manager.insert_accounts
+
+    async def recording_insert(rows):
+        rows = list(rows)
+        monitor.batches.append(len(rows))
+        return await insert_accounts(rows)
+
+    monitor.db_manager.insert_accounts = recording_insert
+    return monitor
+
+
+# 单个账号入队后立即写库，不等待凑批
+async def check_single_save(db_path):
+    monitor = _monitor(db_path)
+    monitor._start_db_flusher()
+    try:
+        assert await asyncio.wait_for(monitor.save_account(_row(0)), timeout=1)
+    finally:
+        await monitor._stop_db_flusher()
+        await monitor.db_manager.close()
+
+    assert monitor.batches == [1]
+    assert _count(db_path) == 1
+    print("单账号即时写入测试通过")
+
+
+# 同时入队的账号合并为一个事务，各自的 future 收到逐行结果
+async def check_concurrent_saves(db_path):
+    monitor = _monitor(db_path)
+    monitor._start_db_flusher()
+    try:
+        rows = [_row(i) for i in range(5)] + [_row(5, email="user0@example.com")]
+        results = await asyncio.gather(*(monitor.save_account(row) for row in rows))
+    finally:
+        await monitor._stop_db_flusher()
+        await monitor.db_manager.close()
+
+    assert results == [True] * 5 + [False]
+    assert monitor.batches == [6]
+    assert _count(db_path) == 5
+    print(f"并发入队合并测试通过: {results}")
+
+
+# 批量写入失败时逐条 add_account，不丢弃任何一行
+async def check_batch_failure_fallback(db_path):
+    monitor = _monitor(db_path)
+
+    async def failing_insert(rows):
+        raise RuntimeError("batch failed")
+
+    monitor.db_manager.insert_accounts = failing_insert
+    monitor._start_db_flusher()
+    try:
+        results = await asyncio.gather(*(monitor.save_account(_row(i)) for i in range(3)))
+    finally:
+        await monitor._stop_db_flusher()
+        await monitor.db_manager.close()
+
+    assert results == [True, True, True]
+    assert _count(db_path) == 3
+    print("批量失败回退测试通过")
+
+
+# 写入任务停止后直接写库
+async def check_save_without_flusher(db_path):
+    monitor = _monitor(db_path)
+    monitor._start_db_flusher()
+    await monitor._stop_db_flusher()
+    try:
+        assert await monitor.save_account(_row(0))
+        assert not await monitor.save_account(_row(1, email="user0@example.com"))
+    finally:
+        await monitor.db_manager.close()
+
+    assert monitor.batches == []
+    assert _count(db_path) == 1
+    print("停止后直接写库测试通过")
+
+
+def _run(check):
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "accounts.db")
+        init_database(db_path)
+        asyncio.run(check(db_path))
+
+
+def test_single_save():
+    _run(check_single_save)
+
+
+def test_concurrent_saves():
+    _run(check_concurrent_saves)
+
+
+def test_batch_failure_fallback():
+    _run(check_batch_failure_fallback)
+
+
+def test_save_without_flusher():
+    _run(check_save_without_flusher)
+
+
+def main():
+    test_single_save()
+    test_concurrent_saves()
+    test_batch_failure_fallback()
+    test_save_without_flusher()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+# test_insert_accounts.py
+import asyncio
+import os
+import sqlite3
+import sys
+import tempfile
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from init_database import init_database
+from warp_register import (ACCOUNT_INSERT_COLUMNS, SQLITE_MAX_VARIABLES,
+                           AsyncDatabaseManager)
+
+# 单条 INSERT 语句最多容纳的行数
+CHUNK_ROWS = SQLITE_MAX_VARIABLES // len(ACCOUNT_INSERT_COLUMNS)
+
+
+def _row(i, email=None):
+    return (email or f"user{i}@example.com", f"local{i}", f"id{i}", f"refresh{i}",
+            "active", None, "test-agent")
+
+
+def _emails(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return [email for (email,) in conn.execute("SELECT email FROM accounts ORDER BY id")]
+    finally:
+        conn.close()
+
+
+# 行数超过单条语句上限时分块写入，全部行都落库且顺序不变
+async def check_chunked_insert(db_path):
+    rows = [_row(i) for i in range(CHUNK_ROWS * 2 + 17)]
+    db_manager = AsyncDatabaseManager(db_path)
+    try:
+        results = await db_manager.insert_accounts(rows)
+    finally:
+        await db_manager.close()
+
+    assert results == [True] * len(rows)
+    assert _emails(db_path) == [row[0] for row in rows]
+    print(f"分块插入测试通过: {len(rows)} 行，每块 {CHUNK_ROWS} 行")
+
+
+# 已存在的邮箱与同批重复的邮箱被忽略，并在逐行结果中标记为 False
+async def check_duplicates(db_path):
+    db_manager = AsyncDatabaseManager(db_path)
+    try:
+        assert await db_manager.add_account(*_row(0))
+        rows = [_row(0), _row(1), _row(2), _row(3, email="user1@example.com")]
+        results = await db_manager.insert_accounts(rows)
+    finally:
+        await db_manager.close()
+
+    assert results == [False, True, True, False]
+    assert _emails(db_path) == ["user0@example.com", "user1@example.com", "user2@example.com"]
+    print(f"重复邮箱测试通过: {results}")
+
+
+# 空列表不访问数据库
+async def check_empty(db_path):
+    db_manager = AsyncDatabaseManager(db_path)
+    try:
+        assert await db_manager.insert_accounts([]) == []
+    finally:
+        await db_manager.close()
+    print("空列表测试通过")
+
+
+def _run(check):
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "accounts.db")
+        init_database(db_path)
+        asyncio.run(check(db_path))
+
+
+def test_chunked_insert():
+    _run(check_chunked_insert)
+
+
+def test_duplicates():
+    _run(check_duplicates)
+
+
+def test_empty():
+    _run(check_empty)
+
+
+def main():
+    test_chunked_insert()
+    test_duplicates()
+    test_empty()
+
+
+if __name__ == "__main__":
+    main()
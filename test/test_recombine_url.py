@@ -0,0 +1,61 @@
+# test_recombine_url.py
+import os
+import sys
+from urllib.parse import parse_qs, urlparse
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from warp_register import AsyncDatabaseManager, AsyncProxyManager, WarpRegistrationBot
+
+ACTION_BASE = "https://astral-field-294621.firebaseapp.com/__/auth/action"
+
+
+def _bot():
+    return WarpRegistrationBot(AsyncDatabaseManager(":memory:"), AsyncProxyManager())
+
+
+# 默认登录地址作为 continueUrl 时直接使用 /login
+def test_default_login_path():
+    url = (f"{ACTION_BASE}?apiKey=KEY&mode=signIn&oobCode=CODE123"
+           "&continueUrl=https://app.warp.dev/login&lang=en")
+    result = _bot().extract_and_recombine_url(url)
+    assert result == "https://app.warp.dev/login?apiKey=KEY&oobCode=CODE123&mode=signIn&lang=en"
+    print(f"默认登录地址测试通过: {result}")
+
+
+# 其他 continueUrl 取其路径部分
+def test_custom_continue_path():
+    url = (f"{ACTION_BASE}?apiKey=KEY&mode=signIn&oobCode=CODE123"
+           "&continueUrl=https%3A%2F%2Fapp.warp.dev%2Fsignup%2Fremote%3Fx%3D1&lang=en")
+    result = _bot().extract_and_recombine_url(url)
+    assert result == "https://app.warp.dev/signup/remote?apiKey=KEY&oobCode=CODE123&mode=signIn&lang=en"
+    print(f"自定义路径测试通过: {result}")
+
+
+# 缺少 continueUrl 时回退到 /login，缺失的参数为空字符串
+def test_missing_params():
+    result = _bot().extract_and_recombine_url(f"{ACTION_BASE}?oobCode=CODE123")
+    assert result == "https://app.warp.dev/login?apiKey=&oobCode=CODE123&mode=&lang="
+    print("缺失参数测试通过")
+
+
+# 参数值中的特殊字符会被重新编码，解析回来与原值一致
+def test_special_characters_roundtrip():
+    url = f"{ACTION_BASE}?apiKey=K%2By&mode=signIn&oobCode=a%2Fb%3Dc&lang=zh-CN"
+    params = parse_qs(urlparse(_bot().extract_and_recombine_url(url)).query)
+    assert params["apiKey"] == ["K+y"]
+    assert params["oobCode"] == ["a/b=c"]
+    assert params["lang"] == ["zh-CN"]
+    print("特殊字符编码测试通过")
+
+
+def main():
+    test_default_login_path()
+    test_custom_continue_path()
+    test_missing_params()
+    test_special_characters_roundtrip()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# test_verification_link.py
+import os
+import sys
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from warp_register import AsyncDatabaseManager, AsyncProxyManager, WarpRegistrationBot
+
+ACTION_URL = ("https://astral-field-294621.firebaseapp.com/__/auth/action"
+              "?apiKey=KEY&mode=signIn&oobCode=CODE123&continueUrl=https://app.warp.dev/login&lang=en")
+
+
+def _bot():
+    return WarpRegistrationBot(AsyncDatabaseManager(":memory:"), AsyncProxyManager())
+
+
+# HTML 邮件：从 <a href> 中提取，并还原 &amp; 转义
+def test_html_anchor():
+    body = (
+        "<html><body><p>Sign in to Warp</p>"
+        "<a href=\"https://warp.dev/privacy\">Privacy</a>"
+        f"<a href=\"{ACTION_URL.replace('&', '&amp;')}\">Sign in</a>"
+        "</body></html>"
+    )
+    result = _bot()._extract_verification_link(body)
+    assert result is not None
+    assert result["oob_code"] == "CODE123"
+    assert result["verification_link"] == ACTION_URL
+    print(f"HTML 链接提取测试通过: {result['oob_code']}")
+
+
+# 纯文本邮件：没有 HTML 标签时回退到正则
+def test_plain_text_fallback():
+    body = f"Hello,\n\nFollow this link to sign in:\n{ACTION_URL}\n\nThanks"
+    result = _bot()._extract_verification_link(body)
+    assert result is not None
+    assert result["oob_code"] == "CODE123"
+    print(f"纯文本回退测试通过: {result['verification_link']}")
+
+
+# HTML 中的链接不在 <a href> 内时，同样回退到正则
+def test_html_without_anchor():
+    body = f"<div>Copy this link: {ACTION_URL}</div>"
+    result = _bot()._extract_verification_link(body)
+    assert result is not None
+    assert result["oob_code"] == "CODE123"
+    print("无 <a> 标签回退测试通过")
+
+
+# 不含 oobCode 的邮件与空内容返回 None
+def test_no_link():
+    bot = _bot()
+    assert bot._extract_verification_link("") is None
+    assert bot._extract_verification_link("<a href=\"https://warp.dev\">Warp</a>") is None
+    assert bot._extract_verification_link("oobCode mentioned but no link") is None
+    print("无验证链接测试通过")
+
+
+def main():
+    test_html_anchor()
+    test_plain_text_fallback()
+    test_html_without_anchor()
+    test_no_link()
+
+
+if __name__ == "__main__":
+    main()
@@ -6,8 +6,11 @@ Warp API客户端模块
 处理与Warp API的通信，包括protobuf数据发送和SSE响应解析。
 """
 import asyncio
+import contextlib
 import os
-from typing import Any, Dict, LiteralString
+import weakref
+from collections import OrderedDict
+from typing import Any, Dict, LiteralString, Optional, Set, Tuple
 
 import httpx
 
@@ -20,6 +23,82 @@ from ..core.protobuf_utils import protobuf_to_dict
 MAX_QUOTA_RETRIES = 5
 RETRY_DELAY_SECONDS = 0.2
 
+# 按事件循环分组、按 (代理, verify) 缓存的长连接客户端，LRU 淘汰。
+# 事件循环作弱引用键：循环销毁后其客户端分组随之释放，不会因 id() 复用而错配
+MAX_CACHED_CLIENTS = 16
+_warp_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, OrderedDict[Tuple[Optional[str], bool], httpx.AsyncClient]]" = weakref.WeakKeyDictionary()
+# 正在使用中的客户端引用计数；被淘汰时仍在使用的客户端推迟到最后一个使用者释放后再关闭
+_client_refs: Dict[httpx.AsyncClient, int] = {}
+_evicted_clients: Set[httpx.AsyncClient] = set()
+
+
+async def _aclose_quietly(client: httpx.AsyncClient) -> None:
+    try:
+        await client.aclose()
+    except Exception:
+        pass
+
+
+async def _get_warp_client(proxy: Optional[str], verify: bool) -> httpx.AsyncClient:
+    """获取或创建当前事件循环下指定代理的 HTTP/2 长连接客户端"""
+    loop = asyncio.get_running_loop()
+    clients = _warp_clients.get(loop)
+    if clients is None:
+        clients = _warp_clients[loop] = OrderedDict()
+    key = (proxy, verify)
+    client = clients.get(key)
+    if client is not None and not client.is_closed:
+        clients.move_to_end(key)
+        return client
+
+    client_config = {
+        "http2": True,
+        "timeout": httpx.Timeout(60.0),
+        "verify": verify,
+        "trust_env": True,
+        "limits": httpx.Limits(max_keepalive_connections=32),
+    }
+    if proxy:
+        client_config["proxy"] = proxy
+
+    client = httpx.AsyncClient(**client_config)
+    clients[key] = client
+
+    while len(clients) > MAX_CACHED_CLIENTS:
+        _, oldest = clients.popitem(last=False)
+        if oldest in _client_refs:
+            # 仍有请求在读取其响应流，等最后一个使用者释放时再关闭
+            _evicted_clients.add(oldest)
+        else:
+            await _aclose_quietly(oldest)
+    return client
+
+
+@contextlib.asynccontextmanager
+async def _warp_client(proxy: Optional[str], verify: bool):
+    """借用缓存的客户端，使用期间不会被 LRU 淘汰关闭"""
+    client = await _get_warp_client(proxy, verify)
+    _client_refs[client] = _client_refs.get(client, 0) + 1
+    try:
+        yield client
+    finally:
+        refs = _client_refs.pop(client) - 1
+        if refs:
+            _client_refs[client] = refs
+        elif client in _evicted_clients:
+            _evicted_clients.discard(client)
+            await _aclose_quietly(client)
+
+
+async def close_warp_clients() -> None:
+    """关闭所有缓存的以及已淘汰待关闭的 Warp API 客户端"""
+    clients = [client for group in list(_warp_clients.values()) for client in group.values()]
+    clients.extend(_evicted_clients)
+    _warp_clients.clear()
+    _evicted_clients.clear()
+    for client in clients:
+        await _aclose_quietly(client)
+
 
 def _get(d: Dict[str, Any], *names: str) -> Any:
     """Return the first matching key value (camelCase/snake_case tolerant)."""
@@ -29,6 +108,16 @@ def _get(d: Dict[str, Any], *names: str) -> Any:
     return None
 
 
+def _log_client_exception(title: str, exc: BaseException, url: Optional[str], size: Optional[int]) -> None:
+    """以单条日志记录输出客户端异常，traceback 由 handler 通过 exc_info 渲染"""
+    logger.error(
+        "%s %s: %s url=%s size=%s", title, type(exc).__name__, exc, url, size,
+        extra={"exc_type": type(exc).__name__, "request_url": url, "request_size": size},
+        exc_info=True,
+        stacklevel=2,
+    )
+
+
 def _get_event_type(event_data: dict) -> str:
     """Determine the type of SSE event for logging"""
     if "init" in event_data:
@@ -116,6 +205,48 @@ def _extract_text_from_message(message: Dict[str, Any]) -> str:
     return ""
 
 
+def _handle_update_task_message(payload: Dict[str, Any], complete_response: list) -> None:
+    """处理 update_task_message 动作"""
+    text_content = _extract_text_from_message(payload.get("message", {}))
+    if text_content:
+        complete_response.append(text_content)
+        logger.info(f"   📝 Text from UPDATE_MESSAGE: {text_content}")
+
+
+def _handle_append_to_message_content(payload: Dict[str, Any], complete_response: list) -> None:
+    """处理 append_to_message_content 动作"""
+    message = payload.get("message", {})
+    if not isinstance(message, dict):
+        return
+    agent_output = _get(message, "agent_output", "agentOutput") or {}
+    text_content = agent_output.get("text", "")
+    if text_content:
+        complete_response.append(text_content)
+        logger.info(f"   📝 Text Fragment: {text_content}")
+
+
+def _handle_add_messages_to_task(payload: Dict[str, Any], complete_response: list) -> Optional[str]:
+    """处理 add_messages_to_task 动作，返回其中携带的 task_id（如有）"""
+    for j, message in enumerate(payload.get("messages", [])):
+        logger.info(f"   📨 Message #{j + 1}: {list(message.keys())}")
+        text_content = _extract_text_from_message(message)
+        if text_content:
+            complete_response.append(text_content)
+            logger.info(f"   📝 Complete Message: {text_content}")
+    return payload.get("task_id") or payload.get("taskId")
+
+
+# 动作类型 -> 处理函数（同时兼容 snake_case 与 camelCase 键名）
+_ACTION_HANDLERS = {
+    "update_task_message": _handle_update_task_message,
+    "updateTaskMessage": _handle_update_task_message,
+    "append_to_message_content": _handle_append_to_message_content,
+    "appendToMessageContent": _handle_append_to_message_content,
+    "add_messages_to_task": _handle_add_messages_to_task,
+    "addMessagesToTask": _handle_add_messages_to_task,
+}
+
+
 async def send_protobuf_to_warp_api(
         protobuf_bytes: bytes, show_all_events: bool = True
 ) -> None | tuple[str, None, None] | tuple[LiteralString, Any | None, Any | None] | tuple[str, Any | None, Any | None]:
@@ -177,237 +308,196 @@ async def send_protobuf_to_warp_api(
                     else:
                         logger.warning("无法获取代理，使用直连")
 
-                    # 创建带代理的客户端
-                    client_config = {
-                        "http2": True,
-                        "timeout": httpx.Timeout(60.0),
-                        "verify": verify_opt,
-                        "trust_env": True
+                    headers = {
+                        "accept": "text/event-stream",
+                        "content-type": "application/x-protobuf",
+                        "x-warp-client-version": "v0.2025.08.06.08.12.stable_02",
+                        "x-warp-os-category": "Windows",
+                        "x-warp-os-name": "Windows",
+                        "x-warp-os-version": "11 (26100)",
+                        "authorization": f"Bearer {jwt}",
+                        "content-length": str(len(protobuf_bytes)),
                     }
 
-                    # 如果有代理配置，添加代理参数
-                    if proxy_config:
-                        client_config["proxies"] = proxy_config
-
-                    async with httpx.AsyncClient(**client_config) as client:
-                        headers = {
-                            "accept": "text/event-stream",
-                            "content-type": "application/x-protobuf",
-                            "x-warp-client-version": "v0.2025.08.06.08.12.stable_02",
-                            "x-warp-os-category": "Windows",
-                            "x-warp-os-name": "Windows",
-                            "x-warp-os-version": "11 (26100)",
-                            "authorization": f"Bearer {jwt}",
-                            "content-length": str(len(protobuf_bytes)),
-                        }
-
-                        async with client.stream("POST", warp_url, headers=headers, content=protobuf_bytes) as response:
-                            # 如果请求成功，处理响应
-                            if response.status_code == 200:
-                                logger.info(f"✅ 收到HTTP {response.status_code}响应")
-                                logger.info("开始处理SSE事件流...")
-
-                                import re as _re
-                                def _parse_payload_bytes(data_str: str):
-                                    s = _re.sub(r"\\s+", "", data_str or "")
-                                    if not s: return None
-                                    if _re.fullmatch(r"[0-9a-fA-F]+", s or ""):
-                                        try:
-                                            return bytes.fromhex(s)
-                                        except Exception:
-                                            pass
-                                    pad = "=" * ((4 - (len(s) % 4)) % 4)
+                    # 复用按代理缓存的长连接客户端，避免每次尝试都重新握手
+                    async with _warp_client(proxy_config, verify_opt) as client, \
+                            client.stream("POST", warp_url, headers=headers, content=protobuf_bytes) as response:
+                        # 如果请求成功，处理响应
+                        if response.status_code == 200:
+                            logger.info(f"✅ 收到HTTP {response.status_code}响应")
+                            logger.info("开始处理SSE事件流...")
+
+                            import re as _re
+                            def _parse_payload_bytes(data_str: str):
+                                s = _re.sub(r"\\s+", "", data_str or "")
+                                if not s: return None
+                                if _re.fullmatch(r"[0-9a-fA-F]+", s or ""):
                                     try:
-                                        import base64 as _b64
-                                        return _b64.urlsafe_b64decode(s + pad)
+                                        return bytes.fromhex(s)
                                     except Exception:
-                                        try:
-                                            return _b64.b64decode(s + pad)
-                                        except Exception:
-                                            return None
-
-                                current_data = ""
-
-                                async for line in response.aiter_lines():
-                                    if line.startswith("data:"):
-                                        payload = line[5:].strip()
-                                        if not payload: continue
-                                        if payload == "[DONE]":
-                                            logger.info("收到[DONE]标记，结束处理")
-                                            break
-                                        current_data += payload
+                                        pass
+                                pad = "=" * ((4 - (len(s) % 4)) % 4)
+                                try:
+                                    import base64 as _b64
+                                    return _b64.urlsafe_b64decode(s + pad)
+                                except Exception:
+                                    try:
+                                        return _b64.b64decode(s + pad)
+                                    except Exception:
+                                        return None
+
+                            current_data = ""
+
+                            async for line in response.aiter_lines():
+                                if line.startswith("data:"):
+                                    payload = line[5:].strip()
+                                    if not payload: continue
+                                    if payload == "[DONE]":
+                                        logger.info("收到[DONE]标记，结束处理")
+                                        break
+                                    current_data += payload
+                                    continue
+
+                                if (line.strip() == "") and current_data:
+                                    raw_bytes = _parse_payload_bytes(current_data)
+                                    current_data = ""
+                                    if raw_bytes is None:
+                                        logger.debug("跳过无法解析的SSE数据块（非hex/base64或不完整）")
                                         continue
+                                    try:
+                                        event_data = protobuf_to_dict(raw_bytes,
+                                                                      "warp.multi_agent.v1.ResponseEvent")
+                                    except Exception as parse_error:
+                                        logger.debug(f"解析事件失败，跳过: {str(parse_error)[:100]}")
+                                        continue
+                                    event_count += 1
+
+                                    def _get(d: Dict[str, Any], *names: str) -> Any:
+                                        for n in names:
+                                            if isinstance(d, dict) and n in d:
+                                                return d[n]
+                                        return None
+
+                                    event_type = _get_event_type(event_data)
+                                    if show_all_events:
+                                        all_events.append(
+                                            {"event_number": event_count, "event_type": event_type,
+                                             "raw_data": event_data})
+                                    logger.info(f"🔄 Event #{event_count}: {event_type}")
+                                    if show_all_events:
+                                        logger.info(f"   📋 Event data: {str(event_data)}")
+
+                                    if "init" in event_data:
+                                        init_get = event_data["init"].get
+                                        conversation_id = init_get("conversation_id", conversation_id)
+                                        task_id = init_get("task_id", task_id)
+                                        logger.info(f"会话初始化: {conversation_id}")
+
+                                    client_actions = _get(event_data, "client_actions", "clientActions")
+                                    if isinstance(client_actions, dict):
+                                        actions = _get(client_actions, "actions", "Actions") or []
+                                        for i, action in enumerate(actions):
+                                            logger.info(f"   🎯 Action #{i + 1}: {list(action.keys())}")
+
+                                            for kind, action_payload in action.items():
+                                                handler = _ACTION_HANDLERS.get(kind)
+                                                if handler is not None and isinstance(action_payload, dict):
+                                                    new_task_id = handler(action_payload, complete_response)
+                                                    if new_task_id:
+                                                        task_id = new_task_id
+
+                            full_response = "".join(complete_response)
+                            logger.info("=" * 60)
+                            logger.info("📊 SSE STREAM SUMMARY")
+                            logger.info("=" * 60)
+                            logger.info(f"📈 Total Events Processed: {event_count}")
+                            logger.info(f"🆔 Conversation ID: {conversation_id}")
+                            logger.info(f"🆔 Task ID: {task_id}")
+                            logger.info(f"📝 Response Length: {len(full_response)} characters")
+                            logger.info("=" * 60)
+
+                            # 成功完成，释放会话并返回结果
+                            await release_pool_session(current_session.get("session_id"))
+                            current_session = None
 
-                                    if (line.strip() == "") and current_data:
-                                        raw_bytes = _parse_payload_bytes(current_data)
-                                        current_data = ""
-                                        if raw_bytes is None:
-                                            logger.debug("跳过无法解析的SSE数据块（非hex/base64或不完整）")
-                                            continue
-                                        try:
-                                            event_data = protobuf_to_dict(raw_bytes,
-                                                                          "warp.multi_agent.v1.ResponseEvent")
-                                        except Exception as parse_error:
-                                            logger.debug(f"解析事件失败，跳过: {str(parse_error)[:100]}")
-                                            continue
-                                        event_count += 1
-
-                                        def _get(d: Dict[str, Any], *names: str) -> Any:
-                                            for n in names:
-                                                if isinstance(d, dict) and n in d:
-                                                    return d[n]
-                                            return None
-
-                                        event_type = _get_event_type(event_data)
-                                        if show_all_events:
-                                            all_events.append(
-                                                {"event_number": event_count, "event_type": event_type,
-                                                 "raw_data": event_data})
-                                        logger.info(f"🔄 Event #{event_count}: {event_type}")
-                                        if show_all_events:
-                                            logger.info(f"   📋 Event data: {str(event_data)}")
-
-                                        if "init" in event_data:
-                                            init_data = event_data["init"]
-                                            conversation_id = init_data.get("conversation_id", conversation_id)
-                                            task_id = init_data.get("task_id", task_id)
-                                            logger.info(f"会话初始化: {conversation_id}")
+                            if full_response:
+                                logger.info(f"✅ Stream processing completed successfully")
+                                return full_response, conversation_id, task_id
+                            else:
+                                logger.warning("⚠️ No text content received in response")
+                                return "Warning: No response content received", conversation_id, task_id
+
+                        # --- 处理错误响应 ---
+                        error_text = await response.aread()
+                        error_content = error_text.decode('utf-8') if error_text else "No error content"
+
+                        # 检查是否是账号被封禁错误 (403)
+                        is_blocked_error = (
+                                response.status_code == 403 and (
+                                ("Your account has been blocked" in error_content) or
+                                ("blocked from using AI features" in error_content)
+                        )
+                        )
+
+                        if is_blocked_error:
+                            logger.error(f"❌ 账号 {account_email} 已被封禁 (HTTP 403)")
+                            # 释放并标记为blocked
+                            if current_session:
+                                # 通知pool service标记账号
+                                try:
+                                    async with httpx.AsyncClient(timeout=5.0) as notify_client:
+                                        await notify_client.post(
+                                            "http://localhost:8019/api/accounts/mark_blocked",
+                                            json={"email": account_email}
+                                        )
+                                except:
+                                    pass
 
-                                        client_actions = _get(event_data, "client_actions", "clientActions")
-                                        if isinstance(client_actions, dict):
-                                            actions = _get(client_actions, "actions", "Actions") or []
-                                            for i, action in enumerate(actions):
-                                                logger.info(f"   🎯 Action #{i + 1}: {list(action.keys())}")
+                                await release_pool_session(current_session.get("session_id"))
+                                current_session = None
 
-                                                # 处理 update_task_message（新增）
-                                                update_msg_data = _get(action, "update_task_message",
-                                                                       "updateTaskMessage")
-                                                if isinstance(update_msg_data, dict):
-                                                    message = update_msg_data.get("message", {})
-                                                    text_content = _extract_text_from_message(message)
-                                                    if text_content:
-                                                        complete_response.append(text_content)
-                                                        logger.info(
-                                                            f"   📝 Text from UPDATE_MESSAGE: {text_content}")
-
-                                                # 处理 append_to_message_content
-                                                append_data = _get(action, "append_to_message_content",
-                                                                   "appendToMessageContent")
-                                                if isinstance(append_data, dict):
-                                                    message = append_data.get("message", {})
-                                                    agent_output = _get(message, "agent_output", "agentOutput") or {}
-                                                    text_content = agent_output.get("text", "")
-                                                    if text_content:
-                                                        complete_response.append(text_content)
-                                                        logger.info(f"   📝 Text Fragment: {text_content}")
-
-                                                # 处理 add_messages_to_task
-                                                messages_data = _get(action, "add_messages_to_task",
-                                                                     "addMessagesToTask")
-                                                if isinstance(messages_data, dict):
-                                                    messages = messages_data.get("messages", [])
-                                                    task_id = messages_data.get("task_id",
-                                                                                messages_data.get("taskId", task_id))
-                                                    for j, message in enumerate(messages):
-                                                        logger.info(f"   📨 Message #{j + 1}: {list(message.keys())}")
-                                                        text_content = _extract_text_from_message(message)
-                                                        if text_content:
-                                                            complete_response.append(text_content)
-                                                            logger.info(
-                                                                f"   📝 Complete Message: {text_content}")
-
-                                full_response = "".join(complete_response)
-                                logger.info("=" * 60)
-                                logger.info("📊 SSE STREAM SUMMARY")
-                                logger.info("=" * 60)
-                                logger.info(f"📈 Total Events Processed: {event_count}")
-                                logger.info(f"🆔 Conversation ID: {conversation_id}")
-                                logger.info(f"🆔 Task ID: {task_id}")
-                                logger.info(f"📝 Response Length: {len(full_response)} characters")
-                                logger.info("=" * 60)
-
-                                # 成功完成，释放会话并返回结果
+                            # 如果还有重试次数，获取新账号
+                            if attempt < (MAX_QUOTA_RETRIES - 1):
+                                logger.warning(
+                                    f"账号被封，将获取新账号重试 (第 {attempt + 2}/{MAX_QUOTA_RETRIES} 次)...")
+                                await asyncio.sleep(RETRY_DELAY_SECONDS)
+                                break  # 跳出代理循环，进入下一个attempt获取新账号
+                            else:
+                                return f"❌ Account blocked after {MAX_QUOTA_RETRIES} attempts", None, None
+
+                        # 检查是否是配额用尽错误
+                        is_quota_error = ("No remaining quota" in error_content) or (
+                                "No AI requests remaining" in error_content)
+
+                        if response.status_code == 429 and is_quota_error:
+                            if attempt < (MAX_QUOTA_RETRIES - 1):
+                                logger.warning(
+                                    f"Warp API 返回 429 (配额用尽)。将在 {RETRY_DELAY_SECONDS} 秒后强制获取新账号并重试 (第 {attempt + 2}/{MAX_QUOTA_RETRIES} 次)...")
+                                await asyncio.sleep(RETRY_DELAY_SECONDS)
+                                # 跳出代理循环，进入下一个attempt获取新账号
+                                break
+                            else:
+                                # 所有账号都用尽了
                                 await release_pool_session(current_session.get("session_id"))
                                 current_session = None
+                                return f"❌ API Error (HTTP {response.status_code}) after {MAX_QUOTA_RETRIES} attempts: {error_content}", None, None
 
-                                if full_response:
-                                    logger.info(f"✅ Stream processing completed successfully")
-                                    return full_response, conversation_id, task_id
-                                else:
-                                    logger.warning("⚠️ No text content received in response")
-                                    return "Warning: No response content received", conversation_id, task_id
-
-                            # --- 处理错误响应 ---
-                            error_text = await response.aread()
-                            error_content = error_text.decode('utf-8') if error_text else "No error content"
-
-                            # 检查是否是账号被封禁错误 (403)
-                            is_blocked_error = (
-                                    response.status_code == 403 and (
-                                    ("Your account has been blocked" in error_content) or
-                                    ("blocked from using AI features" in error_content)
-                            )
-                            )
-
-                            if is_blocked_error:
-                                logger.error(f"❌ 账号 {account_email} 已被封禁 (HTTP 403)")
-                                # 释放并标记为blocked
-                                if current_session:
-                                    # 通知pool service标记账号
-                                    try:
-                                        async with httpx.AsyncClient(timeout=5.0) as notify_client:
-                                            await notify_client.post(
-                                                "http://localhost:8019/api/accounts/mark_blocked",
-                                                json={"email": account_email}
-                                            )
-                                    except:
-                                        pass
+                        # 其他HTTP错误，尝试换代理
+                        logger.error(
+                            f"HTTP错误 {response.status_code}，尝试换代理 (proxy attempt {proxy_attempt + 1}/{max_proxy_retries})")
+                        if proxy_attempt < max_proxy_retries - 1:
+                            await asyncio.sleep(0.5)
+                            continue  # 继续下一个proxy_attempt
 
-                                    await release_pool_session(current_session.get("session_id"))
-                                    current_session = None
-
-                                # 如果还有重试次数，获取新账号
-                                if attempt < (MAX_QUOTA_RETRIES - 1):
-                                    logger.warning(
-                                        f"账号被封，将获取新账号重试 (第 {attempt + 2}/{MAX_QUOTA_RETRIES} 次)...")
-                                    await asyncio.sleep(RETRY_DELAY_SECONDS)
-                                    break  # 跳出代理循环，进入下一个attempt获取新账号
-                                else:
-                                    return f"❌ Account blocked after {MAX_QUOTA_RETRIES} attempts", None, None
-
-                            # 检查是否是配额用尽错误
-                            is_quota_error = ("No remaining quota" in error_content) or (
-                                    "No AI requests remaining" in error_content)
-
-                            if response.status_code == 429 and is_quota_error:
-                                if attempt < (MAX_QUOTA_RETRIES - 1):
-                                    logger.warning(
-                                        f"Warp API 返回 429 (配额用尽)。将在 {RETRY_DELAY_SECONDS} 秒后强制获取新账号并重试 (第 {attempt + 2}/{MAX_QUOTA_RETRIES} 次)...")
-                                    await asyncio.sleep(RETRY_DELAY_SECONDS)
-                                    # 跳出代理循环，进入下一个attempt获取新账号
-                                    break
-                                else:
-                                    # 所有账号都用尽了
-                                    await release_pool_session(current_session.get("session_id"))
-                                    current_session = None
-                                    return f"❌ API Error (HTTP {response.status_code}) after {MAX_QUOTA_RETRIES} attempts: {error_content}", None, None
-
-                            # 其他HTTP错误，尝试换代理
-                            logger.error(
-                                f"HTTP错误 {response.status_code}，尝试换代理 (proxy attempt {proxy_attempt + 1}/{max_proxy_retries})")
-                            if proxy_attempt < max_proxy_retries - 1:
-                                await asyncio.sleep(0.5)
-                                continue  # 继续下一个proxy_attempt
-
-                            # 所有代理都失败，如果还有账号重试次数，换账号
-                            if attempt < (MAX_QUOTA_RETRIES - 1):
-                                logger.warning(f"当前账号的所有代理都失败，将换新账号重试")
-                                break  # 跳出代理循环
+                        # 所有代理都失败，如果还有账号重试次数，换账号
+                        if attempt < (MAX_QUOTA_RETRIES - 1):
+                            logger.warning(f"当前账号的所有代理都失败，将换新账号重试")
+                            break  # 跳出代理循环
 
-                            # 真正失败了
-                            await release_pool_session(current_session.get("session_id"))
-                            current_session = None
-                            return f"❌ API Error (HTTP {response.status_code}): {error_content}", None, None
+                        # 真正失败了
+                        await release_pool_session(current_session.get("session_id"))
+                        current_session = None
+                        return f"❌ API Error (HTTP {response.status_code}): {error_content}", None, None
 
                 except (httpx.ConnectError, httpx.ProxyError, httpx.RemoteProtocolError) as ssl_error:
                     logger.warning(f"SSL/代理错误 (proxy attempt {proxy_attempt + 1}/{max_proxy_retries}): {ssl_error}")
@@ -432,16 +522,7 @@ async def send_protobuf_to_warp_api(
                     raise
 
     except Exception as e:
-        import traceback
-        logger.error("=" * 60)
-        logger.error("WARP API CLIENT EXCEPTION")
-        logger.error("=" * 60)
-        logger.error(f"Exception Type: {type(e).__name__}")
-        logger.error(f"Exception Message: {str(e)}")
-        logger.error(f"Request Size: {len(protobuf_bytes) if 'protobuf_bytes' in locals() else 'Unknown'}")
-        logger.error("Python Traceback:")
-        logger.error(traceback.format_exc())
-        logger.error("=" * 60)
+        _log_client_exception("WARP API CLIENT EXCEPTION", e, locals().get("warp_url"), len(protobuf_bytes))
         raise
     finally:
         # 确保会话被释放
@@ -507,234 +588,190 @@ async def send_protobuf_to_warp_api_parsed(protobuf_bytes: bytes) -> None | tupl
                     else:
                         logger.warning("无法获取代理，使用直连(解析模式)")
 
-                    # 创建带代理的客户端
-                    client_config = {
-                        "http2": True,
-                        "timeout": httpx.Timeout(60.0),
-                        "verify": verify_opt,
-                        "trust_env": True
+                    headers = {
+                        "accept": "text/event-stream",
+                        "content-type": "application/x-protobuf",
+                        "x-warp-client-version": "v0.2025.08.06.08.12.stable_02",
+                        "x-warp-os-category": "Windows",
+                        "x-warp-os-name": "Windows",
+                        "x-warp-os-version": "11 (26100)",
+                        "authorization": f"Bearer {jwt}",
+                        "content-length": str(len(protobuf_bytes)),
                     }
 
-                    # 如果有代理配置，添加代理参数
-                    if proxy_config:
-                        client_config["proxy"] = proxy_config
-
-                    async with httpx.AsyncClient(**client_config) as client:
-                        headers = {
-                            "accept": "text/event-stream",
-                            "content-type": "application/x-protobuf",
-                            "x-warp-client-version": "v0.2025.08.06.08.12.stable_02",
-                            "x-warp-os-category": "Windows",
-                            "x-warp-os-name": "Windows",
-                            "x-warp-os-version": "11 (26100)",
-                            "authorization": f"Bearer {jwt}",
-                            "content-length": str(len(protobuf_bytes)),
-                        }
-
-                        async with client.stream("POST", warp_url, headers=headers, content=protobuf_bytes) as response:
-                            # 如果请求成功，在这里处理响应
-                            if response.status_code == 200:
-                                logger.info(f"✅ 收到HTTP {response.status_code}响应 (解析模式)")
-                                logger.info("开始处理SSE事件流...")
-
-                                # 处理响应流
-                                import re as _re2
-                                def _parse_payload_bytes2(data_str: str):
-                                    s = _re2.sub(r"\\s+", "", data_str or "")
-                                    if not s: return None
-                                    if _re2.fullmatch(r"[0-9a-fA-F]+", s or ""):
-                                        try:
-                                            return bytes.fromhex(s)
-                                        except Exception:
-                                            pass
-                                    pad = "=" * ((4 - (len(s) % 4)) % 4)
+                    # 复用按代理缓存的长连接客户端，避免每次尝试都重新握手
+                    async with _warp_client(proxy_config, verify_opt) as client, \
+                            client.stream("POST", warp_url, headers=headers, content=protobuf_bytes) as response:
+                        # 如果请求成功，在这里处理响应
+                        if response.status_code == 200:
+                            logger.info(f"✅ 收到HTTP {response.status_code}响应 (解析模式)")
+                            logger.info("开始处理SSE事件流...")
+
+                            # 处理响应流
+                            import re as _re2
+                            def _parse_payload_bytes2(data_str: str):
+                                s = _re2.sub(r"\\s+", "", data_str or "")
+                                if not s: return None
+                                if _re2.fullmatch(r"[0-9a-fA-F]+", s or ""):
+                                    try:
+                                        return bytes.fromhex(s)
+                                    except Exception:
+                                        pass
+                                pad = "=" * ((4 - (len(s) % 4)) % 4)
+                                try:
+                                    import base64 as _b642
+                                    return _b642.urlsafe_b64decode(s + pad)
+                                except Exception:
                                     try:
-                                        import base64 as _b642
-                                        return _b642.urlsafe_b64decode(s + pad)
+                                        return _b642.b64decode(s + pad)
                                     except Exception:
-                                        try:
-                                            return _b642.b64decode(s + pad)
-                                        except Exception:
+                                        return None
+
+                            current_data = ""
+
+                            async for line in response.aiter_lines():
+                                if line.startswith("data:"):
+                                    payload = line[5:].strip()
+                                    if not payload: continue
+                                    if payload == "[DONE]":
+                                        logger.info("收到[DONE]标记，结束处理")
+                                        break
+                                    current_data += payload
+                                    continue
+
+                                if (line.strip() == "") and current_data:
+                                    raw_bytes = _parse_payload_bytes2(current_data)
+                                    current_data = ""
+                                    if raw_bytes is None:
+                                        logger.debug("跳过无法解析的SSE数据块（非hex/base64或不完整）")
+                                        continue
+                                    try:
+                                        event_data = protobuf_to_dict(raw_bytes,
+                                                                      "warp.multi_agent.v1.ResponseEvent")
+                                        event_count += 1
+                                        event_type = _get_event_type(event_data)
+                                        parsed_event = {"event_number": event_count, "event_type": event_type,
+                                                        "parsed_data": event_data}
+                                        parsed_events.append(parsed_event)
+                                        logger.info(f"🔄 Event #{event_count}: {event_type}")
+                                        logger.debug(f"   📋 Event data: {str(event_data)}")
+
+                                        def _get(d: Dict[str, Any], *names: str) -> Any:
+                                            for n in names:
+                                                if isinstance(d, dict) and n in d:
+                                                    return d[n]
                                             return None
 
-                                current_data = ""
+                                        if "init" in event_data:
+                                            init_get = event_data["init"].get
+                                            conversation_id = init_get("conversation_id", conversation_id)
+                                            task_id = init_get("task_id", task_id)
+                                            logger.info(f"会话初始化: {conversation_id}")
 
-                                async for line in response.aiter_lines():
-                                    if line.startswith("data:"):
-                                        payload = line[5:].strip()
-                                        if not payload: continue
-                                        if payload == "[DONE]":
-                                            logger.info("收到[DONE]标记，结束处理")
-                                            break
-                                        current_data += payload
+                                        client_actions = _get(event_data, "client_actions", "clientActions")
+                                        if isinstance(client_actions, dict):
+                                            actions = _get(client_actions, "actions", "Actions") or []
+                                            for i, action in enumerate(actions):
+                                                logger.info(f"   🎯 Action #{i + 1}: {list(action.keys())}")
+
+                                                for kind, action_payload in action.items():
+                                                    handler = _ACTION_HANDLERS.get(kind)
+                                                    if handler is not None and isinstance(action_payload, dict):
+                                                        new_task_id = handler(action_payload, complete_response)
+                                                        if new_task_id:
+                                                            task_id = new_task_id
+                                    except Exception as parse_err:
+                                        logger.debug(f"解析事件失败，跳过: {str(parse_err)}")
                                         continue
 
-                                    if (line.strip() == "") and current_data:
-                                        raw_bytes = _parse_payload_bytes2(current_data)
-                                        current_data = ""
-                                        if raw_bytes is None:
-                                            logger.debug("跳过无法解析的SSE数据块（非hex/base64或不完整）")
-                                            continue
-                                        try:
-                                            event_data = protobuf_to_dict(raw_bytes,
-                                                                          "warp.multi_agent.v1.ResponseEvent")
-                                            event_count += 1
-                                            event_type = _get_event_type(event_data)
-                                            parsed_event = {"event_number": event_count, "event_type": event_type,
-                                                            "parsed_data": event_data}
-                                            parsed_events.append(parsed_event)
-                                            logger.info(f"🔄 Event #{event_count}: {event_type}")
-                                            logger.debug(f"   📋 Event data: {str(event_data)}")
-
-                                            def _get(d: Dict[str, Any], *names: str) -> Any:
-                                                for n in names:
-                                                    if isinstance(d, dict) and n in d:
-                                                        return d[n]
-                                                return None
-
-                                            if "init" in event_data:
-                                                init_data = event_data["init"]
-                                                conversation_id = init_data.get("conversation_id", conversation_id)
-                                                task_id = init_data.get("task_id", task_id)
-                                                logger.info(f"会话初始化: {conversation_id}")
-
-                                            client_actions = _get(event_data, "client_actions", "clientActions")
-                                            if isinstance(client_actions, dict):
-                                                actions = _get(client_actions, "actions", "Actions") or []
-                                                for i, action in enumerate(actions):
-                                                    logger.info(f"   🎯 Action #{i + 1}: {list(action.keys())}")
-
-                                                    # 处理 update_task_message（新增）
-                                                    update_msg_data = _get(action, "update_task_message",
-                                                                           "updateTaskMessage")
-                                                    if isinstance(update_msg_data, dict):
-                                                        message = update_msg_data.get("message", {})
-                                                        text_content = _extract_text_from_message(message)
-                                                        if text_content:
-                                                            complete_response.append(text_content)
-                                                            logger.info(
-                                                                f"   📝 Text from UPDATE_MESSAGE: {text_content}")
-
-                                                    # 处理 append_to_message_content
-                                                    append_data = _get(action, "append_to_message_content",
-                                                                       "appendToMessageContent")
-                                                    if isinstance(append_data, dict):
-                                                        message = append_data.get("message", {})
-                                                        agent_output = _get(message, "agent_output",
-                                                                            "agentOutput") or {}
-                                                        text_content = agent_output.get("text", "")
-                                                        if text_content:
-                                                            complete_response.append(text_content)
-                                                            logger.info(f"   📝 Text Fragment: {text_content}")
-
-                                                    # 处理 add_messages_to_task
-                                                    messages_data = _get(action, "add_messages_to_task",
-                                                                         "addMessagesToTask")
-                                                    if isinstance(messages_data, dict):
-                                                        messages = messages_data.get("messages", [])
-                                                        task_id = messages_data.get("task_id",
-                                                                                    messages_data.get("taskId",
-                                                                                                      task_id))
-                                                        for j, message in enumerate(messages):
-                                                            logger.info(
-                                                                f"   📨 Message #{j + 1}: {list(message.keys())}")
-                                                            text_content = _extract_text_from_message(message)
-                                                            if text_content:
-                                                                complete_response.append(text_content)
-                                                                logger.info(
-                                                                    f"   📝 Complete Message: {text_content}")
-                                        except Exception as parse_err:
-                                            logger.debug(f"解析事件失败，跳过: {str(parse_err)}")
-                                            continue
-
-                                # 成功处理完响应，生成结果并返回
-                                full_response = "".join(complete_response)
-                                logger.info("=" * 60)
-                                logger.info("📊 SSE STREAM SUMMARY (解析模式)")
-                                logger.info("=" * 60)
-                                logger.info(f"📈 Total Events Processed: {event_count}")
-                                logger.info(f"🆔 Conversation ID: {conversation_id}")
-                                logger.info(f"🆔 Task ID: {task_id}")
-                                logger.info(f"📝 Response Length: {len(full_response)} characters")
-                                logger.info(f"🎯 Parsed Events Count: {len(parsed_events)}")
-                                logger.info("=" * 60)
-
-                                # 成功完成，释放会话并返回结果
+                            # 成功处理完响应，生成结果并返回
+                            full_response = "".join(complete_response)
+                            logger.info("=" * 60)
+                            logger.info("📊 SSE STREAM SUMMARY (解析模式)")
+                            logger.info("=" * 60)
+                            logger.info(f"📈 Total Events Processed: {event_count}")
+                            logger.info(f"🆔 Conversation ID: {conversation_id}")
+                            logger.info(f"🆔 Task ID: {task_id}")
+                            logger.info(f"📝 Response Length: {len(full_response)} characters")
+                            logger.info(f"🎯 Parsed Events Count: {len(parsed_events)}")
+                            logger.info("=" * 60)
+
+                            # 成功完成，释放会话并返回结果
+                            await release_pool_session(current_session.get("session_id"))
+                            current_session = None
+
+                            logger.info(f"✅ Stream processing completed successfully (解析模式)")
+                            return full_response, conversation_id, task_id, parsed_events
+
+                        # 错误处理（429等）
+                        error_text = await response.aread()
+                        error_content = error_text.decode('utf-8') if error_text else "No error content"
+
+                        # 检查是否是账号被封禁错误 (403)
+                        is_blocked_error = (
+                                response.status_code == 403 and (
+                                ("Your account has been blocked" in error_content) or
+                                ("blocked from using AI features" in error_content)
+                        )
+                        )
+
+                        if is_blocked_error:
+                            logger.error(f"❌ 账号 {account_email} 已被封禁 (HTTP 403, 解析模式)")
+                            # 释放并标记为blocked
+                            if current_session:
+                                # 通知pool service标记账号
+                                try:
+                                    async with httpx.AsyncClient(timeout=5.0) as notify_client:
+                                        await notify_client.post(
+                                            "http://localhost:8019/api/accounts/mark_blocked",
+                                            json={"email": account_email}
+                                        )
+                                except:
+                                    pass
+
                                 await release_pool_session(current_session.get("session_id"))
                                 current_session = None
 
-                                logger.info(f"✅ Stream processing completed successfully (解析模式)")
-                                return full_response, conversation_id, task_id, parsed_events
-
-                            # 错误处理（429等）
-                            error_text = await response.aread()
-                            error_content = error_text.decode('utf-8') if error_text else "No error content"
-
-                            # 检查是否是账号被封禁错误 (403)
-                            is_blocked_error = (
-                                    response.status_code == 403 and (
-                                    ("Your account has been blocked" in error_content) or
-                                    ("blocked from using AI features" in error_content)
-                            )
-                            )
-
-                            if is_blocked_error:
-                                logger.error(f"❌ 账号 {account_email} 已被封禁 (HTTP 403, 解析模式)")
-                                # 释放并标记为blocked
-                                if current_session:
-                                    # 通知pool service标记账号
-                                    try:
-                                        async with httpx.AsyncClient(timeout=5.0) as notify_client:
-                                            await notify_client.post(
-                                                "http://localhost:8019/api/accounts/mark_blocked",
-                                                json={"email": account_email}
-                                            )
-                                    except:
-                                        pass
+                            # 如果还有重试次数，获取新账号
+                            if attempt < (MAX_QUOTA_RETRIES - 1):
+                                logger.warning(
+                                    f"账号被封(解析模式)，将获取新账号重试 (第 {attempt + 2}/{MAX_QUOTA_RETRIES} 次)...")
+                                await asyncio.sleep(RETRY_DELAY_SECONDS)
+                                break  # 跳出代理循环，进入下一个attempt获取新账号
+                            else:
+                                return f"❌ Account blocked after {MAX_QUOTA_RETRIES} attempts", None, None, []
 
-                                    await release_pool_session(current_session.get("session_id"))
-                                    current_session = None
-
-                                # 如果还有重试次数，获取新账号
-                                if attempt < (MAX_QUOTA_RETRIES - 1):
-                                    logger.warning(
-                                        f"账号被封(解析模式)，将获取新账号重试 (第 {attempt + 2}/{MAX_QUOTA_RETRIES} 次)...")
-                                    await asyncio.sleep(RETRY_DELAY_SECONDS)
-                                    break  # 跳出代理循环，进入下一个attempt获取新账号
-                                else:
-                                    return f"❌ Account blocked after {MAX_QUOTA_RETRIES} attempts", None, None, []
-
-                            is_quota_error = ("No remaining quota" in error_content) or (
-                                    "No AI requests remaining" in error_content)
-
-                            if response.status_code == 429 and is_quota_error:
-                                if attempt < (MAX_QUOTA_RETRIES - 1):
-                                    logger.warning(
-                                        f"Warp API 返回 429 (配额用尽/解析模式)。将在 {RETRY_DELAY_SECONDS} 秒后强制获取新账号并重试 (第 {attempt + 2}/{MAX_QUOTA_RETRIES} 次)...")
-                                    await asyncio.sleep(RETRY_DELAY_SECONDS)
-                                    # 跳出代理循环，进入下一个attempt获取新账号
-                                    break
-                                else:
-                                    # 所有账号都用尽了
-                                    await release_pool_session(current_session.get("session_id"))
-                                    current_session = None
-                                    return f"❌ API Error (HTTP {response.status_code}) after {MAX_QUOTA_RETRIES} attempts: {error_content}", None, None, []
-
-                            # 其他HTTP错误，尝试换代理
-                            logger.error(
-                                f"HTTP错误 {response.status_code}(解析模式)，尝试换代理 (proxy attempt {proxy_attempt + 1}/{max_proxy_retries})")
-                            if proxy_attempt < max_proxy_retries - 1:
-                                await asyncio.sleep(0.5)
-                                continue
+                        is_quota_error = ("No remaining quota" in error_content) or (
+                                "No AI requests remaining" in error_content)
 
+                        if response.status_code == 429 and is_quota_error:
                             if attempt < (MAX_QUOTA_RETRIES - 1):
-                                logger.warning(f"当前账号的所有代理都失败(解析模式)，将换新账号重试")
+                                logger.warning(
+                                    f"Warp API 返回 429 (配额用尽/解析模式)。将在 {RETRY_DELAY_SECONDS} 秒后强制获取新账号并重试 (第 {attempt + 2}/{MAX_QUOTA_RETRIES} 次)...")
+                                await asyncio.sleep(RETRY_DELAY_SECONDS)
+                                # 跳出代理循环，进入下一个attempt获取新账号
                                 break
+                            else:
+                                # 所有账号都用尽了
+                                await release_pool_session(current_session.get("session_id"))
+                                current_session = None
+                                return f"❌ API Error (HTTP {response.status_code}) after {MAX_QUOTA_RETRIES} attempts: {error_content}", None, None, []
 
-                            # 真正失败了
-                            await release_pool_session(current_session.get("session_id"))
-                            current_session = None
-                            return f"❌ API Error (HTTP {response.status_code}): {error_content}", None, None, []
+                        # 其他HTTP错误，尝试换代理
+                        logger.error(
+                            f"HTTP错误 {response.status_code}(解析模式)，尝试换代理 (proxy attempt {proxy_attempt + 1}/{max_proxy_retries})")
+                        if proxy_attempt < max_proxy_retries - 1:
+                            await asyncio.sleep(0.5)
+                            continue
+
+                        if attempt < (MAX_QUOTA_RETRIES - 1):
+                            logger.warning(f"当前账号的所有代理都失败(解析模式)，将换新账号重试")
+                            break
+
+                        # 真正失败了
+                        await release_pool_session(current_session.get("session_id"))
+                        current_session = None
+                        return f"❌ API Error (HTTP {response.status_code}): {error_content}", None, None, []
 
                 except (httpx.ConnectError, httpx.ProxyError, httpx.RemoteProtocolError) as ssl_error:
                     logger.warning(
@@ -768,17 +805,7 @@ async def send_protobuf_to_warp_api_parsed(protobuf_bytes: bytes) -> None | tupl
         return "❌ All retry attempts failed", None, None, []
 
     except Exception as e:
-        import traceback
-        logger.error("=" * 60)
-        logger.error("WARP API CLIENT EXCEPTION (解析模式)")
-        logger.error("=" * 60)
-        logger.error(f"Exception Type: {type(e).__name__}")
-        logger.error(f"Exception Message: {str(e)}")
-        logger.error(f"Request URL: {warp_url if 'warp_url' in locals() else 'Unknown'}")
-        logger.error(f"Request Size: {len(protobuf_bytes) if 'protobuf_bytes' in locals() else 'Unknown'}")
-        logger.error("Python Traceback:")
-        logger.error(traceback.format_exc())
-        logger.error("=" * 60)
+        _log_client_exception("WARP API CLIENT EXCEPTION (解析模式)", e, locals().get("warp_url"), len(protobuf_bytes))
         # ⚠️ 新增：异常时也返回正确格式
         if current_session:
             await release_pool_session(current_session.get("session_id"))
@@ -6,24 +6,34 @@ Warp账号注册脚本
 """
 
 import asyncio
-import copy
-import email as email_lib
+import base64
+import functools
 import html
 import imaplib
+import itertools
 import logging
+import logging.handlers
+import os
+import queue
 import random
 import re
-import secrets
 import ssl
+import sys
 import time
 import uuid
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Dict, Any, Optional
-from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
+from email import policy
+from email.parser import BytesParser
+from pathlib import Path
+from types import MappingProxyType
+from typing import Dict, Any, Mapping, Optional
+from urllib.parse import urlparse, parse_qs, quote_plus
 
 import aiosqlite
 import httpx
-from fake_useragent import UserAgent
+import orjson
+from selectolax.lexbor import LexborHTMLParser
 
 # ==================== 配置部分 ====================
 import config
@@ -35,8 +45,480 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# User Agent生成器
-ua = UserAgent()
+# Warp登录页地址（Firebase邮件链接的continueUrl）
+WARP_LOGIN_URL = "https://app.warp.dev/login"
+
+# 常见桌面浏览器 UA，只做 random.choice；固定列表，导入时无需加载 fake_useragent 数据
+_UA_POOL = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/125.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0.0.0 Safari/537.36 Edg/126.0.0.0",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:127.0) Gecko/20100101 Firefox/127.0",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/125.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.5 Safari/605.1.15",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 14.5; rv:127.0) Gecko/20100101 Firefox/127.0",
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:127.0) Gecko/20100101 Firefox/127.0",
+)
+
+# 共享的 SSL 上下文（等价于 verify=False），避免每个客户端重复初始化 OpenSSL 上下文
+_SSL_CTX = ssl.create_default_context()
+_SSL_CTX.check_hostname = False
+_SSL_CTX.verify_mode = ssl.CERT_NONE
+
+# 邮件解析器（policy.default 提供 get_body/get_content）
+_EMAIL_PARSER = BytesParser(policy=policy.default)
+
+# 验证链接提取模式（预编译）
+_LINK_PATTERNS = tuple(re.compile(p, re.IGNORECASE) for p in (
+    r'href=["\'](https://[^"\']*firebaseapp\.com[^"\']*)["\']',
+    r'(https://astral-field[^"\'\s<>]+)',
+    r'https://[^"\'\s<>]*__/auth/action[^"\'\s<>]*',
+    r'(https://[^\s<>]+\?.*oobCode=[^"\'\s<>]+)'
+))
+
+
+# ==================== 浏览器指纹配置 ====================
+@dataclass(frozen=True, slots=True)
+class BrowserProfile:
+    """浏览器/硬件指纹配置（只读，按引用共享）"""
+    profile_name: str
+    os: str
+    os_version: str
+    platform: str
+    architecture: str
+    bitness: int
+    vendor: str
+    gpu_vendor_string: str
+    gpu_renderer: str
+    screen_resolution: Mapping[str, int]
+    hardware_config: Mapping[str, int]
+    hashes: Mapping[str, str]
+
+    def __post_init__(self):
+        # 嵌套配置同样只读，payload 生成时直接按引用读取
+        for name in ("screen_resolution", "hardware_config", "hashes"):
+            object.__setattr__(self, name, MappingProxyType(dict(getattr(self, name))))
+
+
+# 扩展的基础配置文件 - 包含更多真实捕获的配置
+# 模块加载时构建一次；冻结的 slots 数据类，按引用共享无需 deepcopy
+_BASE_PROFILES = tuple(BrowserProfile(**p) for p in (
+    {
+        "profile_name": "Win10_Chrome_NVIDIA_GTX1660Ti",
+        "os": "Windows",
+        "os_version": "10.0.0",
+        "platform": "Win32",
+        "architecture": "x86",
+        "bitness": 64,
+        "vendor": "Google Inc.",
+        "gpu_vendor_string": "Google Inc. (NVIDIA)",
+        "gpu_renderer": "ANGLE (NVIDIA, NVIDIA GeForce GTX 1660 Ti (0x00002182) Direct3D11 vs_5_0 ps_5_0, D3D11)",
+        "screen_resolution": {"width": 1707, "height": 960},
+        "hardware_config": {"memory": 8, "cores": 12},
+        "hashes": {
+            "prototype_hash": "5051906984991708",
+            "math_hash": "4407615957639726",
+            "offline_audio_hash": "733027540168168",
+            "mime_types_hash": "6633968372405724",
+            "errors_hash": "1415081268456649"
+        }
+    },
+    {
+        "profile_name": "Win10_Chrome_AMD_Radeon",
+        "os": "Windows",
+        "os_version": "10.0.0",
+        "platform": "Win32",
+        "architecture": "x86",
+        "bitness": 64,
+        "vendor": "Google Inc.",
+        "gpu_vendor_string": "Google Inc. (AMD)",
+        "gpu_renderer": "ANGLE (AMD, AMD Radeon(TM) Graphics (0x00001638) Direct3D11 vs_5_0 ps_5_0, D3D11)",
+        "screen_resolution": {"width": 1536, "height": 864},
+        "hardware_config": {"memory": 8, "cores": 16},
+        "hashes": {
+            "prototype_hash": "4842229194603551",
+            "math_hash": "4407615957639726",
+            "offline_audio_hash": "733027540168168",
+            "mime_types_hash": "2795763505992044",
+            "errors_hash": "1415081268456649"
+        }
+    },
+    {
+        "profile_name": "Win10_Chrome_NVIDIA_RTX3060",
+        "os": "Windows",
+        "os_version": "10.0.0",
+        "platform": "Win32",
+        "architecture": "x86",
+        "bitness": 64,
+        "vendor": "Google Inc.",
+        "gpu_vendor_string": "Google Inc. (NVIDIA)",
+        "gpu_renderer": "ANGLE (NVIDIA, NVIDIA GeForce RTX 3060 (0x00002503) Direct3D11 vs_5_0 ps_5_0, D3D11)",
+        "screen_resolution": {"width": 1920, "height": 1080},
+        "hardware_config": {"memory": 16, "cores": 8},
+        "hashes": {
+            "prototype_hash": "5051906984991708",
+            "math_hash": "4407615957639726",
+            "offline_audio_hash": "733027540168168",
+            "mime_types_hash": "6633968372405724",
+            "errors_hash": "1415081268456649"
+        }
+    }
+))
+
+
+# 多个版本共用的品牌项，按引用共享（只读，直接序列化进 payload）
+_NOT_A_BRAND_24 = {"brand": "Not-A.Brand", "version": "24"}
+
+# Chrome/Edge 版本配置 - 完整版本信息
+BROWSER_VERSIONS_COMPLETE = (
+    {
+        "browser": "Chrome",
+        "major": 140,
+        "full_version": "140.0.7339.208",
+        "brands": (
+            {"brand": "Chromium", "version": "140"},
+            {"brand": "Not=A?Brand", "version": "24"},
+            {"brand": "Google Chrome", "version": "140"}
+        )
+    },
+    {
+        "browser": "Edge",
+        "major": 141,
+        "full_version": "141.0.3537.57",
+        "full_chromium_version": "141.0.7390.55",
+        "brands": (
+            {"brand": "Microsoft Edge", "version": "141"},
+            {"brand": "Not?A_Brand", "version": "8"},
+            {"brand": "Chromium", "version": "141"}
+        )
+    },
+    {
+        "browser": "Chrome",
+        "major": 128,
+        "full_version": "128.0.6613.137",
+        "brands": (
+            {"brand": "Chromium", "version": "128"},
+            _NOT_A_BRAND_24,
+            {"brand": "Google Chrome", "version": "128"}
+        )
+    },
+    {
+        "browser": "Chrome",
+        "major": 126,
+        "full_version": "126.0.6478.126",
+        "brands": (
+            {"brand": "Chromium", "version": "126"},
+            _NOT_A_BRAND_24,
+            {"brand": "Google Chrome", "version": "126"}
+        )
+    }
+)
+
+# 语言配置
+LANGUAGE_CONFIGS_FIXED = (
+    {"lang": "zh-CN", "languages": ("zh-CN", "zh"), "timezone_offset": 8, "timezone": "Asia/Shanghai"},
+    {"lang": "zh-CN", "languages": ("zh-CN", "zh", "en"), "timezone_offset": 8, "timezone": "Asia/Shanghai"},
+    {"lang": "zh-CN", "languages": ("zh-CN",), "timezone_offset": 8, "timezone": "Asia/Shanghai"},
+    {"lang": "en-US", "languages": ("en-US", "en"), "timezone_offset": -5, "timezone": "America/New_York"},
+    {"lang": "en-US", "languages": ("en-US", "en"), "timezone_offset": -7, "timezone": "America/Los_Angeles"}
+)
+
+
+@dataclass(frozen=True, slots=True)
+class BrowserVersion:
+    """浏览器版本配置及其派生字段（只读，按引用共享）"""
+    config: Mapping[str, Any]  # BROWSER_VERSIONS_COMPLETE 中的原始条目
+    user_agent: str
+    app_version: str
+    full_version_list: tuple
+
+
+@dataclass(frozen=True, slots=True)
+class LanguageConfig:
+    """语言配置及按其预先构建的 intl_date / intl_number（只读，payload 中按引用复用）"""
+    config: Mapping[str, Any]  # LANGUAGE_CONFIGS_FIXED 中的原始条目
+    intl_date: Dict[str, Any]
+    intl_number: Dict[str, Any]
+
+
+def _build_browser_version(browser_version: Mapping[str, Any]) -> BrowserVersion:
+    """由版本配置计算 User-Agent、app_version 和 full_version_list，不修改原表"""
+    # 构建 User-Agent
+    ua_full_version = browser_version["full_version"]
+    if browser_version["browser"] == "Chrome":
+        user_agent = f"Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/{ua_full_version} Safari/537.36"
+    else:  # Edge
+        chromium_version = browser_version.get("full_chromium_version", ua_full_version)
+        user_agent = f"Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/{chromium_version} Safari/537.36 Edg/{ua_full_version}"
+
+    # 构建品牌信息
+    full_version_list = []
+    for brand_info in browser_version["brands"]:
+        if "Chrome" in brand_info["brand"] or "Chromium" in brand_info["brand"] or "Edge" in brand_info["brand"]:
+            version_str = ua_full_version if "Edge" not in brand_info["brand"] else browser_version.get(
+                "full_version")
+            if "Chromium" in brand_info["brand"] and browser_version["browser"] == "Edge":
+                version_str = browser_version.get("full_chromium_version", ua_full_version)
+        else:
+            version_str = f"{brand_info['version']}.0.0.0"
+
+        full_version_list.append({
+            "brand": brand_info["brand"],
+            "version": version_str
+        })
+
+    return BrowserVersion(
+        config=browser_version,
+        user_agent=user_agent,
+        app_version=user_agent.replace("Mozilla/", ""),
+        full_version_list=tuple(full_version_list),
+    )
+
+
+def _build_language_config(lang_config: Mapping[str, Any]) -> LanguageConfig:
+    """由语言配置构建 intl_date / intl_number，不修改原表"""
+    return LanguageConfig(
+        config=lang_config,
+        intl_date={
+            "locale": lang_config["lang"],
+            "calendar": "gregory",
+            "numbering_system": "latn",
+            "time_zone": lang_config["timezone"],
+            "year": "numeric",
+            "month": "numeric",
+            "day": "numeric"
+        },
+        intl_number={
+            "locale": lang_config["lang"],
+            "numbering_system": "latn",
+            "style": "decimal",
+            "minimum_integer_digits": 1,
+            "minimum_fraction_digits": 0,
+            "maximum_fraction_digits": 3,
+            "use_grouping": "auto",
+            "notation": "standard",
+            "sign_display": "auto",
+            "rounding_increment": 1,
+            "rounding_mode": "halfExpand",
+            "rounding_priority": "auto",
+            "trailing_zero_display": "auto"
+        },
+    )
+
+
+_BROWSER_VERSIONS = tuple(map(_build_browser_version, BROWSER_VERSIONS_COMPLETE))
+_LANGUAGE_CONFIGS = tuple(map(_build_language_config, LANGUAGE_CONFIGS_FIXED))
+
+
+# 配置文件 × 浏览器版本 × 语言 的全部组合，一次随机即可选出整套指纹配置（分布与分别选取相同）
+_FINGERPRINT_COMBOS = tuple(itertools.product(_BASE_PROFILES, _BROWSER_VERSIONS, _LANGUAGE_CONFIGS))
+
+
+# 基础 window_keys 模板（静态数据放在 data/window_keys.txt，每行一个）
+_WINDOW_KEYS_PATH = Path(__file__).resolve().parent / "data" / "window_keys.txt"
+
+# 站点特定的 window keys
+_SITE_SPECIFIC_WINDOW_KEYS = tuple(map(sys.intern, (
+    "RudderSnippetVersion", "rudderanalytics", "rudderAnalyticsBuildType",
+    "rudderAnalyticsAddScript", "rudderAnalyticsMount", "goVerisoulEnv",
+    "goVerisoulProjectId", "openBraces", "script", "warp_app_base_url",
+    "warp_app_version", "verisoul_env", "verisoul_project_id", "Verisoul",
+    "_hsq", "_hsp", "RudderStackGlobals", "__reactRouterVersion",
+    "warpEmitEvent", "@wry/context:Slot", "warpUserHandoff",
+    "__APOLLO_CLIENT__", "dataLayer", "gtag", "__SENTRY__",
+    "_0x28b5", "_0x70cb", "VerisoulBundleInternal", "detectIncognito"
+)))
+
+
+# 以下 window_keys 相关数据均在首次使用时才构建并缓存，只导入模块（不注册）的进程无需付出这部分开销
+@functools.cache
+def get_base_window_keys() -> tuple:
+    """基础 window_keys 模板（读取后驻留）"""
+    return tuple(map(sys.intern, _WINDOW_KEYS_PATH.read_text(encoding="utf-8").split()))
+
+
+@functools.cache
+def get_window_keys_json() -> bytes:
+    """最终上报的 window_keys（基础模板 + 未包含的站点 key），用 orjson 预先序列化一次，
+    每次请求原样嵌入，不再重复编码上千个字符串"""
+    # dict.fromkeys 按插入顺序一次性去重，O(N)
+    window_keys = tuple(dict.fromkeys(get_base_window_keys() + _SITE_SPECIFIC_WINDOW_KEYS))
+    return orjson.dumps(window_keys)
+
+
+def _json_fragment(data: bytes):
+    """把已序列化的 JSON 包成 orjson.Fragment 原样嵌入；orjson < 3.9 没有 Fragment，
+    退回为解析后的对象按普通值序列化（结果相同，只是每次请求多编码一次）"""
+    fragment = getattr(orjson, "Fragment", None)
+    if fragment is None:
+        return orjson.loads(data)
+    return fragment(data)
+
+
+@functools.cache
+def get_window_keys_fragment():
+    """payload 中直接嵌入的 window_keys（见 get_window_keys_json），首次使用时构建并缓存"""
+    return _json_fragment(get_window_keys_json())
+
+
+# 键盘布局（按引用复用，每次请求只打乱顺序；下游只做序列化，不会修改）
+_KEYBOARD_LAYOUT = (
+    {"key": "KeyA", "value": "a"}, {"key": "KeyB", "value": "b"}, {"key": "KeyC", "value": "c"},
+    {"key": "KeyD", "value": "d"}, {"key": "KeyE", "value": "e"}, {"key": "KeyF", "value": "f"},
+    {"key": "KeyG", "value": "g"}, {"key": "KeyH", "value": "h"}, {"key": "KeyI", "value": "i"},
+    {"key": "KeyJ", "value": "j"}, {"key": "KeyK", "value": "k"}, {"key": "KeyL", "value": "l"},
+    {"key": "KeyM", "value": "m"}, {"key": "KeyN", "value": "n"}, {"key": "KeyO", "value": "o"},
+    {"key": "KeyP", "value": "p"}, {"key": "KeyQ", "value": "q"}, {"key": "KeyR", "value": "r"},
+    {"key": "KeyS", "value": "s"}, {"key": "KeyT", "value": "t"}, {"key": "KeyU", "value": "u"},
+    {"key": "KeyV", "value": "v"}, {"key": "KeyW", "value": "w"}, {"key": "KeyX", "value": "x"},
+    {"key": "KeyY", "value": "y"}, {"key": "KeyZ", "value": "z"}, {"key": "Digit0", "value": "0"},
+    {"key": "Digit1", "value": "1"}, {"key": "Digit2", "value": "2"}, {"key": "Digit3", "value": "3"},
+    {"key": "Digit4", "value": "4"}, {"key": "Digit5", "value": "5"}, {"key": "Digit6", "value": "6"},
+    {"key": "Digit7", "value": "7"}, {"key": "Digit8", "value": "8"}, {"key": "Digit9", "value": "9"},
+    {"key": "Backquote", "value": "`"}, {"key": "Minus", "value": "-"}, {"key": "Equal", "value": "="},
+    {"key": "Backslash", "value": "\\"}, {"key": "BracketLeft", "value": "["},
+    {"key": "BracketRight", "value": "]"}, {"key": "Semicolon", "value": ";"},
+    {"key": "Quote", "value": "'"}, {"key": "Comma", "value": ","}, {"key": "Period", "value": "."},
+    {"key": "Slash", "value": "/"}, {"key": "IntlBackslash", "value": "\\"}
+)
+
+
+# payload 中固定不变的嵌套字段，启动时用 orjson 序列化一次，之后以 Fragment 原样嵌入
+_STATIC_JSON = {
+    name: _json_fragment(orjson.dumps(value))
+    for name, value in {
+        "document_element_keys": ["lang"],
+        "empty_bounding_box": {
+            "x": 0, "y": 0, "width": 0, "height": 0,
+            "top": 0, "right": 0, "bottom": 0, "left": 0
+        },
+        "video_frame_color_space": {
+            "full_range": True,
+            "matrix": "rgb",
+            "primaries": "bt709",
+            "transfer": "iec61966-2-1"
+        },
+    }.items()
+}
+
+
+def _format_utc_ms(epoch_ms: int) -> str:
+    """毫秒时间戳格式化为 2024-01-01T00:00:00.000Z（代替 datetime.utcnow().strftime）"""
+    seconds, ms = divmod(epoch_ms, 1000)
+    tm = time.gmtime(seconds)
+    return (f"{tm.tm_year:04d}-{tm.tm_mon:02d}-{tm.tm_mday:02d}"
+            f"T{tm.tm_hour:02d}:{tm.tm_min:02d}:{tm.tm_sec:02d}.{ms:03d}Z")
+
+
+def _uuid4_str(raw: Optional[bytes] = None) -> str:
+    """生成 UUID4 字符串，直接格式化随机字节，跳过 uuid.UUID 对象的构造与校验
+
+    raw 为调用方已取好的 16 字节随机数，省略时现取
+    """
+    b = bytearray(raw if raw is not None else os.urandom(16))
+    b[6] = (b[6] & 0x0F) | 0x40  # version 4
+    b[8] = (b[8] & 0x3F) | 0x80  # RFC 4122 variant
+    h = b.hex()
+    return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+
+
+# performance_timing 各项随机增量的闭区间，顺序与 _generate_worker_payload 中的解包一致
+_PERF_TIMING_RANGES = (
+    (3000, 6000),  # navigation_start 距当前时间
+    (2, 10),  # fetch_start
+    (1, 20),  # domain_lookup_start
+    (10, 50),  # domain_lookup_end
+    (0, 9),  # secure_connection 概率骰子（>=3 即 70%）
+    (5, 15),  # secure_connection_start
+    (20, 60),  # connect_end
+    (1, 5),  # request_start
+    (80, 200),  # response_start
+    (1, 10),  # response_end
+    (1, 10),  # dom_loading
+    (1, 5),  # unload_event_start
+    (1, 3),  # unload_event_end
+    (200, 500),  # dom_interactive
+    (100, 300),  # dom_content_loaded_event_start
+    (1, 5),  # dom_content_loaded_event_end
+    (0, 1),  # 页面是否已完全加载
+    (50, 200),  # dom_complete
+    (1, 5),  # load_event_start
+    (1, 5),  # load_event_end
+)
+
+
+# 权限配置基础模板（固定项按引用复用；随机项每次覆盖，键顺序保持不变）
+_PERMISSIONS_BASE = {
+    "accessibility_events": "Failed to execute 'query' on 'Permissions': Failed to read the 'name' property from 'PermissionDescriptor': The provided value 'accessibility-events' is not a valid enum value of type PermissionName.",
+    "ambient_light_sensor": "Failed to execute 'query' on 'Permissions': GenericSensorExtraClasses flag is not enabled.",
+    "bluetooth": "Failed to execute 'query' on 'Permissions': Failed to read the 'name' property from 'PermissionDescriptor': The provided value 'bluetooth' is not a valid enum value of type PermissionName.",
+    "nfc": "Failed to execute 'query' on 'Permissions': Web NFC is not enabled.",
+    "push": "Failed to execute 'query' on 'Permissions': Push Permission without userVisibleOnly:true isn't supported yet.",
+    "speaker": "Failed to execute 'query' on 'Permissions': Failed to read the 'name' property from 'PermissionDescriptor': The provided value 'speaker' is not a valid enum value of type PermissionName.",
+    "speaker_selection": "Failed to execute 'query' on 'Permissions': The Speaker Selection API is not enabled.",
+    "top_level_storage_access": "Failed to execute 'query' on 'Permissions': The requested origin is invalid.",
+    "accelerometer": "granted",
+    "background_sync": "granted",
+    "background_fetch": "granted",
+    "camera": "prompt",  # 每次随机覆盖
+    "clipboard_read": "prompt",  # 每次随机覆盖
+    "clipboard_write": "granted",
+    "geolocation": "prompt",  # 每次随机覆盖
+    "gyroscope": "granted",
+    "local_fonts": "prompt",
+    "magnetometer": "granted",
+    "microphone": "prompt",  # 每次随机覆盖
+    "midi": "prompt",
+    "notifications": "prompt",  # 每次随机覆盖
+    "payment_handler": "granted",
+    "persistent_storage": "prompt",
+    "screen_wake_lock": "granted",
+    "storage_access": "granted",
+    "window_management": "prompt"
+}
+
+
+# payload 中离散随机字段的候选值，顺序与 _generate_worker_payload 中的解包一致
+_PAYLOAD_CHOICE_POOLS = (
+    ("denied", "prompt"),  # camera
+    ("prompt", "granted"),  # clipboard_read
+    ("denied", "prompt"),  # geolocation
+    ("denied", "prompt"),  # microphone
+    ("denied", "prompt", "granted"),  # notifications
+    (0, 1),  # screen_is_extended
+    (0, 1),  # incognito
+    (0, 1),  # battery_charging
+    (50, 100, 150, 200, 250, 300),  # connection_rtt
+    (0.35, 0.7, 1.25, 1.3, 1.5, 2.5, 5.0, 10.0),  # connection_downlink
+    ("slow-2g", "2g", "3g", "4g"),  # connection_effective_type
+)
+
+
+def _choices(pools) -> list:
+    """一次 getrandbits 按混合进制为每个候选池各选一项，代替逐个调用 random.choice"""
+    r = random.getrandbits(64)
+    picks = []
+    for pool in pools:
+        r, i = divmod(r, len(pool))
+        picks.append(pool[i])
+    return picks
+
+
+def _randints(ranges, bits: int = 256) -> list:
+    """一次 getrandbits 按混合进制拆分出多个闭区间随机整数，代替逐个调用 random.randint
+
+    bits 需比各区间所需熵之和多出 64 位以上，取模偏差即可忽略
+    （performance_timing 约需 88 位，默认 256 位足够）。
+    """
+    r = random.getrandbits(bits)
+    values = []
+    for lo, hi in ranges:
+        r, v = divmod(r, hi - lo + 1)
+        values.append(lo + v)
+    return values
 
 
 # ==================== 临时邮箱API客户端 ====================
@@ -60,7 +542,7 @@ class TempMailAPIClient:
             self.client = httpx.AsyncClient(
                 timeout=httpx.Timeout(30.0),
                 headers={
-                    'User-Agent': ua.random,
+                    'User-Agent': random.choice(_UA_POOL),
                     'Accept': 'application/json'
                 },
                 proxy=None,  # 禁用代理
@@ -168,26 +650,54 @@ class AsyncProxyManager:
 
 
 # ==================== 异步数据库管理 ====================
+# SQLite 单条语句允许的绑定参数上限
+SQLITE_MAX_VARIABLES = 999
+ACCOUNT_INSERT_COLUMNS = ("email", "local_id", "id_token", "refresh_token", "status", "proxy_info", "user_agent")
+
+
 class AsyncDatabaseManager:
     """异步数据库管理器"""
 
     def __init__(self, db_path=config.DATABASE_PATH):
         self.db_path = db_path
+        self._db = None
+        self._lock = asyncio.Lock()
+
+    async def _get_db(self) -> aiosqlite.Connection:
+        """获取长连接（首次使用时打开并配置WAL及缓存相关PRAGMA）"""
+        if self._db is None:
+            self._db = await aiosqlite.connect(self.db_path)
+            await self._db.execute("PRAGMA journal_mode = WAL")
+            await self._db.execute("PRAGMA synchronous = NORMAL")
+            await self._db.execute("PRAGMA temp_store = MEMORY")
+            await self._db.execute("PRAGMA mmap_size = 268435456")  # 256MB
+            await self._db.execute("PRAGMA cache_size = -65536")  # 64MB
+        return self._db
+
+    async def close(self):
+        """关闭长连接"""
+        if self._db is not None:
+            await self._db.close()
+            self._db = None
 
     async def add_account(self, email, local_id, id_token, refresh_token,
                           status='active', proxy_info=None, user_agent=None):
         """添加账号"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
-                await db.execute('''
-                                 INSERT INTO accounts
-                                 (email, local_id, id_token, refresh_token, status, proxy_info, user_agent)
-                                 VALUES (?, ?, ?, ?, ?, ?, ?)
-                                 ''', (email, local_id, id_token, refresh_token, status, proxy_info, user_agent))
-
-                await db.commit()
-                logger.info(f"✅ 账号已保存: {email}")
-                return True
+            async with self._lock:
+                db = await self._get_db()
+                try:
+                    await db.execute('''
+                                     INSERT INTO accounts
+                                     (email, local_id, id_token, refresh_token, status, proxy_info, user_agent)
+                                     VALUES (?, ?, ?, ?, ?, ?, ?)
+                                     ''', (email, local_id, id_token, refresh_token, status, proxy_info, user_agent))
+                    await db.commit()
+                except Exception:
+                    await db.rollback()
+                    raise
+            logger.info(f"✅ 账号已保存: {email}")
+            return True
         except aiosqlite.IntegrityError:
             logger.warning(f"账号已存在: {email}")
             return False
@@ -195,31 +705,353 @@ class AsyncDatabaseManager:
             logger.error(f"保存账号失败: {e}")
             return False
 
+    async def insert_accounts(self, rows) -> list:
+        """在单个事务中批量添加账号（多行 VALUES 插入）
+
+        Args:
+            rows: (email, local_id, id_token, refresh_token, status, proxy_info, user_agent) 元组列表
+
+        Returns:
+            与 rows 一一对应的布尔列表，True 表示该行实际写入；已存在的邮箱（含同批重复）为 False。
+            写入失败时回滚并抛出异常
+        """
+        rows = list(rows)
+        if not rows:
+            return []
+
+        # 每条语句的行数受 SQLite 绑定参数上限 (999) 约束
+        chunk = SQLITE_MAX_VARIABLES // len(ACCOUNT_INSERT_COLUMNS)
+        row_placeholder = "(" + ", ".join("?" * len(ACCOUNT_INSERT_COLUMNS)) + ")"
+        columns = ", ".join(ACCOUNT_INSERT_COLUMNS)
+
+        async with self._lock:
+            db = await self._get_db()
+            inserted_emails = set()
+            try:
+                for i in range(0, len(rows), chunk):
+                    batch = rows[i:i + chunk]
+                    # RETURNING 只返回真正插入的行，被 OR IGNORE 跳过的邮箱不会出现（需 SQLite >= 3.35）
+                    sql = (f"INSERT OR IGNORE INTO accounts ({columns}) VALUES "
+                           + ", ".join([row_placeholder] * len(batch))
+                           + " RETURNING email")
+                    cursor = await db.execute(sql, tuple(itertools.chain.from_iterable(batch)))
+                    inserted_emails.update(email for (email,) in await cursor.fetchall())
+                await db.commit()
+            except Exception:
+                await db.rollback()
+                raise
+
+        results = []
+        for row in rows:
+            email = row[0]
+            # 同批出现多次的邮箱只有第一行算写入
+            ok = email in inserted_emails
+            if ok:
+                inserted_emails.discard(email)
+            else:
+                logger.warning(f"账号已存在: {email}")
+            results.append(ok)
+        logger.info(f"✅ 批量保存账号: {sum(results)}/{len(rows)}")
+        return results
+
     async def get_account_count(self, status='active'):
         """获取账号数量"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._lock:
+            db = await self._get_db()
             cursor = await db.execute('SELECT COUNT(*) FROM accounts WHERE status = ?', (status,))
             row = await cursor.fetchone()
             return row[0] if row else 0
 
 
+# 注意：WebRTC SDP 生成（_generate_webrtc_sdp / build_sdp）目前没有接入注册流程，以下数据仅供其使用
+# SDP 音视频编解码器行，从真实浏览器抓包中提取，对同一浏览器版本固定不变，启动时构建一次
+_AUDIO_CODEC_LINES = (
+    "a=rtpmap:111 opus/48000/2", "a=rtcp-fb:111 transport-cc", "a=fmtp:111 minptime=10;useinbandfec=1",
+    "a=rtpmap:103 G722/8000", "a=rtpmap:104 G722/8000", "a=rtpmap:9 G722/8000", "a=rtpmap:0 PCMU/8000",
+    "a=rtpmap:8 PCMA/8000", "a=rtpmap:106 CN/32000", "a=rtpmap:105 CN/16000", "a=rtpmap:13 CN/8000",
+    "a=rtpmap:110 telephone-event/48000", "a=rtpmap:112 telephone-event/32000",
+    "a=rtpmap:113 telephone-event/16000", "a=rtpmap:126 telephone-event/8000"
+)
+
+_VIDEO_CODEC_LINES = (
+    "a=rtpmap:96 VP8/90000", "a=rtcp-fb:96 goog-remb", "a=rtcp-fb:96 transport-cc", "a=rtcp-fb:96 ccm fir",
+    "a=rtcp-fb:96 nack", "a=rtcp-fb:96 nack pli",
+    "a=rtpmap:97 rtx/90000", "a=fmtp:97 apt=96",
+    "a=rtpmap:98 VP9/90000", "a=rtcp-fb:98 goog-remb", "a=rtcp-fb:98 transport-cc", "a=rtcp-fb:98 ccm fir",
+    "a=rtcp-fb:98 nack", "a=rtcp-fb:98 nack pli", "a=fmtp:98 profile-id=0",
+    "a=rtpmap:99 rtx/90000", "a=fmtp:99 apt=98",
+    "a=rtpmap:100 H264/90000", "a=rtcp-fb:100 goog-remb", "a=rtcp-fb:100 transport-cc", "a=rtcp-fb:100 ccm fir",
+    "a=rtcp-fb:100 nack", "a=rtcp-fb:100 nack pli",
+    "a=fmtp:100 level-asymmetry-allowed=1;packetization-mode=1;profile-level-id=42e01f",
+    "a=rtpmap:101 rtx/90000", "a=fmtp:101 apt=100",
+    "a=rtpmap:123 red/90000", "a=rtpmap:127 ulpfec/90000"
+)
+
+
+# SDP 模板。大部分的音视频编解码器信息(rtpmap, fmtp)对于同一浏览器版本是固定的，
+# 启动时直接拼入模板；动态部分用 {占位符} 表示，每次生成时 format_map 一次性填充。
+# 这个模板是基于 Chrome 风格的 SDP 精心构造的，行之间使用 SDP 协议标准的 '\r\n'。
+_SDP_TEMPLATE = "\r\n".join((
+    "v=0",
+    "o=- {session_id} 2 IN IP4 127.0.0.1",
+    "s=-",
+    "t=0 0",
+    "a=group:BUNDLE 0 1 2",
+    "a=extmap-allow-mixed",
+    "a=msid-semantic: WMS",
+
+    # --- Audio Section ---
+    "m=audio {audio_port} UDP/TLS/RTP/SAVPF 111 103 104 9 0 8 106 105 13 110 112 113 126",
+    "c=IN IP4 {public_ip}",
+    "a=rtcp:9 IN IP4 0.0.0.0",
+    # Host candidate (本机地址)
+    "a=candidate:{audio_host_foundation} 1 udp 2113937151 {mdns_host} {audio_host_port} typ host generation 0 network-cost 999",
+    # Srflx candidate (公网地址)
+    "a=candidate:{audio_srflx_foundation} 1 udp 1677729535 {public_ip} {audio_srflx_port} typ srflx raddr 0.0.0.0 rport 0 generation 0 network-cost 999",
+    "{ice_credentials}",  # ice-ufrag / ice-pwd / fingerprint 三行，三个 m= 段共用
+    "a=setup:actpass", "a=mid:0", "a=extmap:1 urn:ietf:params:rtp-hdrext:ssrc-audio-level", "a=recvonly",
+    "a=rtcp-mux",
+    *_AUDIO_CODEC_LINES,
+
+    # --- Video Section ---
+    "m=video {video_port} UDP/TLS/RTP/SAVPF 96 97 98 99 100 101 102 123 127 121 125 107 108 109 35 36 124",
+    "c=IN IP4 {public_ip}",
+    "a=rtcp:9 IN IP4 0.0.0.0",
+    "a=candidate:{video_host_foundation} 1 udp 2113937151 {mdns_host} {video_host_port} typ host generation 0 network-cost 999",
+    "a=candidate:{video_srflx_foundation} 1 udp 1677729535 {public_ip} {video_srflx_port} typ srflx raddr 0.0.0.0 rport 0 generation 0 network-cost 999",
+    "{ice_credentials}",  # ice-ufrag / ice-pwd / fingerprint 三行，三个 m= 段共用
+    "a=setup:actpass", "a=mid:1", "a=extmap:14 urn:ietf:params:rtp-hdrext:toffset", "a=recvonly", "a=rtcp-mux",
+    *_VIDEO_CODEC_LINES,
+
+    # --- Application/Data Channel Section ---
+    "m=application {app_port} UDP/DTLS/SCTP webrtc-datachannel",
+    "c=IN IP4 {public_ip}",
+    "a=candidate:{app_host_foundation} 1 udp 2113937151 {mdns_host} {app_host_port} typ host generation 0 network-cost 999",
+    "a=candidate:{app_srflx_foundation} 1 udp 1677729535 {public_ip} {app_srflx_port} typ srflx raddr 0.0.0.0 rport 0 generation 0 network-cost 999",
+    "{ice_credentials}",  # ice-ufrag / ice-pwd / fingerprint 三行，三个 m= 段共用
+    "a=setup:actpass", "a=mid:2", "a=sctp-port:5000", "a=max-message-size:262144",
+    "",  # 末尾换行
+))
+
+
+# 每份 SDP 需要的 CSPRNG 字节：mDNS UUID(16) + ice-ufrag(4) + ice-pwd(24) + 指纹(32)
+_SDP_RANDOM_LEN = 16 + 4 + 24 + 32
+_SDP_RANDOM_POOL_SIZE = 64
+
+
+def _iter_sdp_random_material():
+    """一次 os.urandom 预取 _SDP_RANDOM_POOL_SIZE 份随机字节，逐份切出，摊薄 CSPRNG 系统调用"""
+    while True:
+        buf = os.urandom(_SDP_RANDOM_LEN * _SDP_RANDOM_POOL_SIZE)
+        for i in range(0, len(buf), _SDP_RANDOM_LEN):
+            yield buf[i:i + _SDP_RANDOM_LEN]
+
+
+_SDP_RANDOM_MATERIAL = _iter_sdp_random_material()
+
+
+def _b64url(raw: bytes) -> str:
+    """与 secrets.token_urlsafe 相同的编码：URL 安全 base64，去掉填充"""
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+# SDP 中的随机端口与 ICE candidate foundation（闭区间），顺序与 build_sdp 中的解包一致
+_SDP_PORT_RANGE = (10000, 60000)
+_SDP_FOUNDATION_RANGE = (1_000_000_000, 4_000_000_000)
+_SDP_RANDOM_RANGES = (
+    (1000, 9999),  # session id 后缀
+    *(
+        _SDP_PORT_RANGE,  # m= 端口
+        _SDP_FOUNDATION_RANGE, _SDP_PORT_RANGE,  # host candidate
+        _SDP_FOUNDATION_RANGE, _SDP_PORT_RANGE,  # srflx candidate
+    ) * 3,  # audio / video / application 三个 m= 段
+)
+_SDP_RANDOM_BITS = 512  # 上述区间共需约 342 位熵
+
+
+def build_sdp(public_ip: str) -> str:
+    """按模板生成一份 Chrome 风格的 WebRTC SDP（纯同步计算，不做任何 IO）
+
+    Args:
+        public_ip: 出口公网IP，用于 srflx 候选项与 c= 行
+    """
+    # 生成会话和连接所需的随机组件
+    (session_suffix,
+     audio_port, audio_host_foundation, audio_host_port, audio_srflx_foundation, audio_srflx_port,
+     video_port, video_host_foundation, video_host_port, video_srflx_foundation, video_srflx_port,
+     app_port, app_host_foundation, app_host_port, app_srflx_foundation, app_srflx_port
+     ) = _randints(_SDP_RANDOM_RANGES, _SDP_RANDOM_BITS)
+    session_id_num = f"{time.time_ns() // 1_000_000}{session_suffix}"
+    # mDNS 主机名、ICE 凭据与指纹的随机字节从预取池中一次切出
+    raw = next(_SDP_RANDOM_MATERIAL)
+    local_mdns_host = f"{_uuid4_str(raw[:16])}.local"
+    ice_ufrag = _b64url(raw[16:20])  # 等价于 secrets.token_urlsafe(4)
+    ice_pwd = _b64url(raw[20:44])  # 等价于 secrets.token_urlsafe(24)
+
+    # 生成一个随机的 DTLS 证书指纹 (SHA-256)
+    fingerprint_str = raw[44:].hex(":").upper()  # bytes.hex 分隔符在 C 层完成
+
+    # 三个 m= 段共用同一组 ICE 凭据与指纹，这三行只拼接一次
+    ice_credentials = f"a=ice-ufrag:{ice_ufrag}\r\na=ice-pwd:{ice_pwd}\r\na=fingerprint:sha-256 {fingerprint_str}"
+
+    # 按模板一次性填充所有动态字段
+    return _SDP_TEMPLATE.format_map({
+        "session_id": session_id_num,
+        "public_ip": public_ip,
+        "mdns_host": local_mdns_host,
+        "ice_credentials": ice_credentials,
+        "audio_port": audio_port,
+        "audio_host_foundation": audio_host_foundation,
+        "audio_host_port": audio_host_port,
+        "audio_srflx_foundation": audio_srflx_foundation,
+        "audio_srflx_port": audio_srflx_port,
+        "video_port": video_port,
+        "video_host_foundation": video_host_foundation,
+        "video_host_port": video_host_port,
+        "video_srflx_foundation": video_srflx_foundation,
+        "video_srflx_port": video_srflx_port,
+        "app_port": app_port,
+        "app_host_foundation": app_host_foundation,
+        "app_host_port": app_host_port,
+        "app_srflx_foundation": app_srflx_foundation,
+        "app_srflx_port": app_srflx_port,
+    })
+
+
+# ==================== Warp GraphQL ====================
+# 仅供额度查询工具方法 _get_request_limit / _get_user_info 使用；注册流程本身不再查询额度
+_WARP_GRAPHQL_URL = "https://app.warp.dev/graphql/v2"
+_WARP_APP_VERSION = "v0.2025.10.01.08.12.stable_02"
+_WARP_OS_CATEGORY = "Web"
+_WARP_OS_NAME = "Windows"
+_WARP_OS_VERSION = "NT 10.0"
+
+# 查询结构：requestLimitInfo 之外一并获取 billingMetadata 来判断额度
+# billingMetadata 是对象类型，需要查询子字段
+_GET_REQUEST_LIMIT_QUERY = """query GetRequestLimitInfo($requestContext: RequestContext!) {\n  user(requestContext: $requestContext) {\n    __typename\n    ... on UserOutput {\n      user {\n        billingMetadata {\n          __typename\n        }\n        profile {\n          email\n          uid\n        }\n        isOnboarded\n        requestLimitInfo {\n          isUnlimited\n          nextRefreshTime\n          requestLimit\n          requestsUsedSinceLastRefresh\n          requestLimitRefreshDuration\n          isUnlimitedAutosuggestions\n          acceptedAutosuggestionsLimit\n          acceptedAutosuggestionsSinceLastRefresh\n          isUnlimitedVoice\n          voiceRequestLimit\n          voiceRequestsUsedSinceLastRefresh\n          voiceTokenLimit\n          voiceTokensUsedSinceLastRefresh\n          isUnlimitedCodebaseIndices\n          maxCodebaseIndices\n          maxFilesPerRepo\n          embeddingGenerationBatchSize\n        }\n      }\n    }\n    ... on UserFacingError {\n      error {\n        __typename\n        ... on SharedObjectsLimitExceeded {\n          limit\n          objectType\n          message\n        }\n        ... on PersonalObjectsLimitExceeded {\n          limit\n          objectType\n          message\n        }\n        ... on AccountDelinquencyError {\n          message\n        }\n        ... on GenericStringObjectUniqueKeyConflict {\n          message\n        }\n      }\n      responseContext {\n        serverVersion\n      }\n    }\n  }\n}\n"""
+_GET_REQUEST_LIMIT_PARAMS = {"op": "GetRequestLimitInfo"}
+# 请求体不变，导入时用 orjson 一次编码为 bytes
+_GET_REQUEST_LIMIT_BODY = orjson.dumps({
+    "operationName": "GetRequestLimitInfo",
+    "variables": {
+        "requestContext": {
+            "clientContext": {
+                "version": _WARP_APP_VERSION
+            },
+            "osContext": {
+                "category": _WARP_OS_CATEGORY,
+                "linuxKernelVersion": None,
+                "name": _WARP_OS_NAME,
+                "version": _WARP_OS_VERSION
+            }
+        }
+    },
+    "query": _GET_REQUEST_LIMIT_QUERY
+})
+# 每次请求只需补上 authorization
+_GRAPHQL_BASE_HEADERS = {
+    "Content-Type": "application/json",
+    "x-warp-client-id": "warp-app",
+    "x-warp-client-version": _WARP_APP_VERSION,
+    "x-warp-os-category": _WARP_OS_CATEGORY,
+    "x-warp-os-name": _WARP_OS_NAME,
+    "x-warp-os-version": _WARP_OS_VERSION,
+}
+
+
+# 注册成功账号的批量写库：每批最多行数 / 攒批最长等待（秒）
+ACCOUNT_FLUSH_BATCH = 50
+
+# 出口公网IP缓存时间（秒）
+PUBLIC_IP_CACHE_TTL = 300
+
+
 # ==================== Warp注册机器人 ====================
 class WarpRegistrationBot:
     """Warp注册机器人"""
 
-    def __init__(self, db_manager: AsyncDatabaseManager, proxy_manager: AsyncProxyManager):
+    def __init__(self, db_manager: AsyncDatabaseManager, proxy_manager: AsyncProxyManager,
+                 monitor: Optional["RegistrationMonitor"] = None):
         self.db_manager = db_manager
         self.proxy_manager = proxy_manager
+        self.monitor = monitor  # 提供跨机器人共享的按代理连接池；为空时自建
         self.firebase_api_keys = config.FIREBASE_API_KEYS
-        self.current_api_key_index = 0
-        self.user_agent = ua.random  # 每个机器人实例一个UA
+        self._api_key_iter = itertools.cycle(self.firebase_api_keys)
+        self.email = None  # 本次注册使用的邮箱
+        self._new_identity()
+        self.async_client = None
+        self._client_proxy = None
+        # 按代理缓存出口公网IP: proxy -> (ip, monotonic时间戳)，换回同一代理或重置状态后仍可复用，TTL 到期失效
+        self._public_ip_cache: Dict[Optional[str], tuple] = {}
+        self._public_ip_lock = asyncio.Lock()
+
+    def _new_identity(self):
+        """选取新的UA并预构建对应的请求头，各请求直接复用"""
+        self.user_agent = random.choice(_UA_POOL)  # 每个账号一个UA
+        self._json_headers = {
+            "Content-Type": "application/json",
+            "User-Agent": self.user_agent,
+            "Accept": "*/*"
+        }
+        self._signin_headers = {**self._json_headers, "Accept-Language": "en-US,en;q=0.9"}
+        self._worker_headers = {
+            "User-Agent": self.user_agent,
+            "Content-Type": "application/json",
+            "Origin": "https://app.warp.dev"
+        }
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def _ensure_client(self, proxy: str = None) -> httpx.AsyncClient:
+        """获取持久化的连接池客户端，代理变化时重建"""
+        if self.async_client is None or self.async_client.is_closed or proxy != self._client_proxy:
+            await self._release_client()
+            if self.monitor is not None:
+                # 共享监控器按代理缓存的连接池；cookie 仍是每个机器人独立的
+                self.async_client = httpx.AsyncClient(
+                    transport=self.monitor.get_transport(proxy),
+                    trust_env=False,  # 代理总是显式传入，跳过环境变量代理/证书查找
+                    timeout=httpx.Timeout(60.0),
+                    headers={"User-Agent": self.user_agent},
+                    cookies=httpx.Cookies()
+                )
+            else:
+                self.async_client = httpx.AsyncClient(
+                    proxy=proxy,
+                    verify=_SSL_CTX,
+                    http2=True,  # 同一主机的请求复用一条连接多路传输，省去重复TLS握手
+                    trust_env=False,
+                    timeout=httpx.Timeout(60.0),
+                    limits=httpx.Limits(max_keepalive_connections=32, keepalive_expiry=60),
+                    headers={"User-Agent": self.user_agent},
+                    cookies=httpx.Cookies()  # 启用cookie管理
+                )
+            self._client_proxy = proxy
+        return self.async_client
+
+    async def _release_client(self):
+        """释放当前客户端；共享连接池归监控器所有，只丢弃引用不关闭"""
+        if self.async_client and not self.async_client.is_closed and self.monitor is None:
+            await self.async_client.aclose()
         self.async_client = None
+        self._client_proxy = None
+
+    async def close(self):
+        await self._release_client()
+
+    async def reset_state(self):
+        """清理上一个账号的状态（客户端、cookie、邮箱），换新UA以复用本实例注册下一个账号"""
+        await self.close()
+        self.email = None
+        self._new_identity()
 
     def get_next_api_key(self) -> str:
         """获取下一个Firebase API密钥"""
-        key = self.firebase_api_keys[self.current_api_key_index]
-        self.current_api_key_index = (self.current_api_key_index + 1) % len(self.firebase_api_keys)
-        return key
+        return next(self._api_key_iter)
 
     async def send_email_signin_request(self, email: str, proxy: str = None) -> Dict[str, Any]:
         """发送邮箱登录请求"""
@@ -230,66 +1062,55 @@ class WarpRegistrationBot:
             "requestType": "EMAIL_SIGNIN",
             "email": email,
             "clientType": "CLIENT_TYPE_WEB",
-            "continueUrl": "https://app.warp.dev/login",
+            "continueUrl": WARP_LOGIN_URL,
             "canHandleCodeInApp": True
         }
 
-        headers = {
-            "Content-Type": "application/json",
-            "User-Agent": self.user_agent,
-            "Accept": "*/*",
-            "Accept-Language": "en-US,en;q=0.9"
-        }
-
-        async with httpx.AsyncClient(
-                proxy=proxy,
-                verify=False,
-                timeout=httpx.Timeout(30.0),
-                headers=headers
-        ) as client:
-            try:
-                response = await client.post(url, json=payload)
+        client = await self._ensure_client(proxy)
+        try:
+            response = await client.post(url, content=orjson.dumps(payload), headers=self._signin_headers, timeout=httpx.Timeout(30.0))
 
-                if response.status_code == 200:
-                    logger.info(f"✅ 发送登录请求成功: {email}")
-                    return {
-                        "success": True,
-                        "response": response.json()
-                    }
-                else:
-                    logger.error(f"发送登录请求失败: {response.status_code}")
-                    return {
-                        "success": False,
-                        "error": response.text
-                    }
-            except (httpx.ProxyError, ssl.SSLError) as e:
-                logger.error(f"代理错误: {e}")
+            if response.status_code == 200:
+                logger.info(f"✅ 发送登录请求成功: {email}")
                 return {
-                    "success": False,
-                    "error": "proxy_error"
+                    "success": True,
+                    "response": orjson.loads(response.content)
                 }
-            except Exception as e:
-                logger.error(f"发送登录请求异常: {type(e).__name__}: {e}", exc_info=True)
+            else:
+                logger.error(f"发送登录请求失败: {response.status_code}")
                 return {
                     "success": False,
-                    "error": str(e)
+                    "error": response.text
                 }
+        except (httpx.ProxyError, ssl.SSLError) as e:
+            logger.error(f"代理错误: {e}")
+            return {
+                "success": False,
+                "error": "proxy_error"
+            }
+        except Exception as e:
+            logger.error(f"发送登录请求异常: {type(e).__name__}: {e}", exc_info=True)
+            return {
+                "success": False,
+                "error": str(e)
+            }
 
     async def wait_for_verification_email(self, temp_mail_client: TempMailAPIClient, email: str,
                                           timeout: int = 60) -> Optional[Dict[str, Any]]:
         """等待Warp验证邮件（使用TEMP_MAIL_API）"""
         logger.info(f"📬 等待验证邮件 (超时: {timeout}秒)...")
-        await asyncio.sleep(3)
 
         start_time = time.time()
         check_count = 0
+        seen_keys = set()  # 已检查过的邮件，后续轮询只处理新邮件
+        delay = 0.5  # 轮询间隔从0.5秒开始指数退避，上限5秒；邮件到得快时能尽早返回
 
         while time.time() - start_time < timeout:
             check_count += 1
             logger.info(f"  第 {check_count} 次检查...")
 
             try:
-                result = await self._check_email_temp(temp_mail_client, email)
+                result = await self._check_email_temp(temp_mail_client, email, seen_keys)
 
                 if result:
                     return result
@@ -297,13 +1118,22 @@ class WarpRegistrationBot:
             except Exception as e:
                 logger.warning(f"检查邮件时出错: {e}")
 
-            await asyncio.sleep(5)
+            remaining = timeout - (time.time() - start_time)
+            if remaining <= 0:
+                break
+            await asyncio.sleep(min(delay, remaining))
+            delay = min(delay * 2, 5.0)
 
         logger.error("❌ 等待验证邮件超时")
         return None
 
-    async def _check_email_temp(self, temp_mail_client: TempMailAPIClient, email: str) -> Optional[Dict[str, Any]]:
-        """使用TEMP_MAIL_API检查邮件"""
+    async def _check_email_temp(self, temp_mail_client: TempMailAPIClient, email: str,
+                                seen_keys: Optional[set] = None) -> Optional[Dict[str, Any]]:
+        """使用TEMP_MAIL_API检查邮件
+
+        Args:
+            seen_keys: 之前轮询已检查过的邮件标识集合，命中的邮件会被跳过
+        """
         try:
             logger.info(f"  正在检查邮箱: {email}")
             result = await temp_mail_client.get_emails(email)
@@ -317,50 +1147,90 @@ class WarpRegistrationBot:
                 logger.info("  暂无邮件")
                 return None
 
+            # 只保留上次轮询之后的新邮件
+            if seen_keys is not None:
+                emails = [e for e in emails if self._email_key(e) not in seen_keys]
+                if not emails:
+                    logger.info("  暂无新邮件")
+                    return None
+
+            # 第一阶段：只看主题等元数据筛选候选邮件，非候选邮件以后无需再看
+            candidates = []
+            for email_data in emails:
+                if 'warp' in email_data.get('subject', '').lower():
+                    candidates.append(email_data)
+                elif seen_keys is not None:
+                    seen_keys.add(self._email_key(email_data))
+
+            if not candidates:
+                logger.info("  暂无Warp邮件")
+                return None
+
             # 按日期排序，最新的在前
-            emails.sort(key=lambda x: x.get('date', ''), reverse=True)
+            candidates.sort(key=lambda x: x.get('date', ''), reverse=True)
 
-            # 检查最新的3封邮件
-            for email_data in emails[:3]:
+            # 第二阶段：只读取最新3封候选邮件的正文
+            for email_data in candidates[:3]:
+                if seen_keys is not None:
+                    seen_keys.add(self._email_key(email_data))
                 subject = email_data.get('subject', '')
-                if 'warp' in subject.lower():
-                    # 优先使用HTML内容，其次是纯文本
-                    body_content = email_data.get('htmlContent') or email_data.get('content', '')
-                    verification_data = self._extract_verification_link(body_content)
-                    if verification_data:
-                        logger.info(f"✅ 找到验证邮件: {subject}")
-                        return verification_data
+                # 优先使用HTML内容，其次是纯文本
+                body_content = email_data.get('htmlContent') or email_data.get('content', '')
+                verification_data = self._extract_verification_link(body_content)
+                if verification_data:
+                    logger.info(f"✅ 找到验证邮件: {subject}")
+                    return verification_data
 
         except Exception as e:
             logger.error(f"TEMP_MAIL_API邮件检查失败: {e}")
 
         return None
 
+    @staticmethod
+    def _email_key(email_data: Dict[str, Any]):
+        """邮件的唯一标识（优先使用id，否则使用日期+主题）"""
+        return email_data.get('id') or (email_data.get('date', ''), email_data.get('subject', ''))
+
     def _extract_verification_link(self, body_content: str) -> Optional[Dict[str, Any]]:
         """从邮件内容中提取验证链接"""
-        link_patterns = [
-            r'href=["\'](https://[^"\']*firebaseapp\.com[^"\']*)["\']',
-            r'(https://astral-field[^"\'\s<>]+)',
-            r'https://[^"\'\s<>]*__/auth/action[^"\'\s<>]*',
-            r'(https://[^\s<>]+\?.*oobCode=[^"\'\s<>]+)'
-        ]
-
-        for pattern in link_patterns:
-            matches = re.findall(pattern, body_content, re.IGNORECASE)
+        # 所有有效链接都必须携带 oobCode 参数，先做子串预筛，避免无谓的正则扫描
+        if not body_content or 'oobCode' not in body_content:
+            return None
+
+        # HTML 邮件：单次解析 DOM，只检查 <a href>
+        if '<' in body_content:
+            for node in LexborHTMLParser(body_content).css('a[href]'):
+                href = node.attributes.get('href') or ''
+                if 'oobCode=' in href:
+                    verification_data = self._parse_verification_link(href)
+                    if verification_data:
+                        return verification_data
+
+        # 纯文本邮件或解析器未找到链接时回退到正则
+        for pattern in _LINK_PATTERNS:
+            matches = pattern.findall(body_content)
             if matches:
-                verification_link = html.unescape(matches[0])
-                verification_link = verification_link.replace('&amp;', '&')
+                verification_data = self._parse_verification_link(matches[0])
+                if verification_data:
+                    return verification_data
 
-                parsed = urlparse(verification_link)
-                params = parse_qs(parsed.query)
+        return None
 
-                oob_code = params.get('oobCode', [None])[0]
-                if oob_code:
-                    return {
-                        "oob_code": oob_code,
-                        "verification_link": verification_link
-                    }
+    @staticmethod
+    def _parse_verification_link(link: str) -> Optional[Dict[str, Any]]:
+        """清理链接并解析其中的 oobCode"""
+        verification_link = html.unescape(link)
+        verification_link = verification_link.replace('&amp;', '&')
+
+        parsed = urlparse(verification_link)
+        params = parse_qs(parsed.query)
 
+        oob_code = params.get('oobCode', [None])[0]
+        if oob_code:
+            return {
+                "oob_code": oob_code,
+                "verification_link": verification_link
+            }
         return None
 
     def _check_email_sync(self, access_token: str, email: str) -> Optional[Dict[str, Any]]:
@@ -389,46 +1259,23 @@ class WarpRegistrationBot:
                             if status == 'OK' and message_ids[0]:
                                 email_ids = message_ids[0].split()
 
-                                # 检查最新的几封邮件
-                                for message_id in reversed(email_ids[-3:]):  # 只检查最新的3封
-                                    status, msg_data = mail.fetch(message_id, '(RFC822)')
-
-                                    if status != 'OK':
-                                        continue
-
-                                    for response_part in msg_data:
-                                        if isinstance(response_part, tuple):
-                                            msg = email_lib.message_from_bytes(response_part[1])
-
-                                            # 改进的邮件内容提取
-                                            body = self._extract_email_body(msg)
-
-                                            # 改进的链接提取模式
-                                            link_patterns = [
-                                                r'href=["\'](https://[^"\']*firebaseapp\.com[^"\']*)["\']',
-                                                r'(https://astral-field[^"\'\s<>]+)',  # 直接匹配您的特定域名
-                                                r'https://[^"\'\s<>]*__/auth/action[^"\'\s<>]*'
-                                            ]
-
-                                            for pattern in link_patterns:
-                                                matches = re.findall(pattern, body, re.IGNORECASE)
-                                                if matches:
-                                                    # 清理链接
-                                                    verification_link = html.unescape(matches[0])
-                                                    verification_link = verification_link.replace('&amp;', '&')
-
-                                                    # 解析参数
-                                                    parsed = urlparse(verification_link)
-                                                    params = parse_qs(parsed.query)
-
-                                                    oob_code = params.get('oobCode', [None])[0]
-                                                    if oob_code:
-                                                        mail.logout()
-                                                        logger.info(f"✅ 找到验证码: {oob_code}")
-                                                        return {
-                                                            "oob_code": oob_code,
-                                                            "verification_link": verification_link
-                                                        }
+                                # 一次 FETCH 取回最新的3封；BODY.PEEK 不会把邮件标记为已读
+                                status, msg_data = mail.fetch(b','.join(email_ids[-3:]), '(BODY.PEEK[])')
+
+                                if status != 'OK':
+                                    continue
+
+                                # 响应按序号升序返回，倒序遍历以优先检查最新邮件
+                                for response_part in reversed(msg_data):
+                                    if isinstance(response_part, tuple):
+                                        # 改进的邮件内容提取
+                                        body = self._extract_email_body(response_part[1])
+
+                                        verification_data = self._extract_verification_link(body)
+                                        if verification_data:
+                                            mail.logout()
+                                            logger.info(f"✅ 找到验证码: {verification_data['oob_code']}")
+                                            return verification_data
 
                         except Exception as e:
                             logger.warning(f"搜索条件 '{criteria}' 出错: {e}")
@@ -445,36 +1292,15 @@ class WarpRegistrationBot:
 
         return None
 
-    def _extract_email_body(self, msg):
-        """提取邮件正文内容（处理多部分邮件）"""
-        body = ""
-
-        if msg.is_multipart():
-            for part in msg.walk():
-                content_type = part.get_content_type()
-                content_disposition = str(part.get("Content-Disposition"))
-
-                # 跳过附件
-                if "attachment" in content_disposition:
-                    continue
-
-                if content_type in ["text/plain", "text/html"]:
-                    try:
-                        payload = part.get_payload(decode=True)
-                        if payload:
-                            body += payload.decode('utf-8', errors='ignore')
-                    except Exception as e:
-                        logger.debug(f"解析邮件部分出错: {e}")
-        else:
-            # 单部分邮件
-            try:
-                payload = msg.get_payload(decode=True)
-                if payload:
-                    body = payload.decode('utf-8', errors='ignore')
-            except Exception as e:
-                logger.debug(f"解析单部分邮件出错: {e}")
-
-        return body
+    def _extract_email_body(self, raw: bytes) -> str:
+        """提取邮件正文内容（优先HTML，其次纯文本）"""
+        try:
+            msg = _EMAIL_PARSER.parsebytes(raw)
+            part = msg.get_body(preferencelist=('html', 'plain'))
+            return part.get_content() if part else ""
+        except Exception as e:
+            logger.debug(f"解析邮件出错: {e}")
+            return ""
 
     def extract_and_recombine_url(self, original_url):
         """
@@ -486,46 +1312,24 @@ class WarpRegistrationBot:
         Returns:
             str: 重新组合后的URL
         """
-        # 解析URL
-        parsed = urlparse(original_url)
-
-        # 提取查询参数
-        query_params = parse_qs(parsed.query)
-
-        # 提取需要的参数，注意parse_qs返回的是列表，我们取第一个值
-        api_key = query_params.get('apiKey', [''])[0]
-        mode = query_params.get('mode', [''])[0]
-        oob_code = query_params.get('oobCode', [''])[0]
-        lang = query_params.get('lang', [''])[0]
-
-        # 从continueUrl中提取基础路径
-        continue_url = query_params.get('continueUrl', [''])[0]
-        if continue_url:
-            # 解析continueUrl获取基础路径
-            continue_parsed = urlparse(continue_url)
-            base_path = continue_parsed.path
-        else:
-            base_path = '/login'  # 默认路径
-
-        # 构建新的查询参数
-        new_params = {
-            'apiKey': api_key,
-            'oobCode': oob_code,
-            'mode': mode,
-            'lang': lang
-        }
+        query_params = parse_qs(urlparse(original_url).query)
 
-        # 构建新的URL
-        new_url = urlunparse((
-            'https',  # scheme
-            'app.warp.dev',  # netloc
-            base_path,  # path
-            '',  # params
-            urlencode(new_params),  # query
-            ''  # fragment
-        ))
+        # 注意parse_qs返回的是列表，我们取第一个值
+        def first(name):
+            return query_params.get(name, [''])[0]
 
-        return new_url
+        # 从continueUrl中提取基础路径，默认的登录地址无需再次解析
+        continue_url = first('continueUrl')
+        if not continue_url or continue_url == WARP_LOGIN_URL:
+            base_path = '/login'
+        else:
+            base_path = urlparse(continue_url).path
+
+        return (f"https://app.warp.dev{base_path}"
+                f"?apiKey={quote_plus(first('apiKey'))}"
+                f"&oobCode={quote_plus(first('oobCode'))}"
+                f"&mode={quote_plus(first('mode'))}"
+                f"&lang={quote_plus(first('lang'))}")
 
     async def complete_email_signin(self, email: str, oob_code: str) -> Dict[str, Any]:
         """完成邮箱登录"""
@@ -537,17 +1341,11 @@ class WarpRegistrationBot:
             "oobCode": oob_code
         }
 
-        headers = {
-            "Content-Type": "application/json",
-            "User-Agent": self.user_agent,
-            "Accept": "*/*"
-        }
-
         try:
-            response = await self.async_client.post(url, json=payload, headers=headers)
+            response = await self.async_client.post(url, content=orjson.dumps(payload), headers=self._json_headers)
 
             if response.status_code == 200:
-                data = response.json()
+                data = orjson.loads(response.content)
                 logger.info(f"✅ 登录成功 [{email}]: {data}")
                 return {
                     "success": True,
@@ -595,26 +1393,22 @@ class WarpRegistrationBot:
             "query": query
         }
 
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {id_token}",
-            "User-Agent": self.user_agent,
-            "Accept": "*/*",
-            "referer": "https://app.warp.dev/login"
-        }
+        auth_headers = {**self._json_headers, "Authorization": f"Bearer {id_token}"}
+        headers = {**auth_headers, "referer": "https://app.warp.dev/login"}
         # print(f"cookies: {self.async_client.cookies}")  # Debug log
 
         try:
             response = await self.async_client.post(
                 url,
                 params={"op": "GetOrCreateUser"},
-                json=data,
+                content=orjson.dumps(data),
                 headers=headers
             )
-            print(f"[{response.status_code}] Activate Warp Response: {response.text}")  # Debug log
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("[%s] Activate Warp Response: %s", response.status_code, response.text)
 
             if response.status_code == 200:
-                result = response.json()
+                result = orjson.loads(response.content)
                 user_data = result.get("data", {}).get("getOrCreateUser", {})
 
                 if user_data.get("__typename") == "GetOrCreateUserOutput":
@@ -624,22 +1418,18 @@ class WarpRegistrationBot:
                     response = await self.async_client.post(
                         url,
                         params={"op": "UpdateOnboardingSurveyStatus"},
-                        json={
+                        content=orjson.dumps({
                             "operationName": "UpdateOnboardingSurveyStatus",
                             "variables": {
                                 "input": {"status":"SKIPPED"},
                                 "requestContext": {"osContext":{},"clientContext":{}}
                             },
                             "query": "mutation UpdateOnboardingSurveyStatus($input: UpdateOnboardingSurveyStatusInput!, $requestContext: RequestContext!) {\n  updateOnboardingSurveyStatus(input: $input, requestContext: $requestContext) {\n    __typename\n    ... on UpdateOnboardingSurveyStatusOutput {\n      status\n      responseContext {\n        __typename\n      }\n      __typename\n    }\n    ... on UserFacingError {\n      error {\n        message\n        __typename\n      }\n      __typename\n    }\n  }\n}\n"
-                        },
-                        headers={
-                            "Content-Type": "application/json",
-                            "Authorization": f"Bearer {id_token}",
-                            "User-Agent": self.user_agent,
-                            "Accept": "*/*",
-                        }
+                        }),
+                        headers=auth_headers
                     )
-                    print(f"Update Onboarding Survey Status Response: {response.text}")  # Debug log
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug("Update Onboarding Survey Status Response: %s", response.text)
 
                     return {
                         "success": True,
@@ -661,1447 +1451,55 @@ class WarpRegistrationBot:
         所有字段都包含在内，没有任何省略
         """
 
-        # 扩展的基础配置文件 - 包含更多真实捕获的配置
-        BASE_PROFILES_EXTENDED = [
-            {
-                "profile_name": "Win10_Chrome_NVIDIA_GTX1660Ti",
-                "os": "Windows",
-                "os_version": "10.0.0",
-                "platform": "Win32",
-                "architecture": "x86",
-                "bitness": 64,
-                "vendor": "Google Inc.",
-                "gpu_vendor_string": "Google Inc. (NVIDIA)",
-                "gpu_renderer": "ANGLE (NVIDIA, NVIDIA GeForce GTX 1660 Ti (0x00002182) Direct3D11 vs_5_0 ps_5_0, D3D11)",
-                "screen_resolution": {"width": 1707, "height": 960},
-                "hardware_config": {"memory": 8, "cores": 12},
-                "hashes": {
-                    "prototype_hash": "5051906984991708",
-                    "math_hash": "4407615957639726",
-                    "offline_audio_hash": "733027540168168",
-                    "mime_types_hash": "6633968372405724",
-                    "errors_hash": "1415081268456649"
-                }
-            },
-            {
-                "profile_name": "Win10_Chrome_AMD_Radeon",
-                "os": "Windows",
-                "os_version": "10.0.0",
-                "platform": "Win32",
-                "architecture": "x86",
-                "bitness": 64,
-                "vendor": "Google Inc.",
-                "gpu_vendor_string": "Google Inc. (AMD)",
-                "gpu_renderer": "ANGLE (AMD, AMD Radeon(TM) Graphics (0x00001638) Direct3D11 vs_5_0 ps_5_0, D3D11)",
-                "screen_resolution": {"width": 1536, "height": 864},
-                "hardware_config": {"memory": 8, "cores": 16},
-                "hashes": {
-                    "prototype_hash": "4842229194603551",
-                    "math_hash": "4407615957639726",
-                    "offline_audio_hash": "733027540168168",
-                    "mime_types_hash": "2795763505992044",
-                    "errors_hash": "1415081268456649"
-                }
-            },
-            {
-                "profile_name": "Win10_Chrome_NVIDIA_RTX3060",
-                "os": "Windows",
-                "os_version": "10.0.0",
-                "platform": "Win32",
-                "architecture": "x86",
-                "bitness": 64,
-                "vendor": "Google Inc.",
-                "gpu_vendor_string": "Google Inc. (NVIDIA)",
-                "gpu_renderer": "ANGLE (NVIDIA, NVIDIA GeForce RTX 3060 (0x00002503) Direct3D11 vs_5_0 ps_5_0, D3D11)",
-                "screen_resolution": {"width": 1920, "height": 1080},
-                "hardware_config": {"memory": 16, "cores": 8},
-                "hashes": {
-                    "prototype_hash": "5051906984991708",
-                    "math_hash": "4407615957639726",
-                    "offline_audio_hash": "733027540168168",
-                    "mime_types_hash": "6633968372405724",
-                    "errors_hash": "1415081268456649"
-                }
-            }
-        ]
-
-        # Chrome/Edge 版本配置 - 完整版本信息
-        BROWSER_VERSIONS_COMPLETE = [
-            {
-                "browser": "Chrome",
-                "major": 140,
-                "full_version": "140.0.7339.208",
-                "brands": [
-                    {"brand": "Chromium", "version": "140"},
-                    {"brand": "Not=A?Brand", "version": "24"},
-                    {"brand": "Google Chrome", "version": "140"}
-                ]
-            },
-            {
-                "browser": "Edge",
-                "major": 141,
-                "full_version": "141.0.3537.57",
-                "full_chromium_version": "141.0.7390.55",
-                "brands": [
-                    {"brand": "Microsoft Edge", "version": "141"},
-                    {"brand": "Not?A_Brand", "version": "8"},
-                    {"brand": "Chromium", "version": "141"}
-                ]
-            },
-            {
-                "browser": "Chrome",
-                "major": 128,
-                "full_version": "128.0.6613.137",
-                "brands": [
-                    {"brand": "Chromium", "version": "128"},
-                    {"brand": "Not-A.Brand", "version": "24"},
-                    {"brand": "Google Chrome", "version": "128"}
-                ]
-            },
-            {
-                "browser": "Chrome",
-                "major": 126,
-                "full_version": "126.0.6478.126",
-                "brands": [
-                    {"brand": "Chromium", "version": "126"},
-                    {"brand": "Not-A.Brand", "version": "24"},
-                    {"brand": "Google Chrome", "version": "126"}
-                ]
-            }
-        ]
-
-        # 语言配置
-        LANGUAGE_CONFIGS_FIXED = [
-            {"lang": "zh-CN", "languages": ["zh-CN", "zh"], "timezone_offset": 8, "timezone": "Asia/Shanghai"},
-            {"lang": "zh-CN", "languages": ["zh-CN", "zh", "en"], "timezone_offset": 8, "timezone": "Asia/Shanghai"},
-            {"lang": "zh-CN", "languages": ["zh-CN"], "timezone_offset": 8, "timezone": "Asia/Shanghai"},
-            {"lang": "en-US", "languages": ["en-US", "en"], "timezone_offset": -5, "timezone": "America/New_York"},
-            {"lang": "en-US", "languages": ["en-US", "en"], "timezone_offset": -7, "timezone": "America/Los_Angeles"}
-        ]
-
-        # 加载基础 window_keys 模板
-        base_window_keys = [
-            "Object",
-            "Function",
-            "Array",
-            "Number",
-            "parseFloat",
-            "parseInt",
-            "Infinity",
-            "NaN",
-            "undefined",
-            "Boolean",
-            "String",
-            "Symbol",
-            "Date",
-            "Promise",
-            "RegExp",
-            "Error",
-            "AggregateError",
-            "EvalError",
-            "RangeError",
-            "ReferenceError",
-            "SyntaxError",
-            "TypeError",
-            "URIError",
-            "globalThis",
-            "JSON",
-            "Math",
-            "Intl",
-            "ArrayBuffer",
-            "Atomics",
-            "Uint8Array",
-            "Int8Array",
-            "Uint16Array",
-            "Int16Array",
-            "Uint32Array",
-            "Int32Array",
-            "BigUint64Array",
-            "BigInt64Array",
-            "Uint8ClampedArray",
-            "Float32Array",
-            "Float64Array",
-            "DataView",
-            "Map",
-            "BigInt",
-            "Set",
-            "Iterator",
-            "WeakMap",
-            "WeakSet",
-            "Proxy",
-            "Reflect",
-            "FinalizationRegistry",
-            "WeakRef",
-            "decodeURI",
-            "decodeURIComponent",
-            "encodeURI",
-            "encodeURIComponent",
-            "escape",
-            "unescape",
-            "eval",
-            "isFinite",
-            "isNaN",
-            "console",
-            "Option",
-            "Image",
-            "Audio",
-            "webkitURL",
-            "webkitRTCPeerConnection",
-            "webkitMediaStream",
-            "WebKitMutationObserver",
-            "WebKitCSSMatrix",
-            "XSLTProcessor",
-            "XPathResult",
-            "XPathExpression",
-            "XPathEvaluator",
-            "XMLSerializer",
-            "XMLHttpRequestUpload",
-            "XMLHttpRequestEventTarget",
-            "XMLHttpRequest",
-            "XMLDocument",
-            "WritableStreamDefaultWriter",
-            "WritableStreamDefaultController",
-            "WritableStream",
-            "Worker",
-            "WindowControlsOverlayGeometryChangeEvent",
-            "WindowControlsOverlay",
-            "Window",
-            "WheelEvent",
-            "WebSocket",
-            "WebGLVertexArrayObject",
-            "WebGLUniformLocation",
-            "WebGLTransformFeedback",
-            "WebGLTexture",
-            "WebGLSync",
-            "WebGLShaderPrecisionFormat",
-            "WebGLShader",
-            "WebGLSampler",
-            "WebGLRenderingContext",
-            "WebGLRenderbuffer",
-            "WebGLQuery",
-            "WebGLProgram",
-            "WebGLObject",
-            "WebGLFramebuffer",
-            "WebGLContextEvent",
-            "WebGLBuffer",
-            "WebGLActiveInfo",
-            "WebGL2RenderingContext",
-            "WaveShaperNode",
-            "VisualViewport",
-            "VisibilityStateEntry",
-            "VirtualKeyboardGeometryChangeEvent",
-            "ViewTransitionTypeSet",
-            "ViewTransition",
-            "ViewTimeline",
-            "VideoPlaybackQuality",
-            "VideoFrame",
-            "VideoColorSpace",
-            "ValidityState",
-            "VTTCue",
-            "UserActivation",
-            "URLSearchParams",
-            "URLPattern",
-            "URL",
-            "UIEvent",
-            "TrustedTypePolicyFactory",
-            "TrustedTypePolicy",
-            "TrustedScriptURL",
-            "TrustedScript",
-            "TrustedHTML",
-            "TreeWalker",
-            "TransitionEvent",
-            "TransformStreamDefaultController",
-            "TransformStream",
-            "TrackEvent",
-            "TouchList",
-            "TouchEvent",
-            "Touch",
-            "ToggleEvent",
-            "TimeRanges",
-            "TextUpdateEvent",
-            "TextTrackList",
-            "TextTrackCueList",
-            "TextTrackCue",
-            "TextTrack",
-            "TextMetrics",
-            "TextFormatUpdateEvent",
-            "TextFormat",
-            "TextEvent",
-            "TextEncoderStream",
-            "TextEncoder",
-            "TextDecoderStream",
-            "TextDecoder",
-            "Text",
-            "TaskSignal",
-            "TaskPriorityChangeEvent",
-            "TaskController",
-            "TaskAttributionTiming",
-            "SyncManager",
-            "Subscriber",
-            "SubmitEvent",
-            "StyleSheetList",
-            "StyleSheet",
-            "StylePropertyMapReadOnly",
-            "StylePropertyMap",
-            "StorageEvent",
-            "Storage",
-            "StereoPannerNode",
-            "StaticRange",
-            "SourceBufferList",
-            "SourceBuffer",
-            "ShadowRoot",
-            "Selection",
-            "SecurityPolicyViolationEvent",
-            "ScrollTimeline",
-            "ScriptProcessorNode",
-            "ScreenOrientation",
-            "Screen",
-            "Scheduling",
-            "Scheduler",
-            "SVGViewElement",
-            "SVGUseElement",
-            "SVGUnitTypes",
-            "SVGTransformList",
-            "SVGTransform",
-            "SVGTitleElement",
-            "SVGTextPositioningElement",
-            "SVGTextPathElement",
-            "SVGTextElement",
-            "SVGTextContentElement",
-            "SVGTSpanElement",
-            "SVGSymbolElement",
-            "SVGSwitchElement",
-            "SVGStyleElement",
-            "SVGStringList",
-            "SVGStopElement",
-            "SVGSetElement",
-            "SVGScriptElement",
-            "SVGSVGElement",
-            "SVGRectElement",
-            "SVGRect",
-            "SVGRadialGradientElement",
-            "SVGPreserveAspectRatio",
-            "SVGPolylineElement",
-            "SVGPolygonElement",
-            "SVGPointList",
-            "SVGPoint",
-            "SVGPatternElement",
-            "SVGPathElement",
-            "SVGNumberList",
-            "SVGNumber",
-            "SVGMetadataElement",
-            "SVGMatrix",
-            "SVGMaskElement",
-            "SVGMarkerElement",
-            "SVGMPathElement",
-            "SVGLinearGradientElement",
-            "SVGLineElement",
-            "SVGLengthList",
-            "SVGLength",
-            "SVGImageElement",
-            "SVGGraphicsElement",
-            "SVGGradientElement",
-            "SVGGeometryElement",
-            "SVGGElement",
-            "SVGForeignObjectElement",
-            "SVGFilterElement",
-            "SVGFETurbulenceElement",
-            "SVGFETileElement",
-            "SVGFESpotLightElement",
-            "SVGFESpecularLightingElement",
-            "SVGFEPointLightElement",
-            "SVGFEOffsetElement",
-            "SVGFEMorphologyElement",
-            "SVGFEMergeNodeElement",
-            "SVGFEMergeElement",
-            "SVGFEImageElement",
-            "SVGFEGaussianBlurElement",
-            "SVGFEFuncRElement",
-            "SVGFEFuncGElement",
-            "SVGFEFuncBElement",
-            "SVGFEFuncAElement",
-            "SVGFEFloodElement",
-            "SVGFEDropShadowElement",
-            "SVGFEDistantLightElement",
-            "SVGFEDisplacementMapElement",
-            "SVGFEDiffuseLightingElement",
-            "SVGFEConvolveMatrixElement",
-            "SVGFECompositeElement",
-            "SVGFEComponentTransferElement",
-            "SVGFEColorMatrixElement",
-            "SVGFEBlendElement",
-            "SVGEllipseElement",
-            "SVGElement",
-            "SVGDescElement",
-            "SVGDefsElement",
-            "SVGComponentTransferFunctionElement",
-            "SVGClipPathElement",
-            "SVGCircleElement",
-            "SVGAnimationElement",
-            "SVGAnimatedTransformList",
-            "SVGAnimatedString",
-            "SVGAnimatedRect",
-            "SVGAnimatedPreserveAspectRatio",
-            "SVGAnimatedNumberList",
-            "SVGAnimatedNumber",
-            "SVGAnimatedLengthList",
-            "SVGAnimatedLength",
-            "SVGAnimatedInteger",
-            "SVGAnimatedEnumeration",
-            "SVGAnimatedBoolean",
-            "SVGAnimatedAngle",
-            "SVGAnimateTransformElement",
-            "SVGAnimateMotionElement",
-            "SVGAnimateElement",
-            "SVGAngle",
-            "SVGAElement",
-            "Response",
-            "ResizeObserverSize",
-            "ResizeObserverEntry",
-            "ResizeObserver",
-            "Request",
-            "ReportingObserver",
-            "ReportBody",
-            "ReadableStreamDefaultReader",
-            "ReadableStreamDefaultController",
-            "ReadableStreamBYOBRequest",
-            "ReadableStreamBYOBReader",
-            "ReadableStream",
-            "ReadableByteStreamController",
-            "Range",
-            "RadioNodeList",
-            "RTCTrackEvent",
-            "RTCStatsReport",
-            "RTCSessionDescription",
-            "RTCSctpTransport",
-            "RTCRtpTransceiver",
-            "RTCRtpSender",
-            "RTCRtpReceiver",
-            "RTCPeerConnectionIceEvent",
-            "RTCPeerConnectionIceErrorEvent",
-            "RTCPeerConnection",
-            "RTCIceTransport",
-            "RTCIceCandidate",
-            "RTCErrorEvent",
-            "RTCError",
-            "RTCEncodedVideoFrame",
-            "RTCEncodedAudioFrame",
-            "RTCDtlsTransport",
-            "RTCDataChannelEvent",
-            "RTCDTMFToneChangeEvent",
-            "RTCDTMFSender",
-            "RTCCertificate",
-            "PromiseRejectionEvent",
-            "ProgressEvent",
-            "Profiler",
-            "ProcessingInstruction",
-            "PopStateEvent",
-            "PointerEvent",
-            "PluginArray",
-            "Plugin",
-            "PictureInPictureWindow",
-            "PictureInPictureEvent",
-            "PeriodicWave",
-            "PerformanceTiming",
-            "PerformanceServerTiming",
-            "PerformanceScriptTiming",
-            "PerformanceResourceTiming",
-            "PerformancePaintTiming",
-            "PerformanceObserverEntryList",
-            "PerformanceObserver",
-            "PerformanceNavigationTiming",
-            "PerformanceNavigation",
-            "PerformanceMeasure",
-            "PerformanceMark",
-            "PerformanceLongTaskTiming",
-            "PerformanceLongAnimationFrameTiming",
-            "PerformanceEventTiming",
-            "PerformanceEntry",
-            "PerformanceElementTiming",
-            "Performance",
-            "Path2D",
-            "PannerNode",
-            "PageTransitionEvent",
-            "OverconstrainedError",
-            "OscillatorNode",
-            "OffscreenCanvasRenderingContext2D",
-            "OffscreenCanvas",
-            "OfflineAudioContext",
-            "OfflineAudioCompletionEvent",
-            "Observable",
-            "NodeList",
-            "NodeIterator",
-            "NodeFilter",
-            "Node",
-            "NetworkInformation",
-            "NavigatorUAData",
-            "Navigator",
-            "NavigationTransition",
-            "NavigationHistoryEntry",
-            "NavigationDestination",
-            "NavigationCurrentEntryChangeEvent",
-            "NavigationActivation",
-            "Navigation",
-            "NavigateEvent",
-            "NamedNodeMap",
-            "MutationRecord",
-            "MutationObserver",
-            "MouseEvent",
-            "MimeTypeArray",
-            "MimeType",
-            "MessagePort",
-            "MessageEvent",
-            "MessageChannel",
-            "MediaStreamTrackVideoStats",
-            "MediaStreamTrackProcessor",
-            "MediaStreamTrackGenerator",
-            "MediaStreamTrackEvent",
-            "MediaStreamTrackAudioStats",
-            "MediaStreamTrack",
-            "MediaStreamEvent",
-            "MediaStreamAudioSourceNode",
-            "MediaStreamAudioDestinationNode",
-            "MediaStream",
-            "MediaSourceHandle",
-            "MediaSource",
-            "MediaRecorder",
-            "MediaQueryListEvent",
-            "MediaQueryList",
-            "MediaList",
-            "MediaError",
-            "MediaEncryptedEvent",
-            "MediaElementAudioSourceNode",
-            "MediaCapabilities",
-            "MathMLElement",
-            "Location",
-            "LayoutShiftAttribution",
-            "LayoutShift",
-            "LargestContentfulPaint",
-            "KeyframeEffect",
-            "KeyboardEvent",
-            "IntersectionObserverEntry",
-            "IntersectionObserver",
-            "InputEvent",
-            "InputDeviceInfo",
-            "InputDeviceCapabilities",
-            "Ink",
-            "ImageData",
-            "ImageBitmapRenderingContext",
-            "ImageBitmap",
-            "IdleDeadline",
-            "IIRFilterNode",
-            "IDBVersionChangeEvent",
-            "IDBTransaction",
-            "IDBRequest",
-            "IDBOpenDBRequest",
-            "IDBObjectStore",
-            "IDBKeyRange",
-            "IDBIndex",
-            "IDBFactory",
-            "IDBDatabase",
-            "IDBCursorWithValue",
-            "IDBCursor",
-            "History",
-            "HighlightRegistry",
-            "Highlight",
-            "Headers",
-            "HashChangeEvent",
-            "HTMLVideoElement",
-            "HTMLUnknownElement",
-            "HTMLUListElement",
-            "HTMLTrackElement",
-            "HTMLTitleElement",
-            "HTMLTimeElement",
-            "HTMLTextAreaElement",
-            "HTMLTemplateElement",
-            "HTMLTableSectionElement",
-            "HTMLTableRowElement",
-            "HTMLTableElement",
-            "HTMLTableColElement",
-            "HTMLTableCellElement",
-            "HTMLTableCaptionElement",
-            "HTMLStyleElement",
-            "HTMLSpanElement",
-            "HTMLSourceElement",
-            "HTMLSlotElement",
-            "HTMLSelectElement",
-            "HTMLScriptElement",
-            "HTMLQuoteElement",
-            "HTMLProgressElement",
-            "HTMLPreElement",
-            "HTMLPictureElement",
-            "HTMLParamElement",
-            "HTMLParagraphElement",
-            "HTMLOutputElement",
-            "HTMLOptionsCollection",
-            "HTMLOptionElement",
-            "HTMLOptGroupElement",
-            "HTMLObjectElement",
-            "HTMLOListElement",
-            "HTMLModElement",
-            "HTMLMeterElement",
-            "HTMLMetaElement",
-            "HTMLMenuElement",
-            "HTMLMediaElement",
-            "HTMLMarqueeElement",
-            "HTMLMapElement",
-            "HTMLLinkElement",
-            "HTMLLegendElement",
-            "HTMLLabelElement",
-            "HTMLLIElement",
-            "HTMLInputElement",
-            "HTMLImageElement",
-            "HTMLIFrameElement",
-            "HTMLHtmlElement",
-            "HTMLHeadingElement",
-            "HTMLHeadElement",
-            "HTMLHRElement",
-            "HTMLFrameSetElement",
-            "HTMLFrameElement",
-            "HTMLFormElement",
-            "HTMLFormControlsCollection",
-            "HTMLFontElement",
-            "HTMLFieldSetElement",
-            "HTMLEmbedElement",
-            "HTMLElement",
-            "HTMLDocument",
-            "HTMLDivElement",
-            "HTMLDirectoryElement",
-            "HTMLDialogElement",
-            "HTMLDetailsElement",
-            "HTMLDataListElement",
-            "HTMLDataElement",
-            "HTMLDListElement",
-            "HTMLCollection",
-            "HTMLCanvasElement",
-            "HTMLButtonElement",
-            "HTMLBodyElement",
-            "HTMLBaseElement",
-            "HTMLBRElement",
-            "HTMLAudioElement",
-            "HTMLAreaElement",
-            "HTMLAnchorElement",
-            "HTMLAllCollection",
-            "GeolocationPositionError",
-            "GeolocationPosition",
-            "GeolocationCoordinates",
-            "Geolocation",
-            "GamepadHapticActuator",
-            "GamepadEvent",
-            "GamepadButton",
-            "Gamepad",
-            "GainNode",
-            "FormDataEvent",
-            "FormData",
-            "FontFaceSetLoadEvent",
-            "FontFace",
-            "FocusEvent",
-            "FileReader",
-            "FileList",
-            "File",
-            "FeaturePolicy",
-            "External",
-            "EventTarget",
-            "EventSource",
-            "EventCounts",
-            "Event",
-            "ErrorEvent",
-            "EncodedVideoChunk",
-            "EncodedAudioChunk",
-            "ElementInternals",
-            "Element",
-            "EditContext",
-            "DynamicsCompressorNode",
-            "DragEvent",
-            "DocumentType",
-            "DocumentTimeline",
-            "DocumentFragment",
-            "Document",
-            "DelegatedInkTrailPresenter",
-            "DelayNode",
-            "DecompressionStream",
-            "DataTransferItemList",
-            "DataTransferItem",
-            "DataTransfer",
-            "DOMTokenList",
-            "DOMStringMap",
-            "DOMStringList",
-            "DOMRectReadOnly",
-            "DOMRectList",
-            "DOMRect",
-            "DOMQuad",
-            "DOMPointReadOnly",
-            "DOMPoint",
-            "DOMParser",
-            "DOMMatrixReadOnly",
-            "DOMMatrix",
-            "DOMImplementation",
-            "DOMException",
-            "DOMError",
-            "CustomStateSet",
-            "CustomEvent",
-            "CustomElementRegistry",
-            "Crypto",
-            "CountQueuingStrategy",
-            "ConvolverNode",
-            "ContentVisibilityAutoStateChangeEvent",
-            "ConstantSourceNode",
-            "CompressionStream",
-            "CompositionEvent",
-            "Comment",
-            "CommandEvent",
-            "CloseWatcher",
-            "CloseEvent",
-            "ClipboardEvent",
-            "CharacterData",
-            "CharacterBoundsUpdateEvent",
-            "ChannelSplitterNode",
-            "ChannelMergerNode",
-            "CaretPosition",
-            "CanvasRenderingContext2D",
-            "CanvasPattern",
-            "CanvasGradient",
-            "CanvasCaptureMediaStreamTrack",
-            "CSSViewTransitionRule",
-            "CSSVariableReferenceValue",
-            "CSSUnparsedValue",
-            "CSSUnitValue",
-            "CSSTranslate",
-            "CSSTransition",
-            "CSSTransformValue",
-            "CSSTransformComponent",
-            "CSSSupportsRule",
-            "CSSStyleValue",
-            "CSSStyleSheet",
-            "CSSStyleRule",
-            "CSSStyleDeclaration",
-            "CSSStartingStyleRule",
-            "CSSSkewY",
-            "CSSSkewX",
-            "CSSSkew",
-            "CSSScopeRule",
-            "CSSScale",
-            "CSSRuleList",
-            "CSSRule",
-            "CSSRotate",
-            "CSSPropertyRule",
-            "CSSPositionValue",
-            "CSSPositionTryRule",
-            "CSSPositionTryDescriptors",
-            "CSSPerspective",
-            "CSSPageRule",
-            "CSSNumericValue",
-            "CSSNumericArray",
-            "CSSNestedDeclarations",
-            "CSSNamespaceRule",
-            "CSSMediaRule",
-            "CSSMatrixComponent",
-            "CSSMathValue",
-            "CSSMathSum",
-            "CSSMathProduct",
-            "CSSMathNegate",
-            "CSSMathMin",
-            "CSSMathMax",
-            "CSSMathInvert",
-            "CSSMathClamp",
-            "CSSMarginRule",
-            "CSSLayerStatementRule",
-            "CSSLayerBlockRule",
-            "CSSKeywordValue",
-            "CSSKeyframesRule",
-            "CSSKeyframeRule",
-            "CSSImportRule",
-            "CSSImageValue",
-            "CSSGroupingRule",
-            "CSSFontPaletteValuesRule",
-            "CSSFontFaceRule",
-            "CSSCounterStyleRule",
-            "CSSContainerRule",
-            "CSSConditionRule",
-            "CSSAnimation",
-            "CSS",
-            "CSPViolationReportBody",
-            "CDATASection",
-            "ByteLengthQueuingStrategy",
-            "BrowserCaptureMediaStreamTrack",
-            "BroadcastChannel",
-            "BlobEvent",
-            "Blob",
-            "BiquadFilterNode",
-            "BeforeUnloadEvent",
-            "BeforeInstallPromptEvent",
-            "BaseAudioContext",
-            "BarProp",
-            "AudioWorkletNode",
-            "AudioSinkInfo",
-            "AudioScheduledSourceNode",
-            "AudioProcessingEvent",
-            "AudioParamMap",
-            "AudioParam",
-            "AudioNode",
-            "AudioListener",
-            "AudioDestinationNode",
-            "AudioData",
-            "AudioContext",
-            "AudioBufferSourceNode",
-            "AudioBuffer",
-            "Attr",
-            "AnimationTimeline",
-            "AnimationPlaybackEvent",
-            "AnimationEvent",
-            "AnimationEffect",
-            "Animation",
-            "AnalyserNode",
-            "AbstractRange",
-            "AbortSignal",
-            "AbortController",
-            "window",
-            "self",
-            "document",
-            "name",
-            "location",
-            "customElements",
-            "history",
-            "navigation",
-            "locationbar",
-            "menubar",
-            "personalbar",
-            "scrollbars",
-            "statusbar",
-            "toolbar",
-            "status",
-            "closed",
-            "frames",
-            "length",
-            "top",
-            "opener",
-            "parent",
-            "frameElement",
-            "navigator",
-            "origin",
-            "external",
-            "screen",
-            "innerWidth",
-            "innerHeight",
-            "scrollX",
-            "pageXOffset",
-            "scrollY",
-            "pageYOffset",
-            "visualViewport",
-            "screenX",
-            "screenY",
-            "outerWidth",
-            "outerHeight",
-            "devicePixelRatio",
-            "event",
-            "clientInformation",
-            "offscreenBuffering",
-            "screenLeft",
-            "screenTop",
-            "styleMedia",
-            "onsearch",
-            "trustedTypes",
-            "performance",
-            "onappinstalled",
-            "onbeforeinstallprompt",
-            "crypto",
-            "indexedDB",
-            "sessionStorage",
-            "localStorage",
-            "onbeforexrselect",
-            "onabort",
-            "onbeforeinput",
-            "onbeforematch",
-            "onbeforetoggle",
-            "onblur",
-            "oncancel",
-            "oncanplay",
-            "oncanplaythrough",
-            "onchange",
-            "onclick",
-            "onclose",
-            "oncommand",
-            "oncontentvisibilityautostatechange",
-            "oncontextlost",
-            "oncontextmenu",
-            "oncontextrestored",
-            "oncuechange",
-            "ondblclick",
-            "ondrag",
-            "ondragend",
-            "ondragenter",
-            "ondragleave",
-            "ondragover",
-            "ondragstart",
-            "ondrop",
-            "ondurationchange",
-            "onemptied",
-            "onended",
-            "onerror",
-            "onfocus",
-            "onformdata",
-            "oninput",
-            "oninvalid",
-            "onkeydown",
-            "onkeypress",
-            "onkeyup",
-            "onload",
-            "onloadeddata",
-            "onloadedmetadata",
-            "onloadstart",
-            "onmousedown",
-            "onmouseenter",
-            "onmouseleave",
-            "onmousemove",
-            "onmouseout",
-            "onmouseover",
-            "onmouseup",
-            "onmousewheel",
-            "onpause",
-            "onplay",
-            "onplaying",
-            "onprogress",
-            "onratechange",
-            "onreset",
-            "onresize",
-            "onscroll",
-            "onscrollend",
-            "onsecuritypolicyviolation",
-            "onseeked",
-            "onseeking",
-            "onselect",
-            "onslotchange",
-            "onstalled",
-            "onsubmit",
-            "onsuspend",
-            "ontimeupdate",
-            "ontoggle",
-            "onvolumechange",
-            "onwaiting",
-            "onwebkitanimationend",
-            "onwebkitanimationiteration",
-            "onwebkitanimationstart",
-            "onwebkittransitionend",
-            "onwheel",
-            "onauxclick",
-            "ongotpointercapture",
-            "onlostpointercapture",
-            "onpointerdown",
-            "onpointermove",
-            "onpointerrawupdate",
-            "onpointerup",
-            "onpointercancel",
-            "onpointerover",
-            "onpointerout",
-            "onpointerenter",
-            "onpointerleave",
-            "onselectstart",
-            "onselectionchange",
-            "onanimationend",
-            "onanimationiteration",
-            "onanimationstart",
-            "ontransitionrun",
-            "ontransitionstart",
-            "ontransitionend",
-            "ontransitioncancel",
-            "onafterprint",
-            "onbeforeprint",
-            "onbeforeunload",
-            "onhashchange",
-            "onlanguagechange",
-            "onmessage",
-            "onmessageerror",
-            "onoffline",
-            "ononline",
-            "onpagehide",
-            "onpageshow",
-            "onpopstate",
-            "onrejectionhandled",
-            "onstorage",
-            "onunhandledrejection",
-            "onunload",
-            "isSecureContext",
-            "crossOriginIsolated",
-            "scheduler",
-            "alert",
-            "atob",
-            "blur",
-            "btoa",
-            "cancelAnimationFrame",
-            "cancelIdleCallback",
-            "captureEvents",
-            "clearInterval",
-            "clearTimeout",
-            "close",
-            "confirm",
-            "createImageBitmap",
-            "fetch",
-            "find",
-            "focus",
-            "getComputedStyle",
-            "getSelection",
-            "matchMedia",
-            "moveBy",
-            "moveTo",
-            "open",
-            "postMessage",
-            "print",
-            "prompt",
-            "queueMicrotask",
-            "releaseEvents",
-            "reportError",
-            "requestAnimationFrame",
-            "requestIdleCallback",
-            "resizeBy",
-            "resizeTo",
-            "scroll",
-            "scrollBy",
-            "scrollTo",
-            "setInterval",
-            "setTimeout",
-            "stop",
-            "structuredClone",
-            "webkitCancelAnimationFrame",
-            "webkitRequestAnimationFrame",
-            "SuppressedError",
-            "DisposableStack",
-            "AsyncDisposableStack",
-            "Float16Array",
-            "chrome",
-            "WebAssembly",
-            "caches",
-            "cookieStore",
-            "ondevicemotion",
-            "ondeviceorientation",
-            "ondeviceorientationabsolute",
-            "documentPictureInPicture",
-            "sharedStorage",
-            "AbsoluteOrientationSensor",
-            "Accelerometer",
-            "AudioDecoder",
-            "AudioEncoder",
-            "AudioWorklet",
-            "BatteryManager",
-            "Cache",
-            "CacheStorage",
-            "Clipboard",
-            "ClipboardItem",
-            "CookieChangeEvent",
-            "CookieStore",
-            "CookieStoreManager",
-            "Credential",
-            "CredentialsContainer",
-            "CryptoKey",
-            "DeviceMotionEvent",
-            "DeviceMotionEventAcceleration",
-            "DeviceMotionEventRotationRate",
-            "DeviceOrientationEvent",
-            "FederatedCredential",
-            "GPU",
-            "GPUAdapter",
-            "GPUAdapterInfo",
-            "GPUBindGroup",
-            "GPUBindGroupLayout",
-            "GPUBuffer",
-            "GPUBufferUsage",
-            "GPUCanvasContext",
-            "GPUColorWrite",
-            "GPUCommandBuffer",
-            "GPUCommandEncoder",
-            "GPUCompilationInfo",
-            "GPUCompilationMessage",
-            "GPUComputePassEncoder",
-            "GPUComputePipeline",
-            "GPUDevice",
-            "GPUDeviceLostInfo",
-            "GPUError",
-            "GPUExternalTexture",
-            "GPUInternalError",
-            "GPUMapMode",
-            "GPUOutOfMemoryError",
-            "GPUPipelineError",
-            "GPUPipelineLayout",
-            "GPUQuerySet",
-            "GPUQueue",
-            "GPURenderBundle",
-            "GPURenderBundleEncoder",
-            "GPURenderPassEncoder",
-            "GPURenderPipeline",
-            "GPUSampler",
-            "GPUShaderModule",
-            "GPUShaderStage",
-            "GPUSupportedFeatures",
-            "GPUSupportedLimits",
-            "GPUTexture",
-            "GPUTextureUsage",
-            "GPUTextureView",
-            "GPUUncapturedErrorEvent",
-            "GPUValidationError",
-            "GravitySensor",
-            "Gyroscope",
-            "IdleDetector",
-            "ImageCapture",
-            "ImageDecoder",
-            "ImageTrack",
-            "ImageTrackList",
-            "Keyboard",
-            "KeyboardLayoutMap",
-            "LinearAccelerationSensor",
-            "MIDIAccess",
-            "MIDIConnectionEvent",
-            "MIDIInput",
-            "MIDIInputMap",
-            "MIDIMessageEvent",
-            "MIDIOutput",
-            "MIDIOutputMap",
-            "MIDIPort",
-            "MediaDeviceInfo",
-            "MediaDevices",
-            "MediaKeyMessageEvent",
-            "MediaKeySession",
-            "MediaKeyStatusMap",
-            "MediaKeySystemAccess",
-            "MediaKeys",
-            "NavigationPreloadManager",
-            "NavigatorManagedData",
-            "OrientationSensor",
-            "PasswordCredential",
-            "ProtectedAudience",
-            "RelativeOrientationSensor",
-            "ScreenDetailed",
-            "ScreenDetails",
-            "Sensor",
-            "SensorErrorEvent",
-            "ServiceWorkerRegistration",
-            "StorageManager",
-            "SubtleCrypto",
-            "VideoDecoder",
-            "VideoEncoder",
-            "VirtualKeyboard",
-            "WGSLLanguageFeatures",
-            "WebTransport",
-            "WebTransportBidirectionalStream",
-            "WebTransportDatagramDuplexStream",
-            "WebTransportError",
-            "Worklet",
-            "XRDOMOverlayState",
-            "XRLayer",
-            "XRWebGLBinding",
-            "AuthenticatorAssertionResponse",
-            "AuthenticatorAttestationResponse",
-            "AuthenticatorResponse",
-            "PublicKeyCredential",
-            "Bluetooth",
-            "BluetoothCharacteristicProperties",
-            "BluetoothDevice",
-            "BluetoothRemoteGATTCharacteristic",
-            "BluetoothRemoteGATTDescriptor",
-            "BluetoothRemoteGATTServer",
-            "BluetoothRemoteGATTService",
-            "CaptureController",
-            "CreateMonitor",
-            "DevicePosture",
-            "DocumentPictureInPicture",
-            "EyeDropper",
-            "FetchLaterResult",
-            "FileSystemDirectoryHandle",
-            "FileSystemFileHandle",
-            "FileSystemHandle",
-            "FileSystemWritableFileStream",
-            "FileSystemObserver",
-            "FontData",
-            "FragmentDirective",
-            "HID",
-            "HIDConnectionEvent",
-            "HIDDevice",
-            "HIDInputReportEvent",
-            "IdentityCredential",
-            "IdentityCredentialError",
-            "IdentityProvider",
-            "NavigatorLogin",
-            "LanguageDetector",
-            "Lock",
-            "LockManager",
-            "ServiceWorker",
-            "ServiceWorkerContainer",
-            "NotRestoredReasonDetails",
-            "NotRestoredReasons",
-            "OTPCredential",
-            "PaymentAddress",
-            "PaymentRequest",
-            "PaymentRequestUpdateEvent",
-            "PaymentResponse",
-            "PaymentManager",
-            "PaymentMethodChangeEvent",
-            "Presentation",
-            "PresentationAvailability",
-            "PresentationConnection",
-            "PresentationConnectionAvailableEvent",
-            "PresentationConnectionCloseEvent",
-            "PresentationConnectionList",
-            "PresentationReceiver",
-            "PresentationRequest",
-            "PressureObserver",
-            "PressureRecord",
-            "Serial",
-            "SerialPort",
-            "SharedWorker",
-            "StorageBucket",
-            "StorageBucketManager",
-            "Summarizer",
-            "Translator",
-            "USB",
-            "USBAlternateInterface",
-            "USBConfiguration",
-            "USBConnectionEvent",
-            "USBDevice",
-            "USBEndpoint",
-            "USBInTransferResult",
-            "USBInterface",
-            "USBIsochronousInTransferPacket",
-            "USBIsochronousInTransferResult",
-            "USBIsochronousOutTransferPacket",
-            "USBIsochronousOutTransferResult",
-            "USBOutTransferResult",
-            "WakeLock",
-            "WakeLockSentinel",
-            "XRAnchor",
-            "XRAnchorSet",
-            "XRBoundedReferenceSpace",
-            "XRCPUDepthInformation",
-            "XRCamera",
-            "XRDepthInformation",
-            "XRFrame",
-            "XRHand",
-            "XRHitTestResult",
-            "XRHitTestSource",
-            "XRInputSource",
-            "XRInputSourceArray",
-            "XRInputSourceEvent",
-            "XRInputSourcesChangeEvent",
-            "XRJointPose",
-            "XRJointSpace",
-            "XRLightEstimate",
-            "XRLightProbe",
-            "XRPose",
-            "XRRay",
-            "XRReferenceSpace",
-            "XRReferenceSpaceEvent",
-            "XRRenderState",
-            "XRRigidTransform",
-            "XRSession",
-            "XRSessionEvent",
-            "XRSpace",
-            "XRSystem",
-            "XRTransientInputHitTestResult",
-            "XRTransientInputHitTestSource",
-            "XRView",
-            "XRViewerPose",
-            "XRViewport",
-            "XRWebGLDepthInformation",
-            "XRWebGLLayer",
-            "fetchLater",
-            "getScreenDetails",
-            "queryLocalFonts",
-            "showDirectoryPicker",
-            "showOpenFilePicker",
-            "showSaveFilePicker",
-            "originAgentCluster",
-            "viewport",
-            "onpageswap",
-            "onpagereveal",
-            "credentialless",
-            "fence",
-            "launchQueue",
-            "speechSynthesis",
-            "onscrollsnapchange",
-            "onscrollsnapchanging",
-            "BackgroundFetchManager",
-            "BackgroundFetchRecord",
-            "BackgroundFetchRegistration",
-            "BluetoothUUID",
-            "CSSFontFeatureValuesRule",
-            "CSSFunctionDeclarations",
-            "CSSFunctionDescriptors",
-            "CSSFunctionRule",
-            "ChapterInformation",
-            "CropTarget",
-            "DocumentPictureInPictureEvent",
-            "Fence",
-            "FencedFrameConfig",
-            "HTMLFencedFrameElement",
-            "HTMLSelectedContentElement",
-            "IntegrityViolationReportBody",
-            "LaunchParams",
-            "LaunchQueue",
-            "MediaMetadata",
-            "MediaSession",
-            "Notification",
-            "PageRevealEvent",
-            "PageSwapEvent",
-            "PeriodicSyncManager",
-            "PermissionStatus",
-            "Permissions",
-            "PushManager",
-            "PushSubscription",
-            "PushSubscriptionOptions",
-            "QuotaExceededError",
-            "RTCDataChannel",
-            "RemotePlayback",
-            "RestrictionTarget",
-            "SharedStorage",
-            "SharedStorageWorklet",
-            "SharedStorageAppendMethod",
-            "SharedStorageClearMethod",
-            "SharedStorageDeleteMethod",
-            "SharedStorageModifierMethod",
-            "SharedStorageSetMethod",
-            "SnapEvent",
-            "SpeechGrammar",
-            "SpeechGrammarList",
-            "SpeechRecognition",
-            "SpeechRecognitionErrorEvent",
-            "SpeechRecognitionEvent",
-            "SpeechSynthesis",
-            "SpeechSynthesisErrorEvent",
-            "SpeechSynthesisEvent",
-            "SpeechSynthesisUtterance",
-            "SpeechSynthesisVoice",
-            "Viewport",
-            "WebSocketError",
-            "WebSocketStream",
-            "webkitSpeechGrammar",
-            "webkitSpeechGrammarList",
-            "webkitSpeechRecognition",
-            "webkitSpeechRecognitionError",
-            "webkitSpeechRecognitionEvent",
-            "webkitRequestFileSystem",
-            "webkitResolveLocalFileSystemURL",
-            "RudderSnippetVersion",
-            "rudderanalytics",
-            "rudderAnalyticsBuildType",
-            "rudderAnalyticsAddScript",
-            "rudderAnalyticsMount",
-            "goVerisoulEnv",
-            "goVerisoulProjectId",
-            "openBraces",
-            "script",
-            "warp_app_base_url",
-            "warp_app_version",
-            "verisoul_env",
-            "verisoul_project_id",
-            "Verisoul",
-            "_hsq",
-            "_hsp",
-            "RudderStackGlobals",
-            "__reactRouterVersion",
-            "warpEmitEvent",
-            "@wry/context:Slot",
-            "warpUserHandoff",
-            "__APOLLO_CLIENT__",
-            "dataLayer",
-            "gtag",
-            "__SENTRY__",
-            "_0x28b5",
-            "_0x70cb",
-            "VerisoulBundleInternal",
-            "detectIncognito"
-        ]
-
-        # 站点特定的 window keys
-        SITE_SPECIFIC_WINDOW_KEYS = [
-            "RudderSnippetVersion", "rudderanalytics", "rudderAnalyticsBuildType",
-            "rudderAnalyticsAddScript", "rudderAnalyticsMount", "goVerisoulEnv",
-            "goVerisoulProjectId", "openBraces", "script", "warp_app_base_url",
-            "warp_app_version", "verisoul_env", "verisoul_project_id", "Verisoul",
-            "_hsq", "_hsp", "RudderStackGlobals", "__reactRouterVersion",
-            "warpEmitEvent", "@wry/context:Slot", "warpUserHandoff",
-            "__APOLLO_CLIENT__", "dataLayer", "gtag", "__SENTRY__",
-            "_0x28b5", "_0x70cb", "VerisoulBundleInternal", "detectIncognito"
-        ]
-
         # 选择配置
-        profile = copy.deepcopy(random.choice(BASE_PROFILES_EXTENDED))
-        browser_version = random.choice(BROWSER_VERSIONS_COMPLETE)
-        lang_config = random.choice(LANGUAGE_CONFIGS_FIXED)
+        profile, browser, language = random.choice(_FINGERPRINT_COMBOS)
+        browser_version = browser.config
+        lang_config = language.config
 
-        # 构建 User-Agent
+        # User-Agent 与品牌信息已按版本预先计算
         ua_full_version = browser_version["full_version"]
-        if browser_version["browser"] == "Chrome":
-            user_agent = f"Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/{ua_full_version} Safari/537.36"
-        else:  # Edge
-            chromium_version = browser_version.get("full_chromium_version", ua_full_version)
-            user_agent = f"Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/{chromium_version} Safari/537.36 Edg/{ua_full_version}"
-
-        app_version = user_agent.replace("Mozilla/", "")
-
-        # 构建品牌信息
+        user_agent = browser.user_agent
+        app_version = browser.app_version
         brands = browser_version["brands"]
-        full_version_list = []
-        for brand_info in brands:
-            if "Chrome" in brand_info["brand"] or "Chromium" in brand_info["brand"] or "Edge" in brand_info["brand"]:
-                version_str = ua_full_version if "Edge" not in brand_info["brand"] else browser_version.get(
-                    "full_version")
-                if "Chromium" in brand_info["brand"] and browser_version["browser"] == "Edge":
-                    version_str = browser_version.get("full_chromium_version", ua_full_version)
-            else:
-                version_str = f"{brand_info['version']}.0.0.0"
-
-            full_version_list.append({
-                "brand": brand_info["brand"],
-                "version": version_str
-            })
+        full_version_list = browser.full_version_list
 
         # 获取硬件和屏幕配置
-        hw_config = profile["hardware_config"]
-        screen_config = profile["screen_resolution"]
-
-        # 生成随机打乱的 keyboard_layout
-        keyboard_layout_base = [
-            {"key": "KeyA", "value": "a"}, {"key": "KeyB", "value": "b"}, {"key": "KeyC", "value": "c"},
-            {"key": "KeyD", "value": "d"}, {"key": "KeyE", "value": "e"}, {"key": "KeyF", "value": "f"},
-            {"key": "KeyG", "value": "g"}, {"key": "KeyH", "value": "h"}, {"key": "KeyI", "value": "i"},
-            {"key": "KeyJ", "value": "j"}, {"key": "KeyK", "value": "k"}, {"key": "KeyL", "value": "l"},
-            {"key": "KeyM", "value": "m"}, {"key": "KeyN", "value": "n"}, {"key": "KeyO", "value": "o"},
-            {"key": "KeyP", "value": "p"}, {"key": "KeyQ", "value": "q"}, {"key": "KeyR", "value": "r"},
-            {"key": "KeyS", "value": "s"}, {"key": "KeyT", "value": "t"}, {"key": "KeyU", "value": "u"},
-            {"key": "KeyV", "value": "v"}, {"key": "KeyW", "value": "w"}, {"key": "KeyX", "value": "x"},
-            {"key": "KeyY", "value": "y"}, {"key": "KeyZ", "value": "z"}, {"key": "Digit0", "value": "0"},
-            {"key": "Digit1", "value": "1"}, {"key": "Digit2", "value": "2"}, {"key": "Digit3", "value": "3"},
-            {"key": "Digit4", "value": "4"}, {"key": "Digit5", "value": "5"}, {"key": "Digit6", "value": "6"},
-            {"key": "Digit7", "value": "7"}, {"key": "Digit8", "value": "8"}, {"key": "Digit9", "value": "9"},
-            {"key": "Backquote", "value": "`"}, {"key": "Minus", "value": "-"}, {"key": "Equal", "value": "="},
-            {"key": "Backslash", "value": "\\"}, {"key": "BracketLeft", "value": "["},
-            {"key": "BracketRight", "value": "]"}, {"key": "Semicolon", "value": ";"},
-            {"key": "Quote", "value": "'"}, {"key": "Comma", "value": ","}, {"key": "Period", "value": "."},
-            {"key": "Slash", "value": "/"}, {"key": "IntlBackslash", "value": "\\"}
-        ]
-        random.shuffle(keyboard_layout_base)  # 关键：随机打乱顺序
+        hw_config = profile.hardware_config
+        screen_config = profile.screen_resolution
+
+        # 生成随机打乱的 keyboard_layout（关键：随机打乱顺序）
+        keyboard_layout = random.sample(_KEYBOARD_LAYOUT, len(_KEYBOARD_LAYOUT))
 
         # 生成正确的 performance_timing
-        now = int(datetime.now().timestamp() * 1000)
-        navigation_start = now - random.randint(3000, 6000)
-        fetch_start = navigation_start + random.randint(2, 10)
-        domain_lookup_start = fetch_start + random.randint(1, 20)
-        domain_lookup_end = domain_lookup_start + random.randint(10, 50)
+        # 单次读取时钟：毫秒时间戳与 ISO 时间字符串共用
+        now = time.time_ns() // 1_000_000
+        (navigation_offset, fetch_delta, lookup_start_delta, lookup_delta, secure_roll, secure_delta,
+         connect_delta, request_delta, response_delta, response_end_delta, dom_loading_delta,
+         unload_start_delta, unload_delta, dom_interactive_delta, dcl_start_delta, dcl_delta,
+         loaded_roll, dom_complete_delta, load_start_delta, load_delta) = _randints(_PERF_TIMING_RANGES)
+        navigation_start = now - navigation_offset
+        fetch_start = navigation_start + fetch_delta
+        domain_lookup_start = fetch_start + lookup_start_delta
+        domain_lookup_end = domain_lookup_start + lookup_delta
         connect_start = domain_lookup_end
-        secure_connection_start = connect_start + random.randint(5, 15) if random.random() > 0.3 else 0
-        connect_end = (secure_connection_start if secure_connection_start else connect_start) + random.randint(20, 60)
-        request_start = connect_end + random.randint(1, 5)
-        response_start = request_start + random.randint(80, 200)
-        response_end = response_start + random.randint(1, 10)
-        dom_loading = response_end + random.randint(1, 10)
-        unload_event_start = dom_loading + random.randint(1, 5)
-        unload_event_end = unload_event_start + random.randint(1, 3)
-        dom_interactive = dom_loading + random.randint(200, 500)
-        dom_content_loaded_event_start = dom_interactive + random.randint(100, 300)
-        dom_content_loaded_event_end = dom_content_loaded_event_start + random.randint(1, 5)
+        # 70% 概率为 HTTPS 连接
+        secure_connection_start = connect_start + secure_delta if secure_roll >= 3 else 0
+        connect_end = (secure_connection_start if secure_connection_start else connect_start) + connect_delta
+        request_start = connect_end + request_delta
+        response_start = request_start + response_delta
+        response_end = response_start + response_end_delta
+        dom_loading = response_end + dom_loading_delta
+        unload_event_start = dom_loading + unload_start_delta
+        unload_event_end = unload_event_start + unload_delta
+        dom_interactive = dom_loading + dom_interactive_delta
+        dom_content_loaded_event_start = dom_interactive + dcl_start_delta
+        dom_content_loaded_event_end = dom_content_loaded_event_start + dcl_delta
 
         # 50% 概率页面已完全加载
-        if random.random() > 0.5:
-            dom_complete = dom_content_loaded_event_end + random.randint(50, 200)
-            load_event_start = dom_complete + random.randint(1, 5)
-            load_event_end = load_event_start + random.randint(1, 5)
+        if loaded_roll:
+            dom_complete = dom_content_loaded_event_end + dom_complete_delta
+            load_event_start = dom_complete + load_start_delta
+            load_event_end = load_event_start + load_delta
         else:
             dom_complete = 0
             load_event_start = 0
@@ -2131,44 +1529,20 @@ class WarpRegistrationBot:
             "load_event_end": load_event_end
         }
 
-        # 权限配置
-        permissions = {
-            "accessibility_events": "Failed to execute 'query' on 'Permissions': Failed to read the 'name' property from 'PermissionDescriptor': The provided value 'accessibility-events' is not a valid enum value of type PermissionName.",
-            "ambient_light_sensor": "Failed to execute 'query' on 'Permissions': GenericSensorExtraClasses flag is not enabled.",
-            "bluetooth": "Failed to execute 'query' on 'Permissions': Failed to read the 'name' property from 'PermissionDescriptor': The provided value 'bluetooth' is not a valid enum value of type PermissionName.",
-            "nfc": "Failed to execute 'query' on 'Permissions': Web NFC is not enabled.",
-            "push": "Failed to execute 'query' on 'Permissions': Push Permission without userVisibleOnly:true isn't supported yet.",
-            "speaker": "Failed to execute 'query' on 'Permissions': Failed to read the 'name' property from 'PermissionDescriptor': The provided value 'speaker' is not a valid enum value of type PermissionName.",
-            "speaker_selection": "Failed to execute 'query' on 'Permissions': The Speaker Selection API is not enabled.",
-            "top_level_storage_access": "Failed to execute 'query' on 'Permissions': The requested origin is invalid.",
-            "accelerometer": "granted",
-            "background_sync": "granted",
-            "background_fetch": "granted",
-            "camera": random.choice(["denied", "prompt"]),
-            "clipboard_read": random.choice(["prompt", "granted"]),
-            "clipboard_write": "granted",
-            "geolocation": random.choice(["denied", "prompt"]),
-            "gyroscope": "granted",
-            "local_fonts": "prompt",
-            "magnetometer": "granted",
-            "microphone": random.choice(["denied", "prompt"]),
-            "midi": "prompt",
-            "notifications": random.choice(["denied", "prompt", "granted"]),
-            "payment_handler": "granted",
-            "persistent_storage": "prompt",
-            "screen_wake_lock": "granted",
-            "storage_access": "granted",
-            "window_management": "prompt"
-        }
+        # 各项离散随机选择一次性抽取（权限、屏幕、隐身、电池、网络连接信息）
+        (camera, clipboard_read, geolocation, microphone, notifications, screen_is_extended,
+         incognito, battery_charging, connection_rtt, connection_downlink,
+         connection_effective_type) = _choices(_PAYLOAD_CHOICE_POOLS)
 
-        # 构建 window_keys
-        window_keys = base_window_keys.copy()
-        for site_key in SITE_SPECIFIC_WINDOW_KEYS:
-            if site_key not in window_keys:
-                window_keys.append(site_key)
+        # 权限配置
+        permissions = dict(_PERMISSIONS_BASE)
+        permissions["camera"] = camera
+        permissions["clipboard_read"] = clipboard_read
+        permissions["geolocation"] = geolocation
+        permissions["microphone"] = microphone
+        permissions["notifications"] = notifications
 
         # 隐身模式对存储的影响
-        incognito = random.choice([0, 1])
         if incognito == 1:
             storage_quota = random.randint(1000000000, 2000000000)
             storage_usage = 0
@@ -2176,35 +1550,29 @@ class WarpRegistrationBot:
             storage_quota = random.randint(100000000000, 200000000000)
             storage_usage = random.randint(1000, 10000000)
 
-        # 网络连接信息
-        connection_rtt = random.choice([50, 100, 150, 200, 250, 300])
-        connection_downlink = random.choice([0.35, 0.7, 1.25, 1.3, 1.5, 2.5, 5.0, 10.0])
-        connection_effective_type = random.choice(["slow-2g", "2g", "3g", "4g"])
-
         # 电池信息
-        battery_charging = random.choice([0, 1])
         battery_level = round(random.uniform(0.3, 1.0), 2)
 
         # 完整的 payload 构建
         payload = {
             # 基础标识信息
-            "event_id": str(uuid.uuid4()),
+            "event_id": _uuid4_str(),
             "session_id": session_id,
-            "browser_id": str(uuid.uuid4()),
+            "browser_id": _uuid4_str(),
             "project_id": "27fcb93a-7693-486d-b969-a9d96f799f91",
-            "time": datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z",
+            "time": _format_utc_ms(now),
             "is_v2": True,
             "event": "device_minmet",
 
             # Window 和 Document
-            "window_keys": window_keys,
-            "document_element_keys": ["lang"],
+            "window_keys": get_window_keys_fragment(),
+            "document_element_keys": _STATIC_JSON["document_element_keys"],
 
             # 引擎信息
             "engine": "WebKit",
 
             # 触摸支持
-            "max_touch_points": 0 if profile["os"] == "Windows" else 1,
+            "max_touch_points": 0 if profile.os == "Windows" else 1,
 
             # 语言设置
             "language": lang_config["lang"],
@@ -2222,11 +1590,11 @@ class WarpRegistrationBot:
             "app_version": app_version,
             "device_memory": hw_config["memory"],
             "hardware_concurrency": hw_config["cores"],
-            "platform": profile["platform"],
+            "platform": profile.platform,
             "product": "Gecko",
             "product_sub": "20030107",
             "user_agent": user_agent,
-            "vendor": profile["vendor"],
+            "vendor": profile.vendor,
             "vendor_sub": "empty_string",
             "cookie_enabled": 1,
             "do_not_track": -888,
@@ -2250,7 +1618,7 @@ class WarpRegistrationBot:
             "screen_height": screen_config["height"],
             "screen_pixel_depth": 24,
             "screen_width": screen_config["width"],
-            "screen_is_extended": random.choice([0, 1]),
+            "screen_is_extended": screen_is_extended,
             "screen_orientation_angle": 0,
             "screen_orientation_type": "landscape-primary",
 
@@ -2277,27 +1645,16 @@ class WarpRegistrationBot:
             "navigator_gpu_preferred_canvas_format": "bgra8unorm",
 
             # 虚拟键盘边界
-            "virtual_keyboard_bounding_box": {
-                "x": 0, "y": 0, "width": 0, "height": 0,
-                "top": 0, "right": 0, "bottom": 0, "left": 0
-            },
+            "virtual_keyboard_bounding_box": _STATIC_JSON["empty_bounding_box"],
 
             # 标题栏区域边界
-            "title_bar_area_bounding_box": {
-                "x": 0, "y": 0, "width": 0, "height": 0,
-                "top": 0, "right": 0, "bottom": 0, "left": 0
-            },
+            "title_bar_area_bounding_box": _STATIC_JSON["empty_bounding_box"],
 
             # 广告相关
             "navigator_can_load_ad_auction_fenced_frame": 0,
 
             # 视频帧颜色空间
-            "video_frame_color_space": {
-                "full_range": True,
-                "matrix": "rgb",
-                "primaries": "bt709",
-                "transfer": "iec61966-2-1"
-            },
+            "video_frame_color_space": _STATIC_JSON["video_frame_color_space"],
 
             # 触摸支持
             "supports_touch": 0,
@@ -2306,42 +1663,20 @@ class WarpRegistrationBot:
             "timezone_offset": lang_config["timezone_offset"],
 
             # 国际化日期格式
-            "intl_date": {
-                "locale": lang_config["lang"],
-                "calendar": "gregory",
-                "numbering_system": "latn",
-                "time_zone": lang_config["timezone"],
-                "year": "numeric",
-                "month": "numeric",
-                "day": "numeric"
-            },
+            "intl_date": language.intl_date,
 
             # 国际化数字格式
-            "intl_number": {
-                "locale": lang_config["lang"],
-                "numbering_system": "latn",
-                "style": "decimal",
-                "minimum_integer_digits": 1,
-                "minimum_fraction_digits": 0,
-                "maximum_fraction_digits": 3,
-                "use_grouping": "auto",
-                "notation": "standard",
-                "sign_display": "auto",
-                "rounding_increment": 1,
-                "rounding_mode": "halfExpand",
-                "rounding_priority": "auto",
-                "trailing_zero_display": "auto"
-            },
+            "intl_number": language.intl_number,
 
             # 各种哈希值 (使用配置中的预定义值)
-            "prototype_hash": profile["hashes"]["prototype_hash"],
-            "math_hash": profile["hashes"]["math_hash"],
+            "prototype_hash": profile.hashes["prototype_hash"],
+            "math_hash": profile.hashes["math_hash"],
             "architecture_test": 255,
-            "gpu_vendor": profile["gpu_vendor_string"],
-            "gpu_renderer": profile["gpu_renderer"],
-            "offline_audio_hash": profile["hashes"]["offline_audio_hash"],
-            "mime_types_hash": profile["hashes"]["mime_types_hash"],
-            "errors_hash": profile["hashes"]["errors_hash"],
+            "gpu_vendor": profile.gpu_vendor_string,
+            "gpu_renderer": profile.gpu_renderer,
+            "offline_audio_hash": profile.hashes["offline_audio_hash"],
+            "mime_types_hash": profile.hashes["mime_types_hash"],
+            "errors_hash": profile.hashes["errors_hash"],
 
             # 隐私模式
             "incognito": incognito,
@@ -2366,17 +1701,17 @@ class WarpRegistrationBot:
             "is_managed_configuration": 0,
 
             # 键盘布局
-            "keyboard_layout": keyboard_layout_base,
+            "keyboard_layout": keyboard_layout,
 
             # 品牌信息
             "brands": brands,
             "mobile": 0,
-            "architecture": profile["architecture"],
-            "bitness": profile["bitness"],
+            "architecture": profile.architecture,
+            "bitness": profile.bitness,
             "form_factor": "null_string",
             "full_version_list": full_version_list,
             "model": "empty_string",
-            "platform_version": profile["os_version"] if browser_version["browser"] == "Chrome" else "19.0.0",
+            "platform_version": profile.os_version if browser_version["browser"] == "Chrome" else "19.0.0",
             "ua_full_version": ua_full_version,
             "wow_64": 0,
 
@@ -2395,21 +1730,15 @@ class WarpRegistrationBot:
             worker_data = await self._generate_worker_payload(session_id)
 
             # 从async_client提取cookies并格式化
-            cookie_parts = []
-            for name, value in self.async_client.cookies.items():
-                cookie_parts.append(f"{name}={value}")
-
-            worker_data['document_cookies'] = "; ".join(cookie_parts) if cookie_parts else ""
+            worker_data['document_cookies'] = "; ".join(
+                f"{name}={value}" for name, value in self.async_client.cookies.items()
+            )
 
-            # 发送POST请求
+            # 发送POST请求（window_keys 为预先序列化的 Fragment，原样嵌入，不会重复编码）
             response = await self.async_client.post(
                 url="https://ingest.prod.verisoul.ai/worker",
-                json=worker_data,
-                headers={
-                    "User-Agent": self.user_agent,
-                    "Content-Type": "application/json",
-                    "Origin": "https://app.warp.dev"
-                }
+                content=orjson.dumps(worker_data),
+                headers=self._worker_headers
             )
 
             logger.info(f"Verisoul /worker 请求响应: {response.status_code}")
@@ -2426,115 +1755,34 @@ class WarpRegistrationBot:
             return False
 
     async def _get_public_ip(self) -> str:
-        """使用当前会话的代理，访问 IP查询服务 来获取出口公网 IP。"""
-        try:
-            # 使用一个可靠的 IP 查询服务
-            response = await self.async_client.get("https://api.ipify.org?format=json", timeout=10)
-            response.raise_for_status()
-            ip = response.json()["ip"]
-            logger.info(f"成功获取到出口公网 IP: {ip}")
-            return ip
-        except Exception as e:
-            logger.error(f"获取公网 IP 失败: {e}. 将使用一个随机IP作为备用。")
-            # 如果失败，生成一个随机的公网IP作为备用，虽然这降低了真实性，但比失败要好
-            return f"{random.randint(1, 254)}.{random.randint(1, 254)}.{random.randint(1, 254)}.{random.randint(1, 254)}"
+        """使用当前会话的代理，访问 IP查询服务 来获取出口公网 IP（按代理缓存 PUBLIC_IP_CACHE_TTL 秒）。"""
+        async with self._public_ip_lock:  # 并发调用只发一次请求
+            proxy = self._client_proxy
+            cached = self._public_ip_cache.get(proxy)
+            if cached and time.monotonic() - cached[1] < PUBLIC_IP_CACHE_TTL:
+                return cached[0]
+            try:
+                # 使用一个可靠的 IP 查询服务
+                response = await self.async_client.get("https://api.ipify.org?format=json", timeout=10)
+                response.raise_for_status()
+                ip = response.json()["ip"]
+                logger.info(f"成功获取到出口公网 IP: {ip}")
+                self._public_ip_cache[proxy] = (ip, time.monotonic())
+                return ip
+            except Exception as e:
+                logger.error(f"获取公网 IP 失败: {e}. 将使用一个随机IP作为备用。")
+                # 如果失败，生成一个随机的公网IP作为备用，虽然这降低了真实性，但比失败要好
+                return f"{random.randint(1, 254)}.{random.randint(1, 254)}.{random.randint(1, 254)}.{random.randint(1, 254)}"
 
     async def _generate_webrtc_sdp(self) -> str:
         """
         动态生成一个高度仿真的 WebRTC SDP 字符串。
         这个函数模仿了浏览器在创建 WebRTC 连接时生成的指纹。
         """
-        # 1. 获取我们当前的公网 IP，这是 srflx (server reflexive) 候选项的关键
+        # 获取我们当前的公网 IP，这是 srflx (server reflexive) 候选项的关键；
+        # 其余部分由同步的 build_sdp 完成
         public_ip = await self._get_public_ip()
-
-        # 2. 生成会话和连接所需的随机组件
-        session_id_num = str(int(time.time() * 1000)) + str(random.randint(1000, 9999))
-        local_mdns_host = f"{uuid.uuid4()}.local"
-        ice_ufrag = secrets.token_urlsafe(4)
-        ice_pwd = secrets.token_urlsafe(24)
-
-        # 3. 生成一个随机的 DTLS 证书指纹 (SHA-256)
-        fingerprint_bytes = secrets.token_bytes(32)
-        fingerprint_str = ":".join(f"{b:02X}" for b in fingerprint_bytes)
-
-        # 4. SDP 模板。大部分的音视频编解码器信息(rtpmap, fmtp)对于同一浏览器版本是固定的。
-        # 我们将动态部分用占位符表示，然后填充它们。
-        # 这个模板是基于你提供的 Chrome 风格的 SDP 精心构造的。
-        sdp_lines = [
-            "v=0",
-            f"o=- {session_id_num} 2 IN IP4 127.0.0.1",
-            "s=-",
-            "t=0 0",
-            "a=group:BUNDLE 0 1 2",
-            "a=extmap-allow-mixed",
-            "a=msid-semantic: WMS",
-
-            # --- Audio Section ---
-            f"m=audio {random.randint(10000, 60000)} UDP/TLS/RTP/SAVPF 111 103 104 9 0 8 106 105 13 110 112 113 126",
-            f"c=IN IP4 {public_ip}",
-            "a=rtcp:9 IN IP4 0.0.0.0",
-            # Host candidate (本机地址)
-            f"a=candidate:{random.randint(1E9, 4E9)} 1 udp 2113937151 {local_mdns_host} {random.randint(10000, 60000)} typ host generation 0 network-cost 999",
-            # Srflx candidate (公网地址)
-            f"a=candidate:{random.randint(1E9, 4E9)} 1 udp 1677729535 {public_ip} {random.randint(10000, 60000)} typ srflx raddr 0.0.0.0 rport 0 generation 0 network-cost 999",
-            f"a=ice-ufrag:{ice_ufrag}",
-            f"a=ice-pwd:{ice_pwd}",
-            f"a=fingerprint:sha-256 {fingerprint_str}",
-            "a=setup:actpass", "a=mid:0", "a=extmap:1 urn:ietf:params:rtp-hdrext:ssrc-audio-level", "a=recvonly",
-            "a=rtcp-mux",
-            *self._get_audio_codecs(),
-
-            # --- Video Section ---
-            f"m=video {random.randint(10000, 60000)} UDP/TLS/RTP/SAVPF 96 97 98 99 100 101 102 123 127 121 125 107 108 109 35 36 124",
-            f"c=IN IP4 {public_ip}",
-            "a=rtcp:9 IN IP4 0.0.0.0",
-            f"a=candidate:{random.randint(1E9, 4E9)} 1 udp 2113937151 {local_mdns_host} {random.randint(10000, 60000)} typ host generation 0 network-cost 999",
-            f"a=candidate:{random.randint(1E9, 4E9)} 1 udp 1677729535 {public_ip} {random.randint(10000, 60000)} typ srflx raddr 0.0.0.0 rport 0 generation 0 network-cost 999",
-            f"a=ice-ufrag:{ice_ufrag}",
-            f"a=ice-pwd:{ice_pwd}",
-            f"a=fingerprint:sha-256 {fingerprint_str}",
-            "a=setup:actpass", "a=mid:1", "a=extmap:14 urn:ietf:params:rtp-hdrext:toffset", "a=recvonly", "a=rtcp-mux",
-            *self._get_video_codecs(),
-
-            # --- Application/Data Channel Section ---
-            f"m=application {random.randint(10000, 60000)} UDP/DTLS/SCTP webrtc-datachannel",
-            f"c=IN IP4 {public_ip}",
-            f"a=candidate:{random.randint(1E9, 4E9)} 1 udp 2113937151 {local_mdns_host} {random.randint(10000, 60000)} typ host generation 0 network-cost 999",
-            f"a=candidate:{random.randint(1E9, 4E9)} 1 udp 1677729535 {public_ip} {random.randint(10000, 60000)} typ srflx raddr 0.0.0.0 rport 0 generation 0 network-cost 999",
-            f"a=ice-ufrag:{ice_ufrag}",
-            f"a=ice-pwd:{ice_pwd}",
-            f"a=fingerprint:sha-256 {fingerprint_str}",
-            "a=setup:actpass", "a=mid:2", "a=sctp-port:5000", "a=max-message-size:262144"
-        ]
-
-        # 5. 使用 '\r\n' 连接所有行，这是 SDP 协议的标准
-        return "\r\n".join(sdp_lines) + "\r\n"
-
-    def _get_audio_codecs(self):
-        # 这部分是从真实浏览器抓包中提取的，对于一个浏览器版本来说是相对固定的
-        return [
-            "a=rtpmap:111 opus/48000/2", "a=rtcp-fb:111 transport-cc", "a=fmtp:111 minptime=10;useinbandfec=1",
-            "a=rtpmap:103 G722/8000", "a=rtpmap:104 G722/8000", "a=rtpmap:9 G722/8000", "a=rtpmap:0 PCMU/8000",
-            "a=rtpmap:8 PCMA/8000", "a=rtpmap:106 CN/32000", "a=rtpmap:105 CN/16000", "a=rtpmap:13 CN/8000",
-            "a=rtpmap:110 telephone-event/48000", "a=rtpmap:112 telephone-event/32000",
-            "a=rtpmap:113 telephone-event/16000", "a=rtpmap:126 telephone-event/8000"
-        ]
-
-    def _get_video_codecs(self):
-        # 同样，这部分也是浏览器指纹的一部分
-        return [
-            "a=rtpmap:96 VP8/90000", "a=rtcp-fb:96 goog-remb", "a=rtcp-fb:96 transport-cc", "a=rtcp-fb:96 ccm fir",
-            "a=rtcp-fb:96 nack", "a=rtcp-fb:96 nack pli",
-            "a=rtpmap:97 rtx/90000", "a=fmtp:97 apt=96",
-            "a=rtpmap:98 VP9/90000", "a=rtcp-fb:98 goog-remb", "a=rtcp-fb:98 transport-cc", "a=rtcp-fb:98 ccm fir",
-            "a=rtcp-fb:98 nack", "a=rtcp-fb:98 nack pli", "a=fmtp:98 profile-id=0",
-            "a=rtpmap:99 rtx/90000", "a=fmtp:99 apt=98",
-            "a=rtpmap:100 H264/90000", "a=rtcp-fb:100 goog-remb", "a=rtcp-fb:100 transport-cc", "a=rtcp-fb:100 ccm fir",
-            "a=rtcp-fb:100 nack", "a=rtcp-fb:100 nack pli",
-            "a=fmtp:100 level-asymmetry-allowed=1;packetization-mode=1;profile-level-id=42e01f",
-            "a=rtpmap:101 rtx/90000", "a=fmtp:101 apt=100",
-            "a=rtpmap:123 red/90000", "a=rtpmap:127 ulpfec/90000"
-        ]
+        return build_sdp(public_ip)
 
     async def register_account(self, temp_mail_client: TempMailAPIClient) -> Optional[str]:
         """执行完整的注册流程"""
@@ -2545,6 +1793,7 @@ class WarpRegistrationBot:
             return None
         
         email = email_result['email']
+        self.email = email
         logger.info(f"✅ 使用邮箱: {email}")
 
         # 尝试多个代理
@@ -2558,14 +1807,9 @@ class WarpRegistrationBot:
             proxy = self.proxy_manager.format_proxy_for_httpx(proxy_str)
             logger.info(f"[{email}] 第{proxy_attempt + 1}次尝试，使用代理: {proxy_str}")
 
-            # 初始化httpx异步客户端
-            self.async_client = httpx.AsyncClient(
-                proxy=proxy,
-                # proxy="http://127.0.0.1:7897",  # 本地代理
-                verify=False,
-                timeout=httpx.Timeout(60.0),
-                cookies=httpx.Cookies()  # 启用cookie管理
-            )
+            # 复用持久化的httpx异步客户端，每次尝试使用全新的cookie
+            await self._ensure_client(proxy)
+            self.async_client.cookies.clear()
 
             try:
                 # =========================================================
@@ -2599,13 +1843,12 @@ class WarpRegistrationBot:
                         logger.error(f"发送登录请求失败: {signin_result.get('error')}")
                         continue
 
-                # Step 2: 等待验证邮件
+                # Step 2: 等待验证邮件（不再固定先睡5秒，由轮询退避决定节奏，总时长保持不变）
                 logger.info("等待验证邮件...")
-                await asyncio.sleep(5)
-
                 verification_result = await self.wait_for_verification_email(
                     temp_mail_client=temp_mail_client,
-                    email=email
+                    email=email,
+                    timeout=65
                 )
 
                 if not verification_result:
@@ -2642,18 +1885,16 @@ class WarpRegistrationBot:
                     logger.error(f"[{email}] 账号因违反服务条款被标记，跳过此账号")
                     return None  # 直接返回，不再重试
 
-                request_limit_result = await self._get_request_limit(complete_result["id_token"])
-
-                # Step 5: 保存到数据库
-                await self.db_manager.add_account(
-                    email=email,
-                    local_id=complete_result["local_id"],
-                    id_token=complete_result["id_token"],
-                    refresh_token=complete_result["refresh_token"],
-                    status='active',
-                    proxy_info=proxy_str,
-                    user_agent=self.user_agent
-                )
+                # Step 5: 保存到数据库（有监控器时交给其批量写入队列，等到提交后才算成功）
+                row = (email, complete_result["local_id"], complete_result["id_token"],
+                       complete_result["refresh_token"], 'active', proxy_str, self.user_agent)
+                if self.monitor is not None:
+                    saved = await self.monitor.save_account(row)
+                else:
+                    saved = await self.db_manager.add_account(*row)
+                if not saved:
+                    logger.error(f"[{email}] 账号保存失败")
+                    return None
 
                 logger.info(f"✅ 注册成功: {email}")
                 return complete_result["local_id"]
@@ -2671,7 +1912,8 @@ class WarpRegistrationBot:
     async def _get_user_info(self, id_token: str) -> Dict[str, Any]:
         """获取账户请求额度
 
-        调用 GetUser 接口获取账户信息，通过 billingMetadata 判断额度
+        GetRequestLimitInfo 查询已同时选取 billingMetadata/profile，
+        这里复用其结果，通过 billingMetadata 判断额度，不再单独请求 GetUser
         billingMetadata 为 null → 150 额度
         billingMetadata 不为 null → 2500 额度
 
@@ -2681,150 +1923,33 @@ class WarpRegistrationBot:
         Returns:
             包含额度信息的字典
         """
-        if not id_token:
-            return {"success": False, "error": "缺少Firebase ID Token"}
-
-        try:
-            url = "https://app.warp.dev/graphql/v2"
-
-            # 查询结构：获取 billingMetadata 来判断额度
-            # billingMetadata 是对象类型，需要查询子字段
-            query = """
-            query GetUser($requestContext: RequestContext!) {
-              user(requestContext: $requestContext) {
-                __typename
-                ... on UserOutput {
-                  user {
-                    billingMetadata {
-                      __typename
-                    }
-                    profile {
-                      email
-                      uid
-                    }
-                    isOnboarded
-                  }
-                }
-                ... on UserFacingError {
-                  error {
-                    message
-                  }
-                }
-              }
-            }
-            """
-
-            # 获取 OS 信息
-            import platform
-            import uuid
-            os_name = "Windows"
-            os_version = "10 (19045)"
-            os_category = "Windows"
-
-            data = {
-                "operationName": "GetUser",
-                "variables": {
-                    "requestContext": {
-                        "clientContext": {
-                            "version": "v0.2025.09.10.08.11.stable_01"
-                        },
-                        "osContext": {
-                            "category": os_category,
-                            "linuxKernelVersion": None,
-                            "name": os_name,
-                            "version": os_version
-                        }
-                    }
-                },
-                "query": query
-            }
-
-            headers = {
-                "Content-Type": "application/json",
-                "authorization": f"Bearer {id_token}",
-                "x-warp-client-version": "v0.2025.09.10.08.11.stable_01",
-                "x-warp-os-category": "Windows",
-                "x-warp-os-name": "Windows",
-                "x-warp-os-version": "10 (19045)",
-                "X-warp-experiment-id": str(uuid.uuid4())
-            }
-
-            print("📊 调用GetUse接口...")
-
-            response = await self.async_client.post(
-                url,
-                params={"op": "GetUser"},
-                json=data,
-                headers=headers,
-            )
-
-            if response.status_code == 200:
-                result = response.json()
-
-                # 检查是否有错误
-                if "errors" in result:
-                    error_msg = result["errors"][0].get("message", "Unknown error")
-                    print(f"❌ GraphQL错误: {error_msg}")
-                    return {"success": False, "error": error_msg}
-
-                # 解析响应：data.user.user
-                data_result = result.get("data", {})
-                user_data = data_result.get("user", {})
-
-                if user_data.get("__typename") == "UserOutput":
-                    user_info = user_data.get("user", {})
-                    billing_metadata = user_info.get("billingMetadata")
-                    profile = user_info.get("profile", {})
-
-                    # 根据 billingMetadata 判断额度
-                    # billingMetadata 为 null → 150 额度
-                    # billingMetadata 不为 null → 2500 额度
-                    if billing_metadata is None:
-                        request_limit = 150
-                        quota_type = "📋 普通额度"
-                    else:
-                        request_limit = 2500
-                        quota_type = "🎉 高额度"
-
-                    email = profile.get("email", "N/A")
-                    uid = profile.get("uid", "N/A")
-
-                    print(f"✅ 账户额度信息:")
-                    print(f"   📧 邮箱: {email}")
-                    print(f"   🎯 UID: {uid}")
-                    print(f"   {quota_type}: {request_limit}")
-                    print(f"   📊 billingMetadata: {'null' if billing_metadata is None else 'exists'}")
-
-                    return {
-                        "success": True,
-                        "requestLimit": request_limit,
-                        "quotaType": "high" if request_limit == 2500 else "normal",
-                        "email": email,
-                        "uid": uid,
-                        "hasBillingMetadata": billing_metadata is not None
-                    }
-                elif user_data.get("__typename") == "UserFacingError":
-                    error = user_data.get("error", {}).get("message", "Unknown error")
-                    print(f"❌ 获取额度失败: {error}")
-                    return {"success": False, "error": error}
-                else:
-                    print(f"❌ 响应中没有找到用户信息")
-                    return {"success": False, "error": "未找到用户信息"}
-            else:
-                error_text = response.text[:500]
-                print(f"❌ HTTP错误 {response.status_code}")
-                return {"success": False, "error": f"HTTP {response.status_code}: {error_text}"}
-
-        except Exception as e:
-            print(f"❌ 获取额度错误: {e}")
-            return {"success": False, "error": str(e)}
+        limit_result = await self._get_request_limit(id_token)
+        if not limit_result["success"]:
+            return limit_result
+
+        has_billing_metadata = limit_result["hasBillingMetadata"]
+        request_limit = 2500 if has_billing_metadata else 150
+        quota_type = "🎉 高额度" if has_billing_metadata else "📋 普通额度"
+
+        logger.info("✅ 账户额度信息: 📧 %s 🎯 UID=%s %s: %s 📊 billingMetadata: %s",
+                    limit_result["email"], limit_result["uid"], quota_type, request_limit,
+                    "exists" if has_billing_metadata else "null")
+
+        return {
+            "success": True,
+            "requestLimit": request_limit,
+            "quotaType": "high" if request_limit == 2500 else "normal",
+            "email": limit_result["email"],
+            "uid": limit_result["uid"],
+            "hasBillingMetadata": has_billing_metadata
+        }
 
     async def _get_request_limit(self, id_token: str) -> Dict[str, Any]:
         """获取账户请求额度
 
-        调用 GetUser 接口获取账户信息，通过 billingMetadata 判断额度
-        billingMetadata 为 null → 150 额度
-        billingMetadata 不为 null → 2500 额度
+        调用 GetRequestLimitInfo 接口，一次往返同时取回 requestLimitInfo
+        与 billingMetadata/profile（供 _get_user_info 复用）。
+        注册流程不调用此方法，保留为按需查询账号额度的工具方法。
 
         Args:
             id_token: Firebase ID Token
@@ -2837,64 +1962,24 @@ class WarpRegistrationBot:
             return {"success": False, "error": "缺少Firebase ID Token"}
 
         try:
-            url = "https://app.warp.dev/graphql/v2"
-
-            # 查询结构：获取 billingMetadata 来判断额度
-            # billingMetadata 是对象类型，需要查询子字段
-            query = """query GetRequestLimitInfo($requestContext: RequestContext!) {\n  user(requestContext: $requestContext) {\n    __typename\n    ... on UserOutput {\n      user {\n        requestLimitInfo {\n          isUnlimited\n          nextRefreshTime\n          requestLimit\n          requestsUsedSinceLastRefresh\n          requestLimitRefreshDuration\n          isUnlimitedAutosuggestions\n          acceptedAutosuggestionsLimit\n          acceptedAutosuggestionsSinceLastRefresh\n          isUnlimitedVoice\n          voiceRequestLimit\n          voiceRequestsUsedSinceLastRefresh\n          voiceTokenLimit\n          voiceTokensUsedSinceLastRefresh\n          isUnlimitedCodebaseIndices\n          maxCodebaseIndices\n          maxFilesPerRepo\n          embeddingGenerationBatchSize\n        }\n      }\n    }\n    ... on UserFacingError {\n      error {\n        __typename\n        ... on SharedObjectsLimitExceeded {\n          limit\n          objectType\n          message\n        }\n        ... on PersonalObjectsLimitExceeded {\n          limit\n          objectType\n          message\n        }\n        ... on AccountDelinquencyError {\n          message\n        }\n        ... on GenericStringObjectUniqueKeyConflict {\n          message\n        }\n      }\n      responseContext {\n        serverVersion\n      }\n    }\n  }\n}\n"""
-
-            # 获取 OS 信息
-            import platform
-            import uuid
-            os_category = "Web"
-            os_name = "Windows"
-            os_version = "NT 10.0"
-            app_version = "v0.2025.10.01.08.12.stable_02"
-
-            data = {
-                "operationName": "GetRequestLimitInfo",
-                "variables": {
-                    "requestContext": {
-                        "clientContext": {
-                            "version": app_version
-                        },
-                        "osContext": {
-                            "category": os_category,
-                            "linuxKernelVersion": None,
-                            "name": os_name,
-                            "version": os_version
-                        }
-                    }
-                },
-                "query": query
-            }
+            headers = {**_GRAPHQL_BASE_HEADERS, "authorization": f"Bearer {id_token}"}
 
-            headers = {
-                "Content-Type": "application/json",
-                "authorization": f"Bearer {id_token}",
-                "x-warp-client-id": "warp-app",
-                "x-warp-client-version": app_version,
-                "x-warp-os-category": os_category,
-                "x-warp-os-name": os_name,
-                "x-warp-os-version": os_version,
-            }
-
-            print("📊 调用GetRequestLimitInfo接口...")
+            logger.debug("📊 调用GetRequestLimitInfo接口...")
 
             response = await self.async_client.post(
-                url,
-                params={"op": "GetRequestLimitInfo"},
-                json=data,
+                _WARP_GRAPHQL_URL,
+                params=_GET_REQUEST_LIMIT_PARAMS,
+                content=_GET_REQUEST_LIMIT_BODY,
                 headers=headers,
             )
 
             if response.status_code == 200:
-                result = response.json()
+                result = orjson.loads(response.content)
 
                 # 检查是否有错误
                 if "errors" in result:
                     error_msg = result["errors"][0].get("message", "Unknown error")
-                    print(f"❌ GraphQL错误: {error_msg}")
+                    logger.error(f"❌ GraphQL错误: {error_msg}")
                     return {"success": False, "error": error_msg}
 
                 # 解析响应：data.user.user.requestLimitInfo
@@ -2904,6 +1989,7 @@ class WarpRegistrationBot:
                 if user_data.get("__typename") == "UserOutput":
                     user_info = user_data.get("user", {})
                     request_limit_info = user_info.get("requestLimitInfo", {})
+                    profile = user_info.get("profile") or {}
 
                     # 从 requestLimitInfo 获取额度信息
                     request_limit = request_limit_info.get("requestLimit", 0)
@@ -2923,18 +2009,16 @@ class WarpRegistrationBot:
                     else:
                         quota_type = "📋 普通额度"
 
-                    print(f"✅ 账户额度信息:")
-                    print(f"   {quota_type}: {request_limit}")
-                    print(f"   📊 已使用: {requests_used}/{request_limit}")
-                    print(f"   💎 剩余: {requests_remaining}")
-                    print(f"   🔄 刷新周期: {refresh_duration}")
-                    print(f"   ⏰ 下次刷新: {next_refresh_time}")
+                    logger.info("✅ 账户额度信息: %s: %s 📊 已使用: %s/%s 💎 剩余: %s",
+                                quota_type, request_limit, requests_used, request_limit, requests_remaining)
 
-                    # 额外的限制信息
-                    if request_limit_info.get("isUnlimitedAutosuggestions"):
-                        print(f"   ✨ 自动建议: 无限制")
-                    if request_limit_info.get("maxCodebaseIndices"):
-                        print(f"   📚 最大代码库索引: {request_limit_info.get('maxCodebaseIndices')}")
+                    # 刷新周期与额外的限制信息只在调试级别输出
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug("   🔄 刷新周期: %s ⏰ 下次刷新: %s", refresh_duration, next_refresh_time)
+                        if request_limit_info.get("isUnlimitedAutosuggestions"):
+                            logger.debug("   ✨ 自动建议: 无限制")
+                        if request_limit_info.get("maxCodebaseIndices"):
+                            logger.debug("   📚 最大代码库索引: %s", request_limit_info.get("maxCodebaseIndices"))
 
                     return {
                         "success": True,
@@ -2945,6 +2029,10 @@ class WarpRegistrationBot:
                         "nextRefreshTime": next_refresh_time,
                         "refreshDuration": refresh_duration,
                         "quotaType": "unlimited" if is_unlimited else ("high" if request_limit >= 2500 else "normal"),
+                        "email": profile.get("email", "N/A"),
+                        "uid": profile.get("uid", "N/A"),
+                        "isOnboarded": user_info.get("isOnboarded"),
+                        "hasBillingMetadata": user_info.get("billingMetadata") is not None,
                         # 其他信息
                         "autosuggestions": {
                             "isUnlimited": request_limit_info.get("isUnlimitedAutosuggestions", False),
@@ -2966,18 +2054,19 @@ class WarpRegistrationBot:
                     }
                 elif user_data.get("__typename") == "UserFacingError":
                     error = user_data.get("error", {}).get("message", "Unknown error")
-                    print(f"❌ 获取额度失败: {error}")
+                    logger.error(f"❌ 获取额度失败: {error}")
                     return {"success": False, "error": error}
                 else:
-                    print(f"❌ 响应中没有找到用户信息")
+                    logger.error("❌ 响应中没有找到用户信息")
                     return {"success": False, "error": "未找到用户信息"}
             else:
-                error_text = response.text[:500]
-                print(f"❌ HTTP错误 {response.status_code}")
+                # 响应已缓冲，只解码前 500 字节，避免整段解码大型错误页
+                error_text = response.content[:500].decode("utf-8", errors="replace")
+                logger.error(f"❌ HTTP错误 {response.status_code}")
                 return {"success": False, "error": f"HTTP {response.status_code}: {error_text}"}
 
         except Exception as e:
-            print(f"❌ 获取额度错误: {e}")
+            logger.error(f"❌ 获取额度错误: {e}")
             return {"success": False, "error": str(e)}
 
 
@@ -2990,6 +2079,12 @@ class RegistrationMonitor:
         self.max_concurrent = max_concurrent
         self.db_manager = AsyncDatabaseManager()
         self.proxy_manager = AsyncProxyManager()
+        self.temp_mail_client = TempMailAPIClient()  # 所有工作线程共享
+        # 按代理缓存的连接池，所有机器人共享，TLS会话与DNS结果跨注册复用
+        self._transport_cache: Dict[Optional[str], httpx.AsyncHTTPTransport] = {}
+        # 注册成功的账号先入队，由 _db_flusher 攒批后一次事务写入，提交后通过 future 通知注册流程
+        self._insert_queue: asyncio.Queue = asyncio.Queue()
+        self._flusher_task: Optional[asyncio.Task] = None
         self.running = False
         self.stats = {
             "total_attempts": 0,
@@ -2997,50 +2092,133 @@ class RegistrationMonitor:
             "failed": 0
         }
         self.stats_lock = asyncio.Lock()
+        # 活跃账户数：启动时从数据库读取一次，之后随注册成功递增，print_stats 定期与数据库校准
+        self._active_count = 0
+
+    def get_transport(self, proxy: Optional[str]) -> httpx.AsyncHTTPTransport:
+        """获取（必要时创建）该代理对应的共享连接池"""
+        transport = self._transport_cache.get(proxy)
+        if transport is None:
+            transport = httpx.AsyncHTTPTransport(
+                proxy=proxy,
+                verify=_SSL_CTX,
+                http2=True,
+                limits=httpx.Limits(max_connections=50, max_keepalive_connections=32, keepalive_expiry=60),
+            )
+            self._transport_cache[proxy] = transport
+        return transport
 
+    async def close_transports(self):
+        """关闭所有共享连接池"""
+        transports = list(self._transport_cache.values())
+        self._transport_cache.clear()
+        for transport in transports:
+            await transport.aclose()
 
+    async def save_account(self, row: tuple) -> bool:
+        """把账号行 (ACCOUNT_INSERT_COLUMNS 顺序) 交给批量写入队列，等到它所在的批次提交后才返回
+
+        Returns:
+            账号是否已写入数据库
+        """
+        if self._flusher_task is None or self._flusher_task.done():
+            # 写入任务未运行（未启动或已停止）时直接写库
+            return await self.db_manager.add_account(*row)
+        saved = asyncio.get_running_loop().create_future()
+        await self._insert_queue.put((row, saved))
+        return await saved
+
+    async def _flush_accounts(self, items: list):
+        """在一个事务中写入一批账号并逐行通知结果；批次失败时改为逐条 add_account，不丢弃任何一行"""
+        try:
+            results = await self.db_manager.insert_accounts([row for row, _ in items])
+        except Exception as e:
+            logger.warning(f"批量保存 {len(items)} 个账号失败，改为逐条保存: {e}")
+            results = [await self.db_manager.add_account(*row) for row, _ in items]
+        for (_, saved), ok in zip(items, results):
+            if not saved.done():
+                saved.set_result(ok)
+
+    async def _db_flusher(self):
+        """有账号入队即写库，顺带合并已在排队的行（最多 ACCOUNT_FLUSH_BATCH 行），收到 None 时写完剩余行退出"""
+        stopping = False
+        while not stopping:
+            item = await self._insert_queue.get()
+            if item is None:
+                break
+            items = [item]
+            # 不等待后续账号，避免单工作线程时每次注册都被拖慢；并发时写库期间入队的行会在下一轮一起写入
+            while len(items) < ACCOUNT_FLUSH_BATCH and not self._insert_queue.empty():
+                item = self._insert_queue.get_nowait()
+                if item is None:
+                    stopping = True
+                    break
+                items.append(item)
+            await self._flush_accounts(items)
+
+    def _start_db_flusher(self):
+        if self._flusher_task is None:
+            self._flusher_task = asyncio.create_task(self._db_flusher())
+
+    async def _stop_db_flusher(self):
+        """通知写入任务落盘剩余账号并等待其退出；之后才入队的账号也在这里写完"""
+        if self._flusher_task is not None:
+            await self._insert_queue.put(None)
+            await self._flusher_task
+            self._flusher_task = None
+        items = []
+        while not self._insert_queue.empty():
+            item = self._insert_queue.get_nowait()
+            if item is not None:
+                items.append(item)
+        if items:
+            await self._flush_accounts(items)
+
+    async def _register_once(self, bot: WarpRegistrationBot):
+        """重置工作线程的注册机器人后执行一次注册并更新统计，返回 (local_id, email)"""
+        # 共享临时邮箱客户端与按代理缓存的连接池
+        await bot.reset_state()
+        local_id = await bot.register_account(self.temp_mail_client)
+
+        async with self.stats_lock:
+            self.stats["total_attempts"] += 1
+            if local_id:
+                self.stats["successful"] += 1
+                self._active_count += 1
+            else:
+                self.stats["failed"] += 1
+
+        return local_id, bot.email or "unknown"
 
     async def registration_worker(self, worker_id: int):
         """异步注册工作函数"""
         logger.info(f"🚀 工作线程 {worker_id} 已启动")
 
-        while self.running:
-            try:
-                # 检查当前账户数量
-                current_count = await self.db_manager.get_account_count('active')
-                if current_count >= self.target_accounts:
-                    logger.info(f"[Worker-{worker_id}] 已达到目标账户数 ({current_count}/{self.target_accounts})")
-                    await asyncio.sleep(30)
-                    continue
+        # 每个工作线程复用一个注册机器人，账号之间只重置状态
+        async with WarpRegistrationBot(self.db_manager, self.proxy_manager, self) as bot:
+            while self.running:
+                try:
+                    # 检查当前账户数量（内存计数，不再每轮查询数据库）
+                    current_count = self._active_count
+                    if current_count >= self.target_accounts:
+                        logger.info(f"[Worker-{worker_id}] 已达到目标账户数 ({current_count}/{self.target_accounts})")
+                        await asyncio.sleep(30)
+                        continue
+
+                    local_id, email = await self._register_once(bot)
 
-                # 创建临时邮箱客户端
-                temp_mail_client = TempMailAPIClient()
-                async with temp_mail_client:
-                    # 创建注册机器人并执行注册
-                    bot = WarpRegistrationBot(self.db_manager, self.proxy_manager)
-                    local_id = await bot.register_account(temp_mail_client)
-                    
-                    email = temp_mail_client.current_email or "unknown"
-
-                async with self.stats_lock:
-                    self.stats["total_attempts"] += 1
                     if local_id:
-                        self.stats["successful"] += 1
+                        logger.info(f"[Worker-{worker_id}] ✅ 注册成功: {email}")
+                        await asyncio.sleep(5)
                     else:
-                        self.stats["failed"] += 1
+                        logger.error(f"[Worker-{worker_id}] ❌ 注册失败: {email}")
+                        await asyncio.sleep(30)
 
-                if local_id:
-                    logger.info(f"[Worker-{worker_id}] ✅ 注册成功: {email}")
-                    await asyncio.sleep(5)
-                else:
-                    logger.error(f"[Worker-{worker_id}] ❌ 注册失败: {email}")
-                    await asyncio.sleep(30)
-
-            except Exception as e:
-                logger.error(f"[Worker-{worker_id}] 工作线程异常: {e}")
-                async with self.stats_lock:
-                    self.stats["failed"] += 1
-                await asyncio.sleep(10)
+                except Exception as e:
+                    logger.error(f"[Worker-{worker_id}] 工作线程异常: {e}")
+                    async with self.stats_lock:
+                        self.stats["failed"] += 1
+                    await asyncio.sleep(10)
 
         logger.info(f"🛑 工作线程 {worker_id} 已停止")
 
@@ -3052,7 +2230,10 @@ class RegistrationMonitor:
             async with self.stats_lock:
                 stats = self.stats.copy()
 
+            # 用数据库计数校准内存计数（计数只在账号提交后递增，与数据库一致）
             active_count = await self.db_manager.get_account_count('active')
+            async with self.stats_lock:
+                self._active_count = active_count
 
             logger.info("=" * 50)
             logger.info(f"📊 注册统计")
@@ -3071,6 +2252,9 @@ class RegistrationMonitor:
     async def start(self):
         """启动监控器"""
         self.running = True
+        await self.temp_mail_client._ensure_client()
+        self._active_count = await self.db_manager.get_account_count('active')
+        self._start_db_flusher()
 
         # 创建工作任务
         tasks = []
@@ -3090,25 +2274,55 @@ class RegistrationMonitor:
             logger.info("⌨️ 收到停止信号")
         finally:
             self.running = False
+            await self._stop_db_flusher()
+            await self.temp_mail_client.close()
+            await self.close_transports()
+            await self.db_manager.close()
 
 
 # ==================== 主函数 ====================
-async def main():
-    """主函数"""
-    logger.info("=" * 60)
-    logger.info("🚀 Warp账号注册脚本启动")
-    logger.info(f"📊 目标账号数: {config.TARGET_ACCOUNTS}")
-    logger.info(f"⚡ 最大并发数: {config.MAX_CONCURRENT_REGISTER}")
-    logger.info("=" * 60)
-
-    monitor = RegistrationMonitor(
-        target_accounts=config.TARGET_ACCOUNTS,
-        max_concurrent=config.MAX_CONCURRENT_REGISTER
-    )
+def _install_queue_logging():
+    """把根 logger 现有的处理器挪到后台 QueueListener 线程，根 logger 只保留一个 QueueHandler，
+    并发协程记录日志时只做入队，不会在 stdout 写锁上互相阻塞。
+
+    Returns:
+        恢复原处理器并停止后台线程的回调
+    """
+    root = logging.getLogger()
+    handlers = root.handlers[:]
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    root.handlers = [logging.handlers.QueueHandler(log_queue)]
+    listener.start()
 
-    await monitor.start()
+    def restore():
+        listener.stop()
+        root.handlers = handlers
 
-    logger.info("✅ 注册任务完成")
+    return restore
+
+
+async def main():
+    """主函数"""
+    # 无论由 main.py 还是直接运行启动，都在这里（而不是导入时）接管已配置好的根处理器
+    restore_logging = _install_queue_logging()
+    try:
+        logger.info("=" * 60)
+        logger.info("🚀 Warp账号注册脚本启动")
+        logger.info(f"📊 目标账号数: {config.TARGET_ACCOUNTS}")
+        logger.info(f"⚡ 最大并发数: {config.MAX_CONCURRENT_REGISTER}")
+        logger.info("=" * 60)
+
+        monitor = RegistrationMonitor(
+            target_accounts=config.TARGET_ACCOUNTS,
+            max_concurrent=config.MAX_CONCURRENT_REGISTER
+        )
+
+        await monitor.start()
+
+        logger.info("✅ 注册任务完成")
+    finally:
+        restore_logging()
 
 
 if __name__ == "__main__":